@@ -0,0 +1,8 @@
+"""
+Código compartilhado por PDF_Summarizer_Gemini e PDF_Summarizer_Sem_LLM.
+
+Os dois apps dependem deste pacote (ver requirements.txt de cada um), em vez
+de importar módulos um do outro:
+
+    pip install -e ../PDF_Summarizer_Common
+"""
@@ -0,0 +1,193 @@
+"""
+Instrumentação leve do pipeline: spans (tempo por etapa) e contadores.
+
+Os valores vão para o registro global do processo, exportado em formato
+Prometheus ou JSON, e também para os coletores ativos no contexto atual, o
+que permite mostrar o detalhamento de um único trabalho:
+
+    with metrics.collect() as job:
+        with metrics.span("extraction"):
+            ...
+        metrics.incr("pages", 10)
+    print(job.snapshot())
+
+Os coletores são propagados por contextvars; tarefas enviadas a pools de
+threads precisam rodar em uma cópia do contexto (ver submit_with_context).
+
+Compartilhado pelos dois apps; cada um exporta com o próprio prefixo
+(pdf_summarizer e pdf_summarizer_local).
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+
+PREFIX = "pdf_summarizer"
+
+class Metrics:
+    """Contadores e estatísticas de spans (quantidade, soma e máximo em segundos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.spans: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            span = self.spans.setdefault(name, {"count": 0, "seconds": 0.0, "max": 0.0})
+            span["count"] += 1
+            span["seconds"] += seconds
+            span["max"] = max(span["max"], seconds)
+
+    def snapshot(self) -> dict:
+        """Cópia dos valores atuais: {"counters": {...}, "spans": {...}}"""
+        with self._lock:
+            return {"counters": dict(self.counters),
+                    "spans": {name: dict(span) for name, span in self.spans.items()}}
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.spans.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = PREFIX) -> str:
+        """Exporta no formato texto do Prometheus, com os nomes começando por `prefix`"""
+        data = self.snapshot()
+        lines = []
+        for name, value in sorted(data["counters"].items()):
+            metric = f"{prefix}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        if data["spans"]:
+            metric = f"{prefix}_stage_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for name, span in sorted(data["spans"].items()):
+                lines.append(f'{metric}_count{{stage="{name}"}} {span["count"]:g}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {span["seconds"]:.6f}')
+            lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+            for name, span in sorted(data["spans"].items()):
+                lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {span["max"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+# Registro global do processo e coletores do contexto atual (ex.: um trabalho)
+REGISTRY = Metrics()
+_collectors: contextvars.ContextVar[Tuple[Metrics, ...]] = contextvars.ContextVar("metrics_collectors",
+                                                                                  default=())
+
+def _targets() -> Tuple[Metrics, ...]:
+    return (REGISTRY,) + _collectors.get()
+
+def incr(name: str, value: float = 1):
+    """Soma `value` ao contador `name`"""
+    for target in _targets():
+        target.incr(name, value)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mede a duração do bloco e registra no span `name` (mesmo se houver exceção)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for target in _targets():
+            target.observe(name, elapsed)
+
+@contextmanager
+def collect() -> Iterator[Metrics]:
+    """Coleta, além do registro global, as métricas geradas dentro do bloco"""
+    collector = Metrics()
+    token = _collectors.set(_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _collectors.reset(token)
+
+def current_rss() -> int:
+    """RSS atual do processo em bytes (pico desde o início se /proc não existir)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource  # só existe fora do Windows
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """executor.submit que preserva os coletores ativos na thread que executa a tarefa"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def format_breakdown(snapshot: dict) -> str:
+    """
+    Detalhamento em Markdown (tempo por etapa e contadores) para a interface.
+
+    Args:
+        snapshot: Resultado de Metrics.snapshot()
+
+    Returns:
+        Lista Markdown
+    """
+    lines = []
+    for name, span in sorted(snapshot["spans"].items(), key=lambda item: -item[1]["seconds"]):
+        line = f"- {name}: {span['seconds']:.2f}s"
+        if span["count"] > 1:
+            line += f" ({span['count']:g}x, máx {span['max']:.2f}s)"
+        lines.append(line)
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.append(f"- {name}: {value:,.0f}".replace(",", "."))
+    return "\n".join(lines)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") in ("", "/metrics"):
+            body, content_type = REGISTRY.to_prometheus(self.server.prefix), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = REGISTRY.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # sem log por requisição
+
+def start_http_server(port: int, host: str = "127.0.0.1",
+                      prefix: str = PREFIX) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics (Prometheus) e /metrics.json em uma thread de fundo.
+
+    O endpoint não tem autenticação, então por padrão só aceita conexões
+    locais; use host="0.0.0.0" apenas atrás de uma rede confiável.
+
+    Args:
+        port: Porta HTTP (0 desativa)
+        host: Endereço de escuta
+        prefix: Prefixo dos nomes das métricas no formato Prometheus
+
+    Returns:
+        O servidor iniciado ou None se desativado ou se a porta estiver em uso
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"Erro ao iniciar servidor de métricas na porta {port}: {e}")
+        return None
+    server.prefix = prefix
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
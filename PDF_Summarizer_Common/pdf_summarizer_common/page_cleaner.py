@@ -0,0 +1,203 @@
+"""
+Limpeza do texto extraído, página a página, antes do chunking (Gemini) ou
+da segmentação em sentenças (Sem_LLM).
+
+Remove o que se repete em todo o documento e só aumenta o número de chunks
+(e o custo das chamadas ao LLM):
+
+- cabeçalhos, rodapés e numeração de página: linhas que aparecem nas bordas
+  (primeiras/últimas linhas) de boa parte das páginas, comparadas sem
+  diferenciar maiúsculas e números ("Página 3 de 50" == "Página 4 de 50");
+- páginas quase duplicadas (anexos repetidos, cópias): SimHash dos 3-gramas
+  de palavras de cada página, comparado por bandas para não ser quadrático,
+  e confirmado por MinHash. Mudar uma palavra em cada ~100 desloca em média
+  4 dos 64 bits do SimHash; páginas sem relação ficam a ~32 bits.
+
+Documentos muito longos podem ser limpos em streaming com PageCleaner,
+aprendendo os cabeçalhos/rodapés nas primeiras HEADER_SAMPLE_PAGES páginas.
+
+Os limites abaixo podem ser ajustados pelas variáveis de ambiente de mesmo nome.
+"""
+import hashlib
+import math
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Fração das páginas em que uma linha de borda deve aparecer para ser removida
+HEADER_MIN_PAGE_RATIO = float(os.getenv("HEADER_MIN_PAGE_RATIO", 0.4))
+# Bits de diferença no SimHash até os quais duas páginas são duplicatas
+DUPLICATE_PAGE_MAX_DISTANCE = int(os.getenv("DUPLICATE_PAGE_MAX_DISTANCE", 7))
+# Similaridade de Jaccard mínima (estimada pelo MinHash) entre duplicatas
+DUPLICATE_PAGE_MIN_SIMILARITY = float(os.getenv("DUPLICATE_PAGE_MIN_SIMILARITY", 0.85))
+# Linhas do topo e da base de cada página onde cabeçalhos/rodapés são procurados
+EDGE_LINES = 3
+# Mínimo de páginas em que uma linha deve se repetir para ser removida
+MIN_REPEATED_PAGES = 3
+# Páginas usadas para aprender cabeçalhos/rodapés na limpeza em streaming
+HEADER_SAMPLE_PAGES = 50
+# Páginas com menos palavras que isso não entram na detecção de duplicatas
+MIN_PAGE_WORDS = 20
+SIMHASH_BITS = 64
+# Candidatas do SimHash só são duplicatas se a similaridade de Jaccard estimada
+# pelo MinHash também for alta (o SimHash sozinho confunde páginas de mesmo modelo)
+MINHASH_PERMUTATIONS = 32
+
+_MINHASH_A, _MINHASH_B = (np.random.default_rng(0).integers(1, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64) | 1
+                          for _ in range(2))
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+def normalize_line(line: str) -> str:
+    """Chave de comparação de uma linha: minúsculas, números como '#' e espaços simples"""
+    return _SPACES.sub(" ", _DIGITS.sub("#", line.lower())).strip()
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    """Índices das primeiras e últimas EDGE_LINES linhas não vazias da página"""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(filled[:EDGE_LINES] + filled[-EDGE_LINES:]))
+
+def find_repeated_lines(pages: List[str], min_ratio: float = HEADER_MIN_PAGE_RATIO) -> Set[str]:
+    """
+    Encontra as linhas de borda que se repetem em muitas páginas.
+
+    Args:
+        pages: Texto de cada página
+        min_ratio: Fração mínima das páginas em que a linha deve aparecer
+
+    Returns:
+        Conjunto de chaves (ver normalize_line) a remover
+    """
+    counts: Dict[str, int] = {}
+    for page in pages:
+        lines = page.split("\n")
+        for key in {normalize_line(lines[i]) for i in _edge_indexes(lines)}:
+            counts[key] = counts.get(key, 0) + 1
+
+    threshold = max(MIN_REPEATED_PAGES, math.ceil(min_ratio * len(pages)))
+    return {key for key, count in counts.items() if count >= threshold}
+
+def strip_lines(page: str, repeated: Set[str]) -> Tuple[str, int]:
+    """
+    Remove das bordas da página as linhas repetidas (se sobrar outro conteúdo).
+
+    Returns:
+        Tuple (texto da página, linhas removidas)
+    """
+    lines = page.split("\n")
+    drop = {i for i in _edge_indexes(lines) if normalize_line(lines[i]) in repeated}
+    if not drop or all(i in drop for i, line in enumerate(lines) if line.strip()):
+        return page, 0
+    return "\n".join(line for i, line in enumerate(lines) if i not in drop), len(drop)
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """
+    Hashes de 64 bits do conjunto de 3-gramas de palavras do texto. Cada
+    3-grama conta uma vez, para que trechos repetidos dentro da página não
+    dominem; números contam (tabelas diferentes podem diferir só neles).
+    """
+    words = text.lower().split()
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    return np.frombuffer(digests, dtype=">u8").astype(np.uint64)
+
+def simhash(hashes: np.ndarray) -> int:
+    """SimHash de 64 bits: cada bit é o voto da maioria dos hashes dos 3-gramas"""
+    bits = np.unpackbits(hashes.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0) * 2 > bits.shape[0]
+    return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """Assinatura MinHash (MINHASH_PERMUTATIONS mínimos de permutações afins dos hashes)"""
+    with np.errstate(over="ignore"):
+        return (hashes[:, None] * _MINHASH_A + _MINHASH_B).min(axis=0)
+
+class PageCleaner:
+    """
+    Limpa páginas uma a uma, na ordem do documento, guardando só as
+    impressões digitais das páginas já vistas (~300 bytes por página).
+
+    Os 64 bits do SimHash são divididos em max_distance + 1 bandas: duas
+    páginas a no máximo max_distance bits de distância têm ao menos uma banda
+    idêntica, então só páginas que compartilham uma banda são comparadas, e a
+    duplicata é confirmada pela similaridade estimada com MinHash.
+
+    Args:
+        repeated: Chaves das linhas de cabeçalho/rodapé a remover (ver find_repeated_lines)
+        max_distance: Distância de Hamming máxima entre páginas duplicadas
+        min_similarity: Similaridade de Jaccard mínima (estimada) entre duplicatas
+    """
+
+    def __init__(self, repeated: Set[str] = frozenset(), max_distance: int = DUPLICATE_PAGE_MAX_DISTANCE,
+                 min_similarity: float = DUPLICATE_PAGE_MIN_SIMILARITY):
+        self.repeated = repeated
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        self.width = SIMHASH_BITS // (max_distance + 1)
+        self.buckets: Dict[Tuple[int, int], List[Tuple[int, np.ndarray]]] = {}
+        self.stats = {"duplicate_pages": 0, "lines_removed": 0, "chars_removed": 0}
+
+    def is_duplicate(self, page: str) -> bool:
+        """Se a página é quase igual a uma anterior (senão, passa a ser conhecida)"""
+        if len(page.split()) < MIN_PAGE_WORDS:
+            return False
+        hashes = shingle_hashes(page)
+        fingerprint, signature = simhash(hashes), minhash(hashes)
+        mask = (1 << self.width) - 1
+        keys = [(band, fingerprint >> (band * self.width) & mask) for band in range(self.max_distance + 1)]
+        if any(bin(fingerprint ^ other).count("1") <= self.max_distance
+               and np.mean(signature == other_signature) >= self.min_similarity
+               for key in keys for other, other_signature in self.buckets.get(key, ())):
+            return True
+        entry = (fingerprint, signature)
+        for key in keys:
+            self.buckets.setdefault(key, []).append(entry)
+        return False
+
+    def clean(self, page: str) -> Optional[str]:
+        """
+        Remove cabeçalhos/rodapés da página.
+
+        Returns:
+            Texto limpo ou None se a página for duplicata de uma anterior
+        """
+        cleaned, removed = strip_lines(page, self.repeated)
+        self.stats["lines_removed"] += removed
+        if self.is_duplicate(cleaned):
+            self.stats["duplicate_pages"] += 1
+            self.stats["chars_removed"] += len(page)
+            return None
+        self.stats["chars_removed"] += len(page) - len(cleaned)
+        return cleaned
+
+def find_duplicate_pages(pages: List[str], max_distance: int = DUPLICATE_PAGE_MAX_DISTANCE,
+                         min_similarity: float = DUPLICATE_PAGE_MIN_SIMILARITY) -> List[int]:
+    """
+    Encontra páginas quase iguais a uma página anterior.
+
+    Args:
+        pages: Texto de cada página
+        max_distance: Distância de Hamming máxima entre duplicatas
+        min_similarity: Similaridade de Jaccard mínima (estimada) entre duplicatas
+
+    Returns:
+        Índices das páginas duplicadas (a primeira ocorrência é mantida)
+    """
+    cleaner = PageCleaner(max_distance=max_distance, min_similarity=min_similarity)
+    return [index for index, page in enumerate(pages) if cleaner.is_duplicate(page)]
+
+def clean_pages(pages: List[str]) -> Tuple[List[str], dict]:
+    """
+    Remove cabeçalhos, rodapés e páginas quase duplicadas.
+
+    Args:
+        pages: Texto de cada página, na ordem do documento
+
+    Returns:
+        Tuple (páginas limpas, estatísticas: duplicate_pages, lines_removed, chars_removed)
+    """
+    cleaner = PageCleaner(find_repeated_lines(pages) if len(pages) >= MIN_REPEATED_PAGES else set())
+    cleaned = [page for page in map(cleaner.clean, pages) if page is not None]
+    return cleaned, cleaner.stats
@@ -0,0 +1,95 @@
+"""
+Pools de processos de longa duração, compartilhados por todas as extrações
+do processo.
+
+Criar um ProcessPoolExecutor a cada chamada custava mais que a própria
+extração: cada processo novo importa de novo o script principal e os módulos
+da tarefa. Aqui os processos sobem sob demanda, uma única vez, e atendem as
+chamadas seguintes.
+
+Os processos são criados por um forkserver (spawn onde ele não existe, como
+no Windows). O servidor é um processo novo, com um único thread, então os
+processos não herdam locks que threads do app (trabalhos, métricas, cache)
+estejam segurando, como aconteceria com fork. Os módulos passados a preload()
+são importados uma vez no servidor e chegam já carregados aos processos.
+
+Uso:
+    pools.preload("PyPDF2", "pdf_processor")
+    pages = pools.map(_extract_page_range, shards, workers=4)
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Set
+
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_preload: Set[str] = set()
+_lock = threading.Lock()
+
+def preload(*modules: str):
+    """
+    Importa os módulos no forkserver antes de criar os processos. Sem efeito
+    com spawn ou depois que o primeiro pool subiu; módulos que não puderem ser
+    importados lá são carregados por cada processo, como de costume.
+    """
+    with _lock:
+        _preload.update(modules)
+        if _MP_CONTEXT.get_start_method() == "forkserver":
+            _MP_CONTEXT.set_forkserver_preload(sorted(_preload))
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Pool compartilhado com até `workers` processos, mantido até o fim do programa.
+
+    Args:
+        workers: Número máximo de processos
+
+    Returns:
+        O pool (não deve ser encerrado por quem o recebe)
+    """
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT)
+        return pool
+
+def _discard(workers: int, pool: ProcessPoolExecutor):
+    """Esquece um pool quebrado (um processo morreu) para que o próximo get_pool crie outro"""
+    with _lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def submit(workers: int, fn: Callable, *args) -> Future:
+    """
+    Envia uma tarefa ao pool de `workers` processos, trocando o pool se ele
+    estiver quebrado.
+
+    Returns:
+        Future com o resultado de fn(*args)
+    """
+    pool = get_pool(workers)
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard(workers, pool)
+        return get_pool(workers).submit(fn, *args)
+
+def map(fn: Callable, items: Iterable, workers: int) -> List:
+    """
+    Aplica fn a cada item no pool de `workers` processos.
+
+    Returns:
+        Resultados na ordem dos itens. Se uma tarefa falhar, as que ainda não
+        começaram são canceladas e a exceção é propagada.
+    """
+    futures = [submit(workers, fn, item) for item in items]
+    try:
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,108 @@
+"""
+TextRank compartilhado pelos dois resumidores: separação de sentenças por
+regras, grafo esparso de similaridade TF-IDF e PageRank. Usado pelo
+summarizer e pelo preprocess do PDF_Summarizer_Sem_LLM e pelo extractive.py
+do PDF_Summarizer_Gemini. Só depende de numpy, scipy e scikit-learn.
+"""
+import re
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Vizinhos mantidos por sentença no grafo de similaridade (grafo esparso top-k)
+TEXTRANK_NEIGHBORS = 20
+# Linhas da matriz de similaridade calculadas por vez (limita a memória)
+TEXTRANK_BLOCK_SIZE = 1024
+# Termos presentes em mais dessa fração das sentenças são ignorados em textos longos
+TEXTRANK_MAX_DF = 0.1
+TEXTRANK_MAX_DF_MIN_SENTS = 100
+# Similaridades abaixo desse valor não viram arestas do grafo
+TEXTRANK_MIN_SIMILARITY = 0.05
+
+# Abreviações comuns (pt/en) que não encerram sentença
+_ABBREVIATIONS = {
+    "sr", "sra", "srta", "dr", "dra", "prof", "profa", "eng", "exmo", "exma", "av", "pág", "pag",
+    "p", "pp", "art", "arts", "inc", "cap", "fig", "vol", "n", "nº", "no", "ed", "etc", "ex",
+    "mr", "mrs", "ms", "jr", "st", "ltd", "co", "vs", "e.g", "i.e", "cf", "obs", "tel", "min", "máx",
+}
+_BOUNDARY = re.compile(r"([.!?…]+[\"'”’)\]]*)\s+(?=[\"'“‘(\[]?[A-ZÀ-ÖØ-Þ0-9])")
+
+
+def split_sentences(text):
+    """Separador de sentenças por regras para português e inglês (sem modelo)."""
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        end = match.end(1)
+        if match.group(1) == ".":
+            words = text[start:match.start(1)].split()
+            last_word = words[-1].lower() if words else ""
+            if last_word in _ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+                continue
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def similarity_graph(sents, k=TEXTRANK_NEIGHBORS, block_size=TEXTRANK_BLOCK_SIZE):
+    """
+    Grafo esparso de similaridade entre sentenças: vetores TF-IDF (já
+    normalizados, então o produto escalar é o cosseno) e, para cada sentença,
+    só os k vizinhos mais parecidos. A similaridade é calculada em blocos de
+    linhas e continua esparsa o tempo todo, sem a matriz densa n x n.
+    """
+    # Em documentos longos, termos muito frequentes (artigos, preposições...)
+    # não distinguem as sentenças e deixariam a matriz de similaridade densa
+    max_df = TEXTRANK_MAX_DF if len(sents) > TEXTRANK_MAX_DF_MIN_SENTS else 1.0
+    vectors = TfidfVectorizer(dtype=np.float32, max_df=max_df).fit_transform(sents)
+    vectors_t = vectors.T.tocsc()
+    n = vectors.shape[0]
+
+    rows, cols, vals = [], [], []
+    for start in range(0, n, block_size):
+        block = (vectors[start:start + block_size] @ vectors_t).tocsr()
+
+        # Descarta auto-laços e similaridades desprezíveis antes de ordenar
+        row_ids = np.repeat(np.arange(start, start + block.shape[0]), np.diff(block.indptr))
+        block.data[(block.indices == row_ids) | (block.data < TEXTRANK_MIN_SIMILARITY)] = 0
+        block.eliminate_zeros()
+
+        # k maiores similaridades de cada linha: ordena por (linha, -similaridade)
+        # com uma única chave, já que o cosseno fica em [0, 1]
+        lengths = np.diff(block.indptr)
+        local_rows = np.repeat(np.arange(block.shape[0]), lengths)
+        order = np.argsort(local_rows * 2.0 - block.data)
+        rank = np.arange(block.nnz) - np.repeat(block.indptr[:-1], lengths)
+        best = order[rank < k]
+
+        rows.append(local_rows[best] + start)
+        cols.append(block.indices[best])
+        vals.append(block.data[best])
+
+    graph = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                              shape=(n, n))
+    return graph.maximum(graph.T)  # torna o grafo simétrico
+
+
+def pagerank(graph, damping=0.85, tol=1e-6, max_iter=100):
+    """PageRank por iteração de potência sobre uma matriz de adjacência esparsa."""
+    n = graph.shape[0]
+    out_weight = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inv_weight = np.divide(1.0, out_weight, out=np.zeros_like(out_weight), where=~dangling)
+    transition = sparse.diags(inv_weight) @ graph  # linhas normalizadas
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new_scores = damping * (transition.T @ scores + scores[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(new_scores - scores).sum() < tol:
+            return new_scores
+        scores = new_scores
+    return scores
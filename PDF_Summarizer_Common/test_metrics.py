@@ -0,0 +1,54 @@
+import socket
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_summarizer_common import metrics
+
+def test_collect_sees_spans_and_counters_from_pool_threads():
+    def work(i):
+        with metrics.span("llm_call"):
+            time.sleep(0.01)
+        metrics.incr("api_calls")
+        return i
+
+    with metrics.collect() as job:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [metrics.submit_with_context(executor, work, i) for i in range(6)]
+            assert [f.result() for f in futures] == list(range(6))
+    metrics.incr("api_calls")  # fora do coletor: só vai para o registro global
+
+    snapshot = job.snapshot()
+    assert snapshot["counters"] == {"api_calls": 6}
+    assert snapshot["spans"]["llm_call"]["count"] == 6
+    assert snapshot["spans"]["llm_call"]["seconds"] >= 0.06
+    assert "- llm_call:" in metrics.format_breakdown(snapshot)
+
+def test_prometheus_export():
+    registry = metrics.Metrics()
+    registry.incr("pages_extracted", 12)
+    registry.observe("extraction", 0.5)
+    registry.observe("extraction", 1.5)
+
+    text = registry.to_prometheus()
+
+    assert "pdf_summarizer_pages_extracted_total 12" in text
+    assert 'pdf_summarizer_stage_seconds_count{stage="extraction"} 2' in text
+    assert 'pdf_summarizer_stage_seconds_sum{stage="extraction"} 2.000000' in text
+    assert 'pdf_summarizer_stage_seconds_max{stage="extraction"} 1.500000' in text
+    assert "pdf_summarizer_local_pages_extracted_total 12" in registry.to_prometheus("pdf_summarizer_local")
+
+def test_http_server_listens_only_locally_by_default():
+    assert metrics.start_http_server(0) is None  # porta 0 desativa
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = metrics.start_http_server(port, prefix="pdf_summarizer_local")
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
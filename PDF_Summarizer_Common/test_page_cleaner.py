@@ -0,0 +1,35 @@
+import random
+
+from pdf_summarizer_common.page_cleaner import PageCleaner, clean_pages, find_duplicate_pages
+
+def body(seed, words=60):
+    rng = random.Random(seed)
+    return " ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(words))
+
+def test_strips_running_headers_footers_and_page_numbers():
+    pages = [f"RELATÓRIO ANUAL 2024\n{body(p)}\n{body(p + 100)}\nConfidencial\nPágina {p + 1} de 10"
+             for p in range(10)]
+
+    cleaned, stats = clean_pages(pages)
+
+    assert stats["lines_removed"] == 30  # cabeçalho, "Confidencial" e numeração de cada página
+    assert all("RELATÓRIO" not in p and "Página" not in p and "Confidencial" not in p for p in cleaned)
+    assert cleaned == [f"{body(p)}\n{body(p + 100)}" for p in range(10)]
+
+def test_removes_near_duplicate_pages_keeping_first():
+    annex = body("anexo", 200)
+    pages = [body(0), annex, body(1), annex.replace(annex.split()[17], "alterado"), body(2)]
+
+    assert find_duplicate_pages(pages) == [3]
+    cleaned, stats = clean_pages(pages)
+    assert stats["duplicate_pages"] == 1
+    assert cleaned == [body(0), annex, body(1), body(2)]
+
+def test_streaming_cleaner_matches_clean_pages():
+    annex = body("anexo", 200)
+    pages = [f"Cabeçalho\n{text}\nRodapé {i}" for i, text in enumerate([body(0), annex, body(1), annex, body(2)])]
+
+    cleaner = PageCleaner({"cabeçalho", "rodapé #"})
+    streamed = [page for page in map(cleaner.clean, pages) if page is not None]
+
+    assert (streamed, cleaner.stats) == clean_pages(pages)
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from pdf_summarizer_common import pools
+
+def test_pool_is_reused_between_calls():
+    first = {pools.submit(2, os.getpid).result() for _ in range(4)}
+    second = {pools.submit(2, os.getpid).result() for _ in range(4)}
+
+    assert pools.get_pool(2) is pools.get_pool(2)
+    assert os.getpid() not in first
+    assert len(first | second) <= 2  # as chamadas seguintes usam os mesmos processos
+
+def test_map_keeps_order():
+    assert pools.map(abs, [-3, 2, -1], workers=2) == [3, 2, 1]
+
+def test_broken_pool_is_replaced():
+    broken = pools.submit(1, os._exit, 1)
+    with pytest.raises(pools.BrokenProcessPool):
+        broken.result()
+
+    assert pools.map(abs, [-5], workers=1) == [5]
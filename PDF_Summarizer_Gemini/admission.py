@@ -0,0 +1,176 @@
+"""
+Controle de admissão dos trabalhos pelo custo estimado de memória.
+
+Antes de entrar na fila, cada PDF tem seu custo estimado a partir do
+tamanho do arquivo (get_file_size) e do número de páginas (lido só da
+estrutura do PDF, com mmap). Trabalhos cujo custo sozinho passa do
+orçamento global são recusados; os demais só começam quando a soma dos
+custos em execução cabe no orçamento. Na fila de trabalhos (ver
+JobManager.submit) quem não cabe fica estacionado sem ocupar um worker, e
+volta à fila quando outro trabalho termina. Arquivos enormes vão para uma
+faixa de baixa prioridade: saem da fila depois dos normais e no máximo
+ADMISSION_HEAVY_SLOTS deles rodam ao mesmo tempo.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from config import (ADMISSION_BASE_MB, ADMISSION_FILE_FACTOR, ADMISSION_HEAVY_MB, ADMISSION_HEAVY_SLOTS,
+                    ADMISSION_MEMORY_MB, ADMISSION_PAGE_KB, LARGE_DOC_MEMORY_MB, LARGE_DOC_PAGES)
+from file_utils import get_file_size
+from pdf_summarizer_common import metrics
+
+class AdmissionError(Exception):
+    """O trabalho sozinho excede o orçamento de memória"""
+
+@dataclass
+class Cost:
+    bytes: int
+    pages: int
+    memory_mb: float
+    heavy: bool
+
+def estimate_cost(pdf_path: str, num_pages: int, large_document: bool = False) -> Cost:
+    """
+    Estima a memória que o processamento de um PDF vai ocupar.
+
+    O texto extraído, as páginas limpas e os chunks ficam em memória ao mesmo
+    tempo (~ADMISSION_PAGE_KB por página), e o parser do PyPDF2 cresce com o
+    tamanho do arquivo. No modo documento grande a extração é em streaming e o
+    custo é limitado por LARGE_DOC_MEMORY_MB.
+
+    Args:
+        pdf_path: Caminho do PDF
+        num_pages: Número de páginas (ver count_pdf_pages)
+        large_document: Se o documento será processado no modo documento grande
+
+    Returns:
+        Custo estimado
+    """
+    size = get_file_size(pdf_path) or 0
+    memory_mb = ADMISSION_BASE_MB + size / 2**20 * ADMISSION_FILE_FACTOR + num_pages * ADMISSION_PAGE_KB / 1024
+    if large_document:
+        memory_mb = min(memory_mb, LARGE_DOC_MEMORY_MB)
+    heavy = size >= ADMISSION_HEAVY_MB * 2**20 or num_pages >= LARGE_DOC_PAGES
+    return Cost(bytes=size, pages=num_pages, memory_mb=round(memory_mb, 1), heavy=heavy)
+
+class AdmissionController:
+    """
+    Orçamento global de memória compartilhado pelos trabalhos em execução.
+
+    Args:
+        budget_mb: Memória total dos trabalhos simultâneos (0 desativa o controle)
+        heavy_slots: Trabalhos pesados (ver Cost.heavy) executados ao mesmo tempo
+    """
+
+    def __init__(self, budget_mb: float = ADMISSION_MEMORY_MB, heavy_slots: int = ADMISSION_HEAVY_SLOTS):
+        self.budget_mb = budget_mb
+        self.heavy_slots = heavy_slots
+        self.reserved_mb = 0.0
+        self.running_heavy = 0
+        self._cond = threading.Condition()
+
+    def check(self, cost: Cost):
+        """
+        Recusa o trabalho se ele nunca couber no orçamento.
+
+        Raises:
+            AdmissionError: se cost.memory_mb for maior que o orçamento
+        """
+        if self.budget_mb and cost.memory_mb > self.budget_mb:
+            metrics.incr("admission_rejected")
+            raise AdmissionError(f"Arquivo grande demais: cerca de {cost.memory_mb:.0f} MB estimados "
+                                 f"para um limite de {self.budget_mb:.0f} MB")
+
+    def _fits(self, cost: Cost) -> bool:
+        if cost.heavy and self.running_heavy >= self.heavy_slots:
+            return False
+        return not self.budget_mb or self.reserved_mb + cost.memory_mb <= self.budget_mb
+
+    def _reserve(self, cost: Cost):
+        self.reserved_mb += cost.memory_mb
+        self.running_heavy += cost.heavy
+
+    def try_admit(self, cost: Cost) -> bool:
+        """Reserva a memória do trabalho se ela couber agora, sem esperar (libere com release)"""
+        with self._cond:
+            if not self._fits(cost):
+                return False
+            self._reserve(cost)
+            return True
+
+    def release(self, cost: Cost):
+        """Devolve a reserva feita por try_admit"""
+        with self._cond:
+            self.reserved_mb -= cost.memory_mb
+            self.running_heavy -= cost.heavy
+            self._cond.notify_all()
+
+    def reservation(self, cost: Cost) -> "Reservation":
+        """Reserva para a fila de trabalhos (ver JobManager.submit)"""
+        return Reservation(self, cost)
+
+    @contextmanager
+    def admit(self, cost: Cost, on_wait: Optional[Callable[[], None]] = None) -> Iterator[None]:
+        """
+        Reserva a memória estimada do trabalho durante o bloco, esperando se preciso.
+
+        Bloqueia a thread chamadora; na fila de trabalhos use reservation().
+
+        Args:
+            cost: Custo estimado (ver estimate_cost)
+            on_wait: Chamada uma vez (fora do lock) se o trabalho precisar esperar
+        """
+        self.check(cost)
+        if not self.try_admit(cost):
+            metrics.incr("admission_waits")
+            if on_wait:
+                on_wait()
+            start = time.perf_counter()
+            with self._cond:
+                self._cond.wait_for(lambda: self._fits(cost))
+                self._reserve(cost)
+            metrics.incr("admission_wait_seconds", time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+class Reservation:
+    """
+    Vaga de um trabalho no orçamento, tentada sem bloquear pela fila de
+    trabalhos: try_acquire() antes de tirar o trabalho da fila e release()
+    quando ele termina.
+    """
+    stage = "Aguardando memória livre"
+
+    def __init__(self, controller: AdmissionController, cost: Cost):
+        self.controller = controller
+        self.cost = cost
+        self._waiting_since: Optional[float] = None
+
+    def try_acquire(self) -> bool:
+        if self.controller.try_admit(self.cost):
+            if self._waiting_since is not None:
+                metrics.incr("admission_wait_seconds", time.perf_counter() - self._waiting_since)
+            return True
+        if self._waiting_since is None:
+            metrics.incr("admission_waits")
+            self._waiting_since = time.perf_counter()
+        return False
+
+    def release(self):
+        self.controller.release(self.cost)
+
+_default_controller: Optional[AdmissionController] = None
+_default_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """Retorna o controle de admissão compartilhado do processo"""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = AdmissionController()
+    return _default_controller
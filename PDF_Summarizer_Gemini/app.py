@@ -1,100 +1,269 @@
-import gradio as gr
-from summarizer import generate_summary, summarize_large_text
-from pdf_processor import extract_text_from_pdf
-from pdf_generator import criar_pdf_resumo, criar_pdf_simples, limpar_downloads_antigos
+from summarizer import stream_chunked_summary, stream_summary
+from backends import available_backends, get_backend
+from pdf_processor import count_pdf_pages, extract_text_cached, iter_document_chunks
+from pdf_generator import criar_pdf_resumo, criar_pdf_simples
+from download_store import get_download_store
+from jobs import FAILED, QUEUED, QueueFullError, get_job_manager
+from admission import AdmissionError, estimate_cost, get_admission_controller
+from config import (JOB_WORKERS, JOB_MAX_QUEUE, JOB_POLL_INTERVAL, LARGE_DOC_PAGES, MAX_IN_FLIGHT,
+                    MAX_INPUT_CHARS, MAX_PDF_PAGES, METRICS_HOST, METRICS_PORT, SUMMARY_BACKEND)
+from pdf_summarizer_common import metrics
 import time
 import os
 
-def process_pdf_summary(pdf_file, summary_length, detailed_summary, pdf_type):
+def run_summary_job(pdf_path, original_filename, summary_length, detailed_summary, pdf_type, backend_name, cost,
+                    progress):
     """
-    Processa um arquivo PDF e gera um resumo com nome personalizado.
+    Executa um trabalho (ver summarize_document) e acrescenta às estatísticas
+    o detalhamento de tempo e contadores coletados durante ele. A memória
+    estimada (cost) já foi reservada pela fila antes de o trabalho começar.
     """
-    if pdf_file is None:
-        return "Por favor, faça upload de um arquivo PDF.", "", None
+    with metrics.collect() as job_metrics:
+        with metrics.span("job"):
+            summary, stats, output = summarize_document(pdf_path, original_filename, summary_length,
+                                                        detailed_summary, pdf_type, backend_name, progress,
+                                                        num_pages=cost.pages)
     
-    try:
-        # Obter nome original do arquivo
-        original_filename = os.path.basename(pdf_file.name)
-        
-        # Converter comprimento da escala 1-5 para palavras aproximadas
-        length_map = {1: 150, 2: 250, 3: 350, 4: 500, 5: 700}
-        max_length = length_map.get(summary_length, 300)
-        
-        # Extrair texto do PDF
-        with open(pdf_file.name, "rb") as f:
-            text, num_pages = extract_text_from_pdf(f)
-        
-        if not text.strip():
-            return "Não foi possível extrair texto do PDF. O arquivo pode ser digitalizado (imagem).", "", None
-        
-        # Gerar resumo
-        start_time = time.time()
-        
-        if detailed_summary and len(text) > 5000:
-            summary = summarize_large_text(text, max_length)
+    if stats:
+        breakdown = metrics.format_breakdown(job_metrics.snapshot())
+        stats += "\n    **Detalhamento por etapa:**\n" + "".join(f"    {line}\n" for line in breakdown.splitlines())
+    return summary, stats, output
+
+def _publish_events(events, show_partials, progress):
+    """Consome os eventos de stream_summary publicando os resultados no trabalho. Retorna o resumo final."""
+    summary = ""
+    partials = {}
+    for kind, index, piece in events:
+        if kind == "parcial":
+            if not show_partials:
+                continue
+            if not piece.startswith("Erro"):
+                partials[index] = piece
+            # Mostra os resumos parciais (na ordem do documento) até o final começar
+            progress(partial="**Resumos parciais:**\n\n" + "\n\n".join(partials[i] for i in sorted(partials)))
         else:
-            summary = generate_summary(text, max_length)
-        
-        processing_time = time.time() - start_time
-        
-        # Estatísticas
-        stats = f"""
-        **Estatísticas do processamento:**
-        - Arquivo original: {original_filename}
-        - Páginas processadas: {num_pages}
-        - Caracteres extraídos: {len(text):,}
-        - Caracteres no resumo: {len(summary):,}
-        - Tempo de processamento: {processing_time:.2f} segundos
-        """
+            summary += piece
+            progress(partial=summary)
+    return summary
+
+def _stream_into_job(text, max_length, detailed_summary, backend, progress):
+    """Gera o resumo publicando os resultados parciais no trabalho. Retorna o resumo final."""
+    # Textos acima do limite de entrada sempre passam pelo map-reduce, para não
+    # resumir só o começo do documento; "detalhado" só decide se os parciais aparecem
+    if (detailed_summary and len(text) > 5000) or (backend.map_reduce and len(text) > MAX_INPUT_CHARS):
+        return _publish_events(stream_summary(text, max_length, progress, backend), detailed_summary, progress)
+    
+    progress("Gerando resumo", 0, 1)
+    return _publish_events((("final", -1, piece) for piece in backend.stream(text, max_length)), False, progress)
+
+def _format_coverage(counters, num_pages, large_document):
+    """Linhas de estatística sobre quanto do documento chegou ao resumo"""
+    covered = min(num_pages, MAX_PDF_PAGES) if MAX_PDF_PAGES else num_pages
+    lines = [f"- Páginas processadas: {covered} de {num_pages} ({covered / max(num_pages, 1):.0%})"]
+    if large_document:
+        lines.append("- Modo documento grande (extração e resumo em streaming)")
+    if counters.get("duplicate_pages"):
+        lines.append(f"- Páginas duplicadas ignoradas: {counters['duplicate_pages']:.0f}")
+    if counters.get("input_chars_truncated"):
+        lines.append(f"- Caracteres cortados pelo limite de entrada: {counters['input_chars_truncated']:,.0f}")
+    return "\n    ".join(lines)
+
+def summarize_document(pdf_path, original_filename, summary_length, detailed_summary, pdf_type, backend_name,
+                       progress, num_pages=None):
+    """
+    Pipeline completo de um trabalho: extração, resumo e geração do PDF.
+    
+    Args:
+        pdf_path: Caminho do PDF enviado
+        original_filename: Nome original do arquivo
+        summary_length: Comprimento na escala 1-5
+        detailed_summary: Se deve resumir por partes (documentos longos)
+        pdf_type: "completo" ou "simples"
+        backend_name: Backend de sumarização (ver backends.py)
+        progress: Chamada com (etapa, concluídos, total) a cada avanço
+        num_pages: Número de páginas, se já conhecido
         
-        # Criar PDF do resumo com nome personalizado
-        if pdf_type == "completo":
-            pdf_path = criar_pdf_resumo(text, summary, original_filename, f"Resumo do Documento: {original_filename}")
+    Returns:
+        Tuple (resumo, estatísticas, caminho do PDF gerado)
+    """
+    # Converter comprimento da escala 1-5 para palavras aproximadas
+    length_map = {1: 150, 2: 250, 3: 350, 4: 500, 5: 700}
+    max_length = length_map.get(summary_length, 300)
+    
+    backend = get_backend(backend_name)
+    if num_pages is None:
+        num_pages = count_pdf_pages(pdf_path)
+    large_document = backend.map_reduce and num_pages >= LARGE_DOC_PAGES
+    
+    with metrics.collect() as document_metrics:
+        if large_document:
+            # Documento grande: extração, chunking e resumo em streaming, sem o texto inteiro em memória
+            start_time = time.time()
+            with metrics.span("summarize"):
+                chunks = iter_document_chunks(pdf_path, progress=progress)
+                events = stream_chunked_summary(chunks, max_length, progress, backend, max_pending=2 * MAX_IN_FLIGHT)
+                summary = _publish_events(events, detailed_summary, progress)
+            text_chars = int(document_metrics.snapshot()["counters"].get("chars_extracted", 0))
         else:
-            pdf_path = criar_pdf_simples(summary, original_filename, f"Resumo: {original_filename}")
-        
-        # Nome amigável para download (sem o caminho completo)
-        download_filename = os.path.basename(pdf_path)
-        
-        return summary, stats, pdf_path
-        
-    except Exception as e:
-        return f"Erro ao processar o PDF: {str(e)}", "", None
+            # Extrair texto do PDF (reaproveitando extrações do mesmo arquivo)
+            progress("Extraindo texto")
+            text, num_pages = extract_text_cached(pdf_path)
+            progress("Extraindo texto", num_pages, num_pages)
+            text_chars = len(text)
+            
+            if not text.strip():
+                return "Não foi possível extrair texto do PDF. O arquivo pode ser digitalizado (imagem).", "", None
+            
+            # Gerar resumo
+            start_time = time.time()
+            with metrics.span("summarize"):
+                summary = _stream_into_job(text, max_length, detailed_summary, backend, progress)
+    
+    processing_time = time.time() - start_time
+    if not text_chars:
+        return "Não foi possível extrair texto do PDF. O arquivo pode ser digitalizado (imagem).", "", None
+    if summary.startswith("Erro"):
+        # Nenhum trecho foi resumido: mostra o erro em vez de gerar um PDF com ele
+        return summary, "", None
+    
+    # Estatísticas
+    stats = f"""
+    **Estatísticas do processamento:**
+    - Arquivo original: {original_filename}
+    - Backend: {backend_name}
+    {_format_coverage(document_metrics.snapshot()["counters"], num_pages, large_document)}
+    - Caracteres extraídos: {text_chars:,}
+    - Caracteres no resumo: {len(summary):,}
+    - Tempo de processamento: {processing_time:.2f} segundos
+    """
+    
+    # Criar PDF do resumo com nome personalizado
+    progress("Gerando PDF")
+    if pdf_type == "completo":
+        pdf_path = criar_pdf_resumo("", summary, original_filename, f"Resumo do Documento: {original_filename}",
+                                    tamanho_original=text_chars)
+    else:
+        pdf_path = criar_pdf_simples(summary, original_filename, f"Resumo: {original_filename}")
+    
+    return summary, stats, pdf_path
 
-# Limpar downloads antigos ao iniciar
-limpar_downloads_antigos()
+def process_pdf_summary(pdf_file, summary_length, detailed_summary, pdf_type, backend_name=SUMMARY_BACKEND):
+    """
+    Envia o PDF para a fila de trabalhos e acompanha o progresso, exibindo os
+    resumos parciais e o resumo final à medida que são gerados.
+    """
+    if pdf_file is None:
+        yield "Por favor, faça upload de um arquivo PDF.", "", None
+        return
+    
+    # Obter nome original do arquivo
+    original_filename = os.path.basename(pdf_file.name)
+    
+    # Custo estimado pelo tamanho e número de páginas (só a estrutura do PDF é lida)
+    try:
+        num_pages = count_pdf_pages(pdf_file.name)
+        large_document = get_backend(backend_name).map_reduce and num_pages >= LARGE_DOC_PAGES
+        cost = estimate_cost(pdf_file.name, num_pages, large_document)
+        controller = get_admission_controller()
+        controller.check(cost)
+    except AdmissionError as e:
+        yield f"{e}.", "", None
+        return
+    except Exception as e:
+        yield f"Erro ao processar o PDF: {e}", "", None
+        return
+    
+    manager = get_job_manager()
+    try:
+        # Arquivos enormes vão para a faixa de baixa prioridade; quem não cabe no
+        # orçamento de memória espera estacionado, sem ocupar um worker
+        job_id = manager.submit(run_summary_job, pdf_file.name, original_filename, summary_length,
+                                detailed_summary, pdf_type, backend_name, cost, priority=int(cost.heavy),
+                                gate=controller.reservation(cost))
+    except QueueFullError as e:
+        yield f"{e}. Tente novamente em alguns instantes.", "", None
+        return
+    
+    try:
+        while True:
+            job = manager.get(job_id)
+            if job is None or job.finished:
+                break
+            status = job.describe()
+            if job.status == QUEUED:
+                status += f" (posição {manager.queue_position(job_id)})"
+            yield job.partial, status, None
+            time.sleep(JOB_POLL_INTERVAL)
+    except GeneratorExit:
+        # O usuário fechou a página ou cancelou: libera o worker e as chamadas à API restantes
+        manager.cancel(job_id)
+        raise
+    
+    if job is None:
+        yield "Erro ao processar o PDF: trabalho expirado.", "", None
+    elif job.status == FAILED:
+        yield f"Erro ao processar o PDF: {job.error}", "", None
+    else:
+        yield job.result
 
-# Interface Gradio
-with gr.Blocks(title="Resumidor de PDF com Gemini API", theme=gr.themes.Soft()) as demo:
-    gr.Markdown("# 📄 Resumidor de PDF com Gemini API")
-    gr.Markdown("Faça upload de um arquivo PDF para gerar um resumo usando IA e baixe o resultado em PDF.")
-    
-    with gr.Row():
-        with gr.Column():
-            pdf_input = gr.File(label="Upload do PDF", file_types=[".pdf"])
-            length_slider = gr.Slider(1, 5, value=3, step=1, 
-                                     label="Comprimento do Resumo", 
-                                     info="1 (mais curto) - 5 (mais longo)")
-            detailed = gr.Checkbox(label="Resumo detalhado (para documentos longos)", value=False)
-            pdf_type = gr.Radio(
-                choices=["completo", "simples"],
-                value="completo",
-                label="Tipo de PDF",
-                info="Completo: inclui metadados e estatísticas. Simples: apenas o resumo."
-            )
-            process_btn = gr.Button("Gerar Resumo e PDF", variant="primary")
+def create_interface():
+    """
+    Monta a interface Gradio.
+    
+    O gradio só é importado aqui: os processos de extração reimportam este
+    script (como __mp_main__) e não precisam da interface, que levaria
+    segundos para carregar em cada um.
+    
+    Returns:
+        gr.Blocks da aplicação
+    """
+    import gradio as gr
+    
+    with gr.Blocks(title="Resumidor de PDF com Gemini API", theme=gr.themes.Soft()) as demo:
+        gr.Markdown("# 📄 Resumidor de PDF com Gemini API")
+        gr.Markdown("Faça upload de um arquivo PDF para gerar um resumo usando IA e baixe o resultado em PDF.")
+        
+        with gr.Row():
+            with gr.Column():
+                pdf_input = gr.File(label="Upload do PDF", file_types=[".pdf"])
+                length_slider = gr.Slider(1, 5, value=3, step=1, 
+                                         label="Comprimento do Resumo", 
+                                         info="1 (mais curto) - 5 (mais longo)")
+                detailed = gr.Checkbox(label="Resumo detalhado (para documentos longos)", value=False)
+                pdf_type = gr.Radio(
+                    choices=["completo", "simples"],
+                    value="completo",
+                    label="Tipo de PDF",
+                    info="Completo: inclui metadados e estatísticas. Simples: apenas o resumo."
+                )
+                backend_choice = gr.Dropdown(
+                    choices=available_backends(),
+                    value=SUMMARY_BACKEND,
+                    label="Backend de sumarização",
+                    info="gemini/openai: IA generativa. extrativo: seleciona as frases principais, sem API."
+                )
+                process_btn = gr.Button("Gerar Resumo e PDF", variant="primary")
+            
+            with gr.Column():
+                summary_output = gr.Textbox(label="Resumo", lines=12, interactive=False)
+                stats_output = gr.Markdown()
+                pdf_output = gr.File(label="Download do PDF", interactive=False)
         
-        with gr.Column():
-            summary_output = gr.Textbox(label="Resumo", lines=12, interactive=False)
-            stats_output = gr.Markdown()
-            pdf_output = gr.File(label="Download do PDF", interactive=False)
-    
-    # Event handlers
-    process_btn.click(
-        fn=process_pdf_summary,
-        inputs=[pdf_input, length_slider, detailed, pdf_type],
-        outputs=[summary_output, stats_output, pdf_output]
-    )
+        # Event handlers
+        process_btn.click(
+            fn=process_pdf_summary,
+            inputs=[pdf_input, length_slider, detailed, pdf_type, backend_choice],
+            outputs=[summary_output, stats_output, pdf_output],
+            # O handler só acompanha o trabalho; o limite real de processamento é JOB_WORKERS
+            concurrency_limit=JOB_WORKERS + JOB_MAX_QUEUE
+        )
+    return demo
 
 if __name__ == "__main__":
+    # Índice dos downloads e limpeza dos arquivos antigos em segundo plano
+    get_download_store()
+    # Métricas em http://localhost:METRICS_PORT/metrics (Prometheus) e /metrics.json
+    metrics.start_http_server(METRICS_PORT, METRICS_HOST)
+    demo = create_interface()
+    demo.queue(max_size=JOB_WORKERS + JOB_MAX_QUEUE)
     demo.launch(share=True)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Backends de sumarização intercambiáveis.
+
+Todos compartilham a extração, o chunking, o cache, o limitador de taxa, as
+métricas e a geração de PDF do restante do pipeline; só a chamada que
+transforma um texto em resumo muda:
+
+- "gemini": API do Gemini (summarizer.py)
+- "openai": Chat Completions da OpenAI, pelo mesmo caminho de retry e cache
+- "extrativo": TextRank local (extractive.py), sem chamadas de rede
+
+Uso:
+    backend = get_backend("extrativo")
+    summary = backend.summarize_document(text, 300)
+    summary = await backend.summarize_document_async(text, 300)  # em um event loop
+"""
+import asyncio
+import importlib.util
+import threading
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+from config import OPENAI_API_KEY, OPENAI_MODEL, MAX_TOKENS, TEMPERATURE, SUMMARY_BACKEND
+import summarizer
+
+class SummaryBackend:
+    """
+    Interface de um backend. Subclasses implementam summarize(); os demais
+    métodos têm implementações padrão baseadas nele.
+
+    Atributos:
+        name: Nome usado em get_backend()
+        map_reduce: Se documentos longos devem ser divididos em chunks e os
+            resumos parciais combinados (False: summarize() recebe o texto inteiro)
+    """
+    name = "base"
+    map_reduce = True
+
+    @classmethod
+    def available(cls) -> bool:
+        """Se as dependências do backend estão instaladas"""
+        return True
+
+    def summarize(self, text: str, max_length: int) -> str:
+        """Resume um texto (que cabe em uma chamada)"""
+        raise NotImplementedError
+
+    def stream(self, text: str, max_length: int) -> Iterator[str]:
+        """Resume um texto entregando o resultado em trechos (padrão: um único trecho)"""
+        yield self.summarize(text, max_length)
+
+    def summarize_chunks(self, chunks: List[str], max_length: int,
+                         progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """
+        Resume vários chunks, na ordem. O padrão envia as chamadas em paralelo
+        (limitado por MAX_IN_FLIGHT); backends locais podem processar em lote.
+        """
+        return summarizer.summarize_chunks(chunks, max_length, progress, backend=self)
+
+    def summarize_document(self, text: str, max_length: int,
+                           progress: Optional[Callable[[str, int, int], None]] = None,
+                           prefilter_ratio: Optional[float] = None) -> str:
+        """Resume um documento de qualquer tamanho (chunks + redução em árvore, se map_reduce)"""
+        return summarizer.summarize_large_text(text, max_length, progress, backend=self,
+                                               prefilter_ratio=prefilter_ratio)
+
+    async def summarize_async(self, text: str, max_length: int) -> str:
+        """Versão assíncrona de summarize (padrão: summarize em uma thread, fora do event loop)"""
+        return await asyncio.to_thread(self.summarize, text, max_length)
+
+    async def summarize_document_async(self, text: str, max_length: int,
+                                       progress: Optional[Callable[[str, int, int], None]] = None,
+                                       prefilter_ratio: Optional[float] = None,
+                                       timeout: Optional[float] = None) -> str:
+        """Versão assíncrona de summarize_document, com prazo opcional (ver summarize_large_text_async)"""
+        return await summarizer.summarize_large_text_async(text, max_length, progress, backend=self,
+                                                           prefilter_ratio=prefilter_ratio, timeout=timeout)
+
+class GeminiBackend(SummaryBackend):
+    name = "gemini"
+
+    def summarize(self, text: str, max_length: int) -> str:
+        return summarizer.generate_summary(text, max_length)
+
+    def stream(self, text: str, max_length: int) -> Iterator[str]:
+        return summarizer.generate_summary_stream(text, max_length)
+
+    async def summarize_async(self, text: str, max_length: int) -> str:
+        return await summarizer.generate_summary_async(text, max_length)
+
+class _OpenAIModel:
+    """Adapta o cliente da OpenAI à interface generate_content() usada pelo summarizer"""
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            stream=stream,
+        )
+        if not stream:
+            return SimpleNamespace(text=response.choices[0].message.content or "")
+        return (SimpleNamespace(text=chunk.choices[0].delta.content or "")
+                for chunk in response if chunk.choices)
+
+class OpenAIBackend(SummaryBackend):
+    """
+    Backend da OpenAI. Usa o mesmo prompt, limitador de taxa, novas tentativas
+    e cache de resumos do Gemini; o pacote `openai` só é importado no primeiro uso.
+    """
+    name = "openai"
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec("openai") is not None
+
+    def __init__(self, model: str = OPENAI_MODEL, api_key: Optional[str] = OPENAI_API_KEY):
+        self.model = model
+        self.api_key = api_key
+        self._model: Optional[_OpenAIModel] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return f"openai:{self.model}"
+
+    def _get_model(self) -> _OpenAIModel:
+        with self._lock:
+            if self._model is None:
+                from openai import OpenAI
+                self._model = _OpenAIModel(OpenAI(api_key=self.api_key), self.model)
+            return self._model
+
+    def _check(self) -> Optional[str]:
+        if not self.api_key or not self.api_key.startswith("sk-"):
+            return "Erro: API key não configurada. Por favor, defina OPENAI_API_KEY no arquivo .env"
+        try:
+            self._get_model()
+        except ImportError:
+            return "Erro: pacote openai não instalado (pip install openai)"
+        return None
+
+    def summarize(self, text: str, max_length: int) -> str:
+        error = self._check()
+        if error:
+            return error
+        return summarizer.generate_summary(text, max_length, self._get_model(), self.model_name)
+
+    def stream(self, text: str, max_length: int) -> Iterator[str]:
+        error = self._check()
+        if error:
+            yield error
+            return
+        yield from summarizer.generate_summary_stream(text, max_length, self._get_model(), self.model_name)
+
+class ExtractiveBackend(SummaryBackend):
+    """TextRank local: resume o documento inteiro de uma vez, sem rede e sem custo por token"""
+    name = "extrativo"
+    map_reduce = False
+
+    def summarize(self, text: str, max_length: int) -> str:
+        from extractive import summarize_extractive  # numpy/scipy/sklearn só quando usado
+        return summarize_extractive(text, max_length)
+
+    def summarize_chunks(self, chunks: List[str], max_length: int,
+                         progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        # CPU pura: threads não ajudariam (GIL), então processa em sequência
+        summaries = []
+        for i, chunk in enumerate(chunks, 1):
+            summaries.append(self.summarize(chunk, max_length))
+            if progress:
+                progress(i, len(chunks))
+        return summaries
+
+BACKENDS = {cls.name: cls for cls in (GeminiBackend, OpenAIBackend, ExtractiveBackend)}
+
+def available_backends() -> List[str]:
+    """Nomes dos backends que podem ser oferecidos (ex.: "openai" só com o pacote instalado)"""
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+_instances: Dict[str, SummaryBackend] = {}
+_instances_lock = threading.Lock()
+
+def get_backend(name: Optional[str] = None) -> SummaryBackend:
+    """
+    Retorna a instância compartilhada do backend.
+
+    Args:
+        name: "gemini", "openai" ou "extrativo" (padrão: SUMMARY_BACKEND)
+
+    Returns:
+        Backend de sumarização
+
+    Raises:
+        ValueError: se o nome não for conhecido
+    """
+    name = name or SUMMARY_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {name} (opções: {', '.join(BACKENDS)})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
@@ -0,0 +1,250 @@
+"""
+Resumo em lote de diretórios inteiros de PDFs, sem a interface web.
+
+Uso:
+    python batch.py entrada [--report relatorio.jsonl] [--checkpoint checkpoint.jsonl]
+                    [--max-words 350] [--pdf-type completo|simples]
+                    [--extract-workers N] [--summary-workers N] [--backend gemini|openai|extrativo]
+                    [--prefilter 0.4]
+
+`entrada` é um diretório (percorrido recursivamente atrás de *.pdf) ou um
+manifesto de texto com um caminho por linha. As etapas rodam em pipeline:
+extração no pool de processos compartilhado, resumo e geração do PDF em um pool de
+threads (limitado pelo rate limiter do summarizer). Cada arquivo concluído é
+gravado no checkpoint pelo hash do conteúdo, então uma nova execução pula o
+que já foi feito, inclusive cópias do mesmo arquivo com outro nome.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Set, Tuple
+from backends import available_backends, get_backend
+from config import BATCH_EXTRACT_WORKERS, BATCH_SUMMARY_WORKERS, PREFILTER_RATIO, SUMMARY_BACKEND
+from file_utils import hash_file
+from pdf_summarizer_common import metrics, pools
+from pdf_generator import criar_pdf_resumo, criar_pdf_simples
+from pdf_processor import extract_text_cached
+
+def iter_inputs(source: str) -> Iterator[str]:
+    """
+    Lista os PDFs de um diretório (recursivamente, em ordem) ou de um manifesto.
+
+    Args:
+        source: Diretório ou arquivo de texto com um caminho por linha
+
+    Yields:
+        Caminhos dos PDFs
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    yield os.path.join(root, name)
+        return
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            path = line.strip()
+            if path and not path.startswith("#"):
+                yield path if os.path.isabs(path) else os.path.join(base, path)
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Lê os hashes dos arquivos já concluídos.
+
+    Args:
+        path: Arquivo de checkpoint (JSONL)
+
+    Returns:
+        Conjunto de hashes de conteúdo
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["hash"])
+            except (ValueError, KeyError):
+                continue  # linha incompleta de uma execução interrompida
+    return done
+
+def _extract(path: str, file_hash: str) -> Tuple[str, int, float, Dict[str, float]]:
+    """
+    Executado no pool de processos: extrai o texto (com cache) e mede o tempo.
+    Devolve também o que a limpeza de páginas economizou (vazio em acertos do cache).
+    """
+    start = time.perf_counter()
+    with metrics.collect() as run:
+        text, num_pages = extract_text_cached(path, workers=1, file_hash=file_hash)
+    cleanup = {name: value for name, value in run.snapshot()["counters"].items()
+               if name.startswith("cleanup_") or name == "duplicate_pages"}
+    return text, num_pages, time.perf_counter() - start, cleanup
+
+class BatchRunner:
+    """
+    Executa o pipeline extração -> resumo -> PDF para uma lista de arquivos.
+
+    No máximo `max_pending` documentos ficam entre a extração e o fim do
+    resumo ao mesmo tempo, para que a memória não cresça com o tamanho do lote.
+    """
+
+    def __init__(self, report_path: str, checkpoint_path: str, max_words: int = 350,
+                 pdf_type: str = "completo", extract_workers: int = BATCH_EXTRACT_WORKERS,
+                 summary_workers: int = BATCH_SUMMARY_WORKERS, backend: str = SUMMARY_BACKEND,
+                 prefilter_ratio: float = PREFILTER_RATIO):
+        self.report_path = report_path
+        self.checkpoint_path = checkpoint_path
+        self.max_words = max_words
+        self.pdf_type = pdf_type
+        self.extract_workers = extract_workers
+        self.summary_workers = summary_workers
+        self.backend = get_backend(backend)
+        self.prefilter_ratio = prefilter_ratio
+        self.max_pending = 2 * (extract_workers + summary_workers)
+        self.counts: Dict[str, int] = {"ok": 0, "erro": 0, "ignorado": 0}
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _write(self, record: dict, checkpoint: bool = False):
+        """Grava uma linha no relatório (e no checkpoint, se o arquivo foi concluído)"""
+        with self._lock:
+            self.counts[record["status"]] = self.counts.get(record["status"], 0) + 1
+            self.pages += record.get("pages", 0)
+            with open(self.report_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if checkpoint:
+                with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"hash": record["hash"], "path": record["path"],
+                                        "output": record["output"]}, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def _summarize_and_render(self, path: str, file_hash: str, extraction: Future) -> None:
+        """Executado no pool de threads: resume o texto extraído e gera o PDF"""
+        record = {"type": "file", "path": path, "hash": file_hash}
+        try:
+            text, num_pages, extract_seconds, cleanup = extraction.result()
+            record.update(pages=num_pages, chars=len(text), extract_s=round(extract_seconds, 3), **cleanup)
+            if not text.strip():
+                raise ValueError("nenhum texto extraído (PDF digitalizado?)")
+
+            start = time.perf_counter()
+            summary = self.backend.summarize_document(text, self.max_words,
+                                                     prefilter_ratio=self.prefilter_ratio)
+            record["summary_s"] = round(time.perf_counter() - start, 3)
+            if summary.startswith("Erro"):
+                raise RuntimeError(summary)
+            if not summary.strip():
+                raise RuntimeError("resumo vazio (nenhum trecho foi resumido)")
+
+            start = time.perf_counter()
+            original_filename = os.path.basename(path)
+            if self.pdf_type == "completo":
+                output = criar_pdf_resumo(text, summary, original_filename,
+                                          f"Resumo do Documento: {original_filename}")
+            else:
+                output = criar_pdf_simples(summary, original_filename, f"Resumo: {original_filename}")
+            record["render_s"] = round(time.perf_counter() - start, 3)
+
+            total = record["extract_s"] + record["summary_s"] + record["render_s"]
+            record.update(status="ok", summary_chars=len(summary), output=output,
+                          pages_per_sec=round(num_pages / total, 2) if total else None)
+            self._write(record, checkpoint=True)
+        except Exception as e:
+            record.update(status="erro", error=str(e))
+            self._write(record)
+        finally:
+            self._slots.release()
+
+    def run(self, paths: List[str]) -> dict:
+        """
+        Processa os arquivos, pulando os que já estão no checkpoint.
+
+        Args:
+            paths: Caminhos dos PDFs
+
+        Returns:
+            Totais da execução (também gravados no relatório)
+        """
+        done = load_checkpoint(self.checkpoint_path)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.summary_workers) as summary_pool:
+            for path in paths:
+                try:
+                    file_hash = hash_file(path)
+                except OSError as e:
+                    self._write({"type": "file", "path": path, "status": "erro", "error": str(e)})
+                    continue
+
+                if file_hash in done:
+                    self._write({"type": "file", "path": path, "hash": file_hash, "status": "ignorado"})
+                    continue
+                done.add(file_hash)  # cópias do mesmo conteúdo neste lote também são puladas
+
+                self._slots.acquire()
+                try:
+                    extraction = pools.submit(self.extract_workers, _extract, path, file_hash)
+                except Exception as e:
+                    self._slots.release()
+                    self._write({"type": "file", "path": path, "hash": file_hash,
+                                 "status": "erro", "error": str(e)})
+                    continue
+                extraction.add_done_callback(
+                    lambda future, path=path, file_hash=file_hash:
+                        summary_pool.submit(self._summarize_and_render, path, file_hash, future))
+
+            # O pool de extração é compartilhado e continua vivo: cada arquivo devolve sua
+            # vaga só ao fim do resumo, então ter todas as vagas de volta significa que
+            # nenhum resumo está pendente ou ainda por enfileirar
+            for _ in range(self.max_pending):
+                self._slots.acquire()
+            for _ in range(self.max_pending):
+                self._slots.release()
+
+        elapsed = time.perf_counter() - start
+        totals = {
+            "type": "run",
+            "backend": self.backend.name,
+            "prefilter": self.prefilter_ratio,
+            "files": self.counts,
+            "pages": self.pages,
+            "seconds": round(elapsed, 3),
+            "files_per_min": round(self.counts["ok"] / elapsed * 60, 2) if elapsed else None,
+            "pages_per_sec": round(self.pages / elapsed, 2) if elapsed else None,
+        }
+        with self._lock, open(self.report_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(totals, ensure_ascii=False) + "\n")
+        return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume em lote os PDFs de um diretório ou manifesto")
+    parser.add_argument("source", help="Diretório com PDFs ou manifesto com um caminho por linha")
+    parser.add_argument("--report", default="batch_report.jsonl", help="Relatório JSONL (uma linha por arquivo)")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl", help="Arquivos já concluídos")
+    parser.add_argument("--max-words", type=int, default=350, help="Palavras do resumo final")
+    parser.add_argument("--pdf-type", choices=["completo", "simples"], default="completo")
+    parser.add_argument("--extract-workers", type=int, default=BATCH_EXTRACT_WORKERS,
+                        help="Processos de extração")
+    parser.add_argument("--summary-workers", type=int, default=BATCH_SUMMARY_WORKERS,
+                        help="Documentos resumidos ao mesmo tempo")
+    parser.add_argument("--backend", choices=available_backends(), default=SUMMARY_BACKEND,
+                        help="Backend de sumarização")
+    parser.add_argument("--prefilter", type=float, default=PREFILTER_RATIO,
+                        help="Fração do texto enviada ao LLM após o pré-filtro extrativo (0 desativa)")
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.report, args.checkpoint, args.max_words, args.pdf_type,
+                         args.extract_workers, args.summary_workers, args.backend, args.prefilter)
+    totals = runner.run(list(iter_inputs(args.source)))
+    print(json.dumps(totals, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
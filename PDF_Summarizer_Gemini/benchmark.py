@@ -0,0 +1,709 @@
+"""
+Benchmarks do pipeline de processamento de PDF.
+
+Uso:
+    python benchmark.py extraction [--pdf arquivo.pdf] [--pages 500] [--workers 1,2,4,8]
+    python benchmark.py chunking [--mb 5]
+    python benchmark.py pipeline [--pages 200] [--latency 0.2] [--rpm 600] [--output resultado.json]
+    python benchmark.py backends [--pages 200] [--backends gemini,extrativo] [--latency 0.2]
+    python benchmark.py prefilter [--pages 100] [--ratios 1,0.6,0.4,0.25] [--latency 0.2]
+    python benchmark.py large [--pages 2000] [--memory-mb 512] [--latency 0.05] [--rpm 6000]
+    python benchmark.py render [--summaries 1000] [--words 350]
+    python benchmark.py downloads [--existing 100000]
+    python benchmark.py async [--pages 500] [--latency 0.2] [--in-flight 256]
+
+Sem --pdf, um documento sintético com o número de páginas pedido é gerado
+com reportlab. O benchmark de chunking usa um texto sintético com o tamanho
+pedido em MB. O benchmark pipeline mede cada etapa (extração, chunking,
+resumo com um genai falso de latência e limite de taxa configuráveis e
+geração do PDF) com tempo, vazão e pico de memória (RSS). O benchmark
+backends resume o mesmo documento com cada backend (o gemini usa o genai
+falso; o openai só roda com OPENAI_API_KEY definida). O benchmark prefilter
+resume um relatório sintético (com cabeçalhos, rodapés e avisos repetidos)
+com diferentes frações do pré-filtro extrativo e compara tokens enviados,
+tempo e ROUGE-1/ROUGE-L contra o resumo do texto completo. O benchmark large
+resume um documento de milhares de páginas no modo documento grande e mede
+vazão, pico de memória e cobertura (páginas lidas/total). O benchmark render
+gera o PDF de um lote de resumos sintéticos em memória e em ./downloads e
+mede resumos/s (a primeira renderização, que cria estilos e fontes, é
+reportada à parte, e uma segunda passada mede o reaproveitamento de PDFs
+idênticos). O benchmark downloads mede o custo de gravar um PDF
+no diretório de downloads vazio e com milhares de arquivos de mesmo nome,
+e o da remoção por tamanho. O benchmark async resume o mesmo documento pelo
+caminho com threads e pelo caminho assíncrono (um event loop) e compara
+tempo, chamadas simultâneas e threads usadas. Os resultados são
+impressos em JSON (e gravados em --output) para comparação entre commits.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence
+
+from reportlab.pdfgen import canvas
+
+from pdf_summarizer_common.metrics import current_rss
+from pdf_processor import (chunk_offsets, chunk_text, extract_pages_parallel, extract_text_from_pdf,
+                           iter_text_chunks, open_pdf_reader)
+
+def make_text_pdf(path: str, num_pages: int, lines_per_page: int = 45) -> str:
+    """
+    Gera um PDF sintético só com texto.
+
+    Args:
+        path: Caminho do arquivo a ser criado
+        num_pages: Número de páginas
+        lines_per_page: Linhas de texto por página
+
+    Returns:
+        Caminho do PDF gerado
+    """
+    c = canvas.Canvas(str(path))
+    for page in range(num_pages):
+        c.setFont("Helvetica", 10)
+        for line in range(lines_per_page):
+            c.drawString(50, 800 - line * 17,
+                         f"Pagina {page + 1} linha {line}. Texto de exemplo para medir a extração de PDFs.")
+        c.showPage()
+    c.save()
+    return str(path)
+
+def bench_extraction(pdf_path: str, worker_counts: List[int]) -> List[dict]:
+    """
+    Mede páginas/segundo de extract_pages_parallel para cada número de processos.
+
+    Args:
+        pdf_path: PDF a ser extraído
+        worker_counts: Números de processos a comparar
+
+    Returns:
+        Lista de resultados (um por número de processos)
+    """
+    with open_pdf_reader(pdf_path) as reader:
+        num_pages = len(reader.pages)
+
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        pages = extract_pages_parallel(pdf_path, num_pages, workers)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "stage": "extraction",
+            "workers": workers,
+            "pages": len(pages),
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(len(pages) / elapsed, 1),
+        })
+    return results
+
+def make_text(size_mb: float) -> str:
+    """
+    Gera um texto sintético com parágrafos e sentenças de tamanhos variados.
+
+    Args:
+        size_mb: Tamanho aproximado do texto em MB
+
+    Returns:
+        Texto gerado
+    """
+    parts = []
+    total = 0
+    i = 0
+    while total < size_mb * 1024 * 1024:
+        sentence = f"Sentença {i} do documento sintético" + " com mais conteúdo" * (i % 7) + ". "
+        if i % 9 == 8:
+            sentence += "\n\n"
+        parts.append(sentence)
+        total += len(sentence)
+        i += 1
+    return "".join(parts)
+
+def bench_chunking(text: str) -> List[dict]:
+    """
+    Mede MB/segundo do chunking do texto inteiro e do chunking em streaming.
+
+    Args:
+        text: Texto a ser dividido
+
+    Returns:
+        Lista de resultados (um por modo)
+    """
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    pages = [(i + 1, text[i:i + 3000]) for i in range(0, len(text), 3000)]
+    results = []
+    for mode, run in (("text", lambda: len(chunk_offsets(text))),
+                      ("stream", lambda: sum(1 for _ in iter_text_chunks(pages)))):
+        start = time.perf_counter()
+        num_chunks = run()
+        elapsed = time.perf_counter() - start
+        results.append({
+            "stage": "chunking",
+            "mode": mode,
+            "mb": round(size_mb, 2),
+            "chunks": num_chunks,
+            "seconds": round(elapsed, 3),
+            "mb_per_sec": round(size_mb / elapsed, 1),
+        })
+    return results
+
+@contextmanager
+def measure(stage: str, interval: float = 0.005) -> Iterator[dict]:
+    """
+    Mede o tempo e o pico de RSS de um trecho, amostrando a memória em uma thread.
+
+    Args:
+        stage: Nome da etapa gravado no resultado
+        interval: Intervalo entre amostras de memória em segundos
+
+    Yields:
+        Dicionário do resultado; "seconds", "peak_rss_mb" e "children_max_rss_mb"
+        são preenchidos ao final e o chamador pode acrescentar outras métricas
+    """
+    result = {"stage": stage}
+    peak = [current_rss()]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            peak[0] = max(peak[0], current_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+        result["seconds"] = round(elapsed, 3)
+        result["peak_rss_mb"] = round(max(peak[0], current_rss()) / 2**20, 1)
+        # Processos filhos (pools de extração): maior RSS entre os que já terminaram
+        result["children_max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+
+def git_revision() -> str:
+    """Commit atual do repositório (ou "desconhecido"), para identificar os resultados"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def use_fake_genai(latency: float, rpm: int):
+    """
+    Troca a API do Gemini por FakeGenAI e desativa o cache persistente.
+
+    Args:
+        latency: Latência simulada de cada chamada, em segundos
+        rpm: Limite de requisições por minuto do backend falso (e do rate limiter)
+
+    Returns:
+        A instância de FakeGenAI em uso
+    """
+    import cache
+    import summarizer
+    from fake_genai import FakeGenAI
+    from rate_limiter import RateLimiter
+
+    fake = FakeGenAI(latency=latency, rpm_limit=rpm)
+    summarizer.genai = fake
+    summarizer.GEMINI_API_KEY = "chave-de-benchmark"
+    summarizer._rate_limiter = RateLimiter(rpm, summarizer.RATE_LIMIT_TPM, summarizer.MAX_IN_FLIGHT)
+    summarizer.clear_model_cache()
+    cache.CACHE_ENABLED = False  # mede o custo real de cada etapa, sem reaproveitar execuções anteriores
+    return fake
+
+def use_download_store(directory: str):
+    """Grava os PDFs gerados em directory (sem a limpeza em segundo plano)"""
+    import download_store
+
+    download_store._default_store = download_store.DownloadStore(directory)
+
+def bench_downloads(existing: int, samples: int = 500) -> List[dict]:
+    """
+    Custo de gravar um download novo com o diretório vazio e com muitos arquivos.
+
+    Todos os arquivos têm o mesmo nome de download, o pior caso de uma busca
+    sequencial por nome livre (_1, _2, ...).
+
+    Args:
+        existing: Arquivos gravados antes da medição
+        samples: Arquivos gravados na medição de cada cenário
+
+    Returns:
+        Lista de resultados (diretório vazio, diretório cheio e remoção)
+    """
+    from download_store import DownloadStore
+
+    payload = b"%PDF-1.4\n" + b"0" * 2048
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DownloadStore(tmp, max_age=0, max_bytes=0)
+        for scenario, before in (("empty", 0), ("full", existing)):
+            for _ in range(before - store.count()):
+                with store.create("relatorio_resumo.pdf") as f:
+                    f.write(payload)
+            with measure(f"downloads_{scenario}") as r:
+                for _ in range(samples):
+                    with store.create("relatorio_resumo.pdf") as f:
+                        f.write(payload)
+            r.update(files_before=before, files_written=samples,
+                     ms_per_file=round(r["seconds"] * 1000 / samples, 3))
+            results.append(r)
+
+        store.max_bytes = store.total_bytes // 2
+        files = store.count()
+        with measure("downloads_evict") as r:
+            removed = store.evict()
+        r.update(files=files, removed=removed)
+        results.append(r)
+    return results
+
+def bench_backends(text: str, names: List[str], latency: float, rpm: int, max_words: int = 350) -> List[dict]:
+    """
+    Resume o mesmo texto com cada backend e mede tempo, memória e tamanho do resumo.
+
+    Args:
+        text: Texto do documento
+        names: Backends a comparar
+        latency: Latência simulada do Gemini falso
+        rpm: Limite de requisições por minuto simulado
+        max_words: Palavras do resumo final
+
+    Returns:
+        Lista de resultados (um por backend)
+    """
+    from backends import get_backend
+
+    fake = use_fake_genai(latency, rpm)
+    results = []
+    for name in names:
+        if name == "openai" and not os.getenv("OPENAI_API_KEY"):
+            results.append({"stage": "backend", "backend": name, "skipped": "OPENAI_API_KEY não definida"})
+            continue
+        calls_before = len(fake.calls)
+        with measure("backend") as r:
+            summary = get_backend(name).summarize_document(text, max_words)
+        r.update(backend=name, chars=len(text), summary_words=len(summary.split()),
+                 calls=len(fake.calls) - calls_before if name == "gemini" else None,
+                 chars_per_sec=round(len(text) / max(r["seconds"], 1e-9), 1))
+        results.append(r)
+    return results
+
+def make_report_text(num_pages: int) -> str:
+    """
+    Gera um relatório sintético com seções de assuntos distintos e o ruído
+    típico de PDFs corporativos: cabeçalho e rodapé em toda página, sumário e
+    aviso legal repetidos.
+
+    Args:
+        num_pages: Número de páginas
+
+    Returns:
+        Texto do relatório (páginas separadas por linha em branco)
+    """
+    topics = ["receita", "custos", "logística", "pessoal", "tecnologia", "riscos", "clientes", "estoque"]
+    legal = ("Este documento é confidencial e destinado exclusivamente aos destinatários indicados. "
+             "A reprodução total ou parcial sem autorização é proibida.")
+    pages = []
+    for page in range(num_pages):
+        topic = topics[page % len(topics)]
+        lines = [f"Relatório Anual da Empresa Exemplo S.A. Página {page + 1} de {num_pages}."]
+        if page % 10 == 0:
+            lines.append("Sumário: introdução, resultados, riscos, perspectivas e anexos.")
+        for i in range(12):
+            lines.append(f"No trimestre {i % 4 + 1}, a área de {topic} registrou o indicador {topic}-{page}-{i} "
+                         f"com variação de {(page * 7 + i * 3) % 40 - 20}% em relação ao ano anterior, "
+                         f"explicada por fatores de {topics[(page + i) % len(topics)]}.")
+        lines.append(legal)
+        lines.append("Uso interno. Gerado automaticamente pelo sistema de relatórios.")
+        pages.append(" ".join(lines))
+    return "\n\n".join(pages)
+
+def _tokens(text: str) -> List[str]:
+    return [w.strip(".,;:!?()\"'").lower() for w in text.split() if w.strip(".,;:!?()\"'")]
+
+def rouge_n(candidate: str, reference: str, n: int = 1) -> float:
+    """F1 do ROUGE-N (sobreposição de n-gramas) entre dois textos"""
+    def grams(words: Sequence[str]) -> Counter:
+        return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+    cand, ref = grams(_tokens(candidate)), grams(_tokens(reference))
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(cand.values()), overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """F1 do ROUGE-L (maior subsequência comum de palavras) entre dois textos"""
+    cand, ref = _tokens(candidate), _tokens(reference)
+    if not cand or not ref:
+        return 0.0
+    previous = [0] * (len(ref) + 1)
+    for word in cand:
+        current = [0]
+        for j, ref_word in enumerate(ref):
+            current.append(previous[j] + 1 if word == ref_word else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+def bench_prefilter(text: str, ratios: List[float], latency: float, rpm: int,
+                    max_words: int = 350) -> List[dict]:
+    """
+    Resume o mesmo texto com cada fração do pré-filtro extrativo.
+
+    A referência de qualidade é o resumo do texto completo (fração 1); com o
+    genai falso, o ROUGE mede quanto do conteúdo que chegaria ao modelo é
+    preservado, não a qualidade de um resumo real.
+
+    Args:
+        text: Texto do documento
+        ratios: Frações do texto enviadas ao modelo (1 = sem pré-filtro)
+        latency: Latência simulada do Gemini falso
+        rpm: Limite de requisições por minuto simulado
+        max_words: Palavras do resumo final
+
+    Returns:
+        Lista de resultados (uma por fração)
+    """
+    import extractive  # noqa: F401 (importa scikit-learn fora da medição)
+    from pdf_summarizer_common import metrics
+    import summarizer
+
+    fake = use_fake_genai(latency, rpm)
+    reference = None
+    results = []
+    for ratio in sorted(set(ratios) | {1.0}, reverse=True):
+        calls_before = len(fake.calls)
+        with metrics.collect() as run, measure("prefilter") as r:
+            summary = summarizer.summarize_large_text(text, max_words, prefilter_ratio=ratio)
+        counters = run.snapshot()["counters"]
+        if reference is None:
+            reference = summary
+        r.update(ratio=ratio, chars=len(text), calls=len(fake.calls) - calls_before,
+                 tokens_in=counters.get("tokens_in", 0),
+                 chars_removed=counters.get("prefilter_chars_removed", 0),
+                 rouge1=round(rouge_n(summary, reference, 1), 3),
+                 rouge2=round(rouge_n(summary, reference, 2), 3),
+                 rougeL=round(rouge_l(summary, reference), 3))
+        results.append(r)
+    return results
+
+def bench_large(pdf_path: str, latency: float, rpm: int, memory_mb: int, max_words: int = 350) -> dict:
+    """
+    Resume um PDF inteiro no modo documento grande (extração, chunking e resumo em streaming).
+
+    Args:
+        pdf_path: PDF de entrada
+        latency: Latência simulada de cada chamada ao modelo, em segundos
+        rpm: Limite de requisições por minuto do backend falso (e do rate limiter)
+        memory_mb: Teto de memória passado à extração
+        max_words: Palavras do resumo final
+
+    Returns:
+        Resultado com tempo, vazão, pico de RSS e cobertura
+    """
+    from pdf_summarizer_common import metrics
+    from pdf_processor import iter_document_chunks
+    from summarizer import MAX_IN_FLIGHT, stream_chunked_summary
+
+    fake = use_fake_genai(latency, rpm)
+    with metrics.collect() as run, measure("large_document") as r:
+        chunks = iter_document_chunks(pdf_path, memory_limit_mb=memory_mb)
+        summary = "".join(piece for kind, _, piece in stream_chunked_summary(chunks, max_words,
+                                                                            max_pending=2 * MAX_IN_FLIGHT)
+                          if kind == "final")
+    counters = run.snapshot()["counters"]
+    r.update(pages=int(counters.get("pages_total", 0)), pages_extracted=int(counters.get("pages_extracted", 0)),
+             coverage=round(counters.get("pages_extracted", 0) / max(counters.get("pages_total", 1), 1), 3),
+             chunks=int(counters.get("chunks", 0)), calls=len(fake.calls), summary_words=len(summary.split()),
+             memory_limit_mb=memory_mb, memory_throttled=int(counters.get("memory_throttled", 0)),
+             pages_per_sec=round(counters.get("pages_extracted", 0) / max(r["seconds"], 1e-9), 1))
+    return r
+
+def bench_async(text: str, latency: float, rpm: int, in_flight: int, max_words: int = 350) -> List[dict]:
+    """
+    Resume o mesmo texto com summarize_large_text (threads) e summarize_large_text_async.
+
+    Args:
+        text: Texto do documento
+        latency: Latência simulada de cada chamada ao modelo, em segundos
+        rpm: Limite de requisições por minuto do backend falso (e do rate limiter)
+        in_flight: Chamadas simultâneas do caminho assíncrono
+        max_words: Palavras do resumo final
+
+    Returns:
+        Lista de resultados (um por caminho)
+    """
+    import asyncio
+    import summarizer
+    from rate_limiter import RateLimiter
+
+    fake = use_fake_genai(latency, rpm)
+    summarizer._rate_limiter = RateLimiter(rpm, summarizer.RATE_LIMIT_TPM, summarizer.MAX_IN_FLIGHT,
+                                           max_async_in_flight=in_flight)
+    results = []
+    for mode in ("threads", "async"):
+        fake.calls.clear()
+        threads = [threading.active_count()]
+        stop = threading.Event()
+
+        def watch():
+            while not stop.wait(0.01):
+                threads.append(threading.active_count())
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        with measure(f"summary_{mode}") as r:
+            if mode == "threads":
+                summary = summarizer.summarize_large_text(text, max_words)
+            else:
+                summary = asyncio.run(summarizer.summarize_large_text_async(text, max_words))
+        stop.set()
+        watcher.join()
+        # max_threads não conta a própria thread de amostragem
+        r.update(calls=len(fake.calls), max_concurrency=fake.max_concurrency(),
+                 max_threads=max(threads) - 1, summary_words=len(summary.split()))
+        results.append(r)
+    return results
+
+def bench_render(num_summaries: int, words: int) -> List[dict]:
+    """
+    Vazão da geração do PDF de resumo, em memória e gravando em ./downloads.
+
+    Args:
+        num_summaries: Resumos renderizados por modo
+        words: Palavras de cada resumo sintético
+
+    Returns:
+        Lista de resultados (um por formato e destino)
+    """
+    import io
+    from pdf_summarizer_common import metrics
+    import pdf_generator
+
+    vocabulary = make_text(0.05).split()
+    summaries = []
+    for i in range(num_summaries):
+        start = (i * 37) % (len(vocabulary) - words)
+        body = [f"Resumo {i}."] + vocabulary[start:start + words - 2]
+        summaries.append("\n".join(" ".join(body[j:j + 60]) for j in range(0, words, 60)))
+
+    results = []
+    for name, render, create in (
+            ("completo", pdf_generator.render_pdf_resumo,
+             lambda summary: pdf_generator.criar_pdf_resumo("", summary, "relatorio.pdf",
+                                                            tamanho_original=50000)),
+            ("simples", pdf_generator.render_pdf_simples,
+             lambda summary: pdf_generator.criar_pdf_simples(summary, "relatorio.pdf"))):
+        with measure(f"render_{name}_cold") as r:
+            render(io.BytesIO(), summaries[0], "relatorio.pdf")
+        results.append(r)
+
+        with measure(f"render_{name}_memory") as r:
+            total_bytes = 0
+            for summary in summaries:
+                buffer = io.BytesIO()
+                render(buffer, summary, "relatorio.pdf")
+                total_bytes += buffer.tell()
+        r.update(summaries=num_summaries, words=words, avg_kb=round(total_bytes / num_summaries / 1024, 1),
+                 summaries_per_sec=round(num_summaries / max(r["seconds"], 1e-9), 1))
+        results.append(r)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            use_download_store(tmp)
+            # Segunda passada: os mesmos resumos reaproveitam os PDFs já gravados
+            for stage in ("file", "file_repeat"):
+                with metrics.collect() as run, measure(f"render_{name}_{stage}") as r:
+                    for summary in summaries:
+                        create(summary)
+                r.update(summaries=num_summaries, words=words,
+                         reused=int(run.snapshot()["counters"].get("render_reused", 0)),
+                         summaries_per_sec=round(num_summaries / max(r["seconds"], 1e-9), 1))
+                results.append(r)
+    return results
+
+def bench_pipeline(pdf_path: str, latency: float, rpm: int, max_words: int = 350) -> List[dict]:
+    """
+    Mede cada etapa do pipeline completo com um backend genai falso.
+
+    Args:
+        pdf_path: PDF de entrada
+        latency: Latência simulada de cada chamada ao modelo, em segundos
+        rpm: Limite de requisições por minuto do backend falso (e do rate limiter)
+        max_words: Palavras do resumo final
+
+    Returns:
+        Lista de resultados (um por etapa)
+    """
+    import summarizer
+    from pdf_generator import criar_pdf_resumo
+
+    fake = use_fake_genai(latency, rpm)
+
+    results = []
+    with measure("extraction") as r:
+        text, num_pages = extract_text_from_pdf(pdf_path)
+    r.update(pages=num_pages, chars=len(text), pages_per_sec=round(num_pages / max(r["seconds"], 1e-9), 1))
+    results.append(r)
+
+    with measure("chunking") as r:
+        chunks = chunk_text(text)
+    r.update(chunks=len(chunks), chunks_per_sec=round(len(chunks) / max(r["seconds"], 1e-9), 1))
+    results.append(r)
+
+    with measure("summarize") as r:
+        summary = summarizer.summarize_large_text(text, max_words)
+    r.update(calls=len(fake.calls), errors=len(fake.calls) - len(fake.successful_calls),
+             max_concurrency=fake.max_concurrency(), latency=latency, rpm=rpm,
+             chunks_per_sec=round(len(chunks) / max(r["seconds"], 1e-9), 2))
+    results.append(r)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_download_store(tmp)
+        with measure("render") as r:
+            output = criar_pdf_resumo(text, summary, os.path.basename(pdf_path))
+        r.update(bytes=os.path.getsize(output))
+    results.append(r)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do resumidor de PDF")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extraction = subparsers.add_parser("extraction", help="Escalonamento da extração com o número de processos")
+    extraction.add_argument("--pdf", help="PDF a ser usado (padrão: documento sintético)")
+    extraction.add_argument("--pages", type=int, default=500, help="Páginas do documento sintético")
+    extraction.add_argument("--workers", default=f"1,2,4,{os.cpu_count() or 1}",
+                            help="Lista de números de processos separados por vírgula")
+
+    chunking = subparsers.add_parser("chunking", help="Vazão do chunking por tokens")
+    chunking.add_argument("--mb", type=float, default=5, help="Tamanho do texto sintético em MB")
+
+    pipeline = subparsers.add_parser("pipeline", help="Tempo, vazão e memória de cada etapa do pipeline")
+    pipeline.add_argument("--pdf", help="PDF a ser usado (padrão: documento sintético)")
+    pipeline.add_argument("--pages", type=int, default=200, help="Páginas do documento sintético")
+    pipeline.add_argument("--latency", type=float, default=0.2, help="Latência simulada do modelo (s)")
+    pipeline.add_argument("--rpm", type=int, default=600, help="Limite de requisições por minuto simulado")
+    pipeline.add_argument("--output", help="Arquivo JSON onde gravar os resultados")
+
+    backends = subparsers.add_parser("backends", help="Compara os backends de sumarização no mesmo documento")
+    backends.add_argument("--pdf", help="PDF a ser usado (padrão: documento sintético)")
+    backends.add_argument("--pages", type=int, default=200, help="Páginas do documento sintético")
+    backends.add_argument("--backends", default="gemini,openai,extrativo", help="Backends separados por vírgula")
+    backends.add_argument("--latency", type=float, default=0.2, help="Latência simulada do Gemini (s)")
+    backends.add_argument("--rpm", type=int, default=600, help="Limite de requisições por minuto simulado")
+
+    prefilter = subparsers.add_parser("prefilter", help="Tokens, tempo e ROUGE do pré-filtro extrativo")
+    prefilter.add_argument("--pages", type=int, default=100, help="Páginas do relatório sintético")
+    prefilter.add_argument("--ratios", default="1,0.6,0.4,0.25", help="Frações separadas por vírgula")
+    prefilter.add_argument("--latency", type=float, default=0.2, help="Latência simulada do Gemini (s)")
+    prefilter.add_argument("--rpm", type=int, default=600, help="Limite de requisições por minuto simulado")
+    prefilter.add_argument("--output", help="Arquivo JSON onde gravar os resultados")
+
+    large = subparsers.add_parser("large", help="Modo documento grande: vazão, memória e cobertura")
+    large.add_argument("--pdf", help="PDF a ser usado (padrão: documento sintético)")
+    large.add_argument("--pages", type=int, default=2000, help="Páginas do documento sintético")
+    large.add_argument("--memory-mb", type=int, default=512, help="Teto de memória da extração")
+    large.add_argument("--latency", type=float, default=0.05, help="Latência simulada do modelo (s)")
+    large.add_argument("--rpm", type=int, default=6000, help="Limite de requisições por minuto simulado")
+    large.add_argument("--output", help="Arquivo JSON onde gravar os resultados")
+
+    render = subparsers.add_parser("render", help="Resumos/s na geração do PDF de resumo")
+    render.add_argument("--summaries", type=int, default=1000, help="Resumos renderizados por modo")
+    render.add_argument("--words", type=int, default=350, help="Palavras de cada resumo")
+    render.add_argument("--output", help="Arquivo JSON onde gravar os resultados")
+
+    downloads = subparsers.add_parser("downloads", help="Custo de gravar downloads com o diretório cheio")
+    downloads.add_argument("--existing", type=int, default=100000, help="Arquivos já existentes")
+
+    async_mode = subparsers.add_parser("async", help="Resumo com threads x resumo assíncrono")
+    async_mode.add_argument("--pages", type=int, default=500, help="Páginas do documento sintético")
+    async_mode.add_argument("--latency", type=float, default=0.2, help="Latência simulada do modelo (s)")
+    async_mode.add_argument("--rpm", type=int, default=60000, help="Limite de requisições por minuto simulado")
+    async_mode.add_argument("--in-flight", type=int, default=256, help="Chamadas simultâneas no caminho assíncrono")
+
+    args = parser.parse_args()
+    if args.command == "async":
+        with tempfile.TemporaryDirectory() as tmp:
+            text, _ = extract_text_from_pdf(make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages))
+        results = bench_async(text, args.latency, args.rpm, args.in_flight)
+        print(json.dumps({"revision": git_revision(), "results": results}, indent=2))
+        return
+
+    if args.command == "downloads":
+        print(json.dumps({"revision": git_revision(), "results": bench_downloads(args.existing)}, indent=2))
+        return
+
+    if args.command == "render":
+        report = {"revision": git_revision(), "results": bench_render(args.summaries, args.words)}
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.command == "large":
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = args.pdf or make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages)
+            report = {"revision": git_revision(),
+                      "results": [bench_large(pdf_path, args.latency, args.rpm, args.memory_mb)]}
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.command == "prefilter":
+        report = {"revision": git_revision(), "pages": args.pages,
+                  "results": bench_prefilter(make_report_text(args.pages),
+                                             [float(r) for r in args.ratios.split(",")], args.latency, args.rpm)}
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.command == "backends":
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = args.pdf or make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages)
+            text, _ = extract_text_from_pdf(pdf_path)
+        results = bench_backends(text, args.backends.split(","), args.latency, args.rpm)
+        print(json.dumps({"revision": git_revision(), "results": results}, indent=2))
+        return
+
+    if args.command == "chunking":
+        print(json.dumps(bench_chunking(make_text(args.mb)), indent=2))
+        return
+
+    if args.command == "pipeline":
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = args.pdf or make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages)
+            report = {"revision": git_revision(), "pages": args.pages,
+                      "results": bench_pipeline(pdf_path, args.latency, args.rpm)}
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+        return
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf or make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages)
+        results = bench_extraction(pdf_path, worker_counts)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
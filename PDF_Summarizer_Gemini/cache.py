@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Tuple
+from config import CACHE_ENABLED, CACHE_PATH, CACHE_MAX_BYTES
+
+class SummaryCache:
+    """
+    Cache persistente em SQLite com dois níveis:
+    - extração: hash do arquivo PDF -> (texto extraído, número de páginas)
+    - resumo: hash de (chunk, modelo, parâmetros, prompt) -> resumo gerado
+
+    Os valores são gravados comprimidos e, quando o tamanho total passa de
+    `max_bytes`, as entradas acessadas há mais tempo são removidas (LRU).
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " pages INTEGER,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _get(self, key: str) -> Optional[Tuple[str, Optional[int]]]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, pages FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao ler cache: {e}")
+            return None
+        return zlib.decompress(row[0]).decode("utf-8"), row[1]
+
+    def _put(self, key: str, value: str, pages: Optional[int] = None):
+        blob = zlib.compress(value.encode("utf-8"))
+        try:
+            with self._lock:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, pages, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, pages, len(blob), time.time())
+                )
+                self._total_bytes += len(blob) - (old[0] if old else 0)
+                self._evict()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar cache: {e}")
+
+    def _evict(self):
+        """Remove as entradas menos usadas até o cache ocupar no máximo 90% do limite"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+        removed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            removed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+
+    def get_extraction(self, file_key: str) -> Optional[Tuple[str, int]]:
+        """
+        Busca o texto extraído de um PDF.
+
+        Args:
+            file_key: Hash do arquivo (e da versão do extrator)
+
+        Returns:
+            Tuple (texto, número de páginas) ou None se não estiver em cache
+        """
+        entry = self._get("extract:" + file_key)
+        return (entry[0], entry[1]) if entry else None
+
+    def put_extraction(self, file_key: str, text: str, num_pages: int):
+        """Guarda o texto extraído de um PDF"""
+        self._put("extract:" + file_key, text, num_pages)
+
+    def get_summary(self, summary_key: str) -> Optional[str]:
+        """
+        Busca um resumo gerado anteriormente.
+
+        Args:
+            summary_key: Hash do chunk e dos parâmetros de geração
+
+        Returns:
+            Resumo ou None se não estiver em cache
+        """
+        entry = self._get("summary:" + summary_key)
+        return entry[0] if entry else None
+
+    def put_summary(self, summary_key: str, summary: str):
+        """Guarda um resumo gerado"""
+        self._put("summary:" + summary_key, summary)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def hit_rate(self) -> float:
+        """Fração das consultas atendidas pelo cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total_bytes = 0
+
+_default_cache: Optional[SummaryCache] = None
+_default_lock = threading.Lock()
+
+def get_cache() -> Optional[SummaryCache]:
+    """
+    Retorna o cache compartilhado do processo (criado na primeira chamada).
+
+    Returns:
+        Instância de SummaryCache ou None se o cache estiver desabilitado ou indisponível
+    """
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = SummaryCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Erro ao abrir cache em {CACHE_PATH}: {e}")
+                return None
+    return _default_cache
@@ -10,11 +10,91 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 MODEL_NAME = "gemini-1.0-pro"  # Modelo mais estável e amplamente disponível
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", 1000))
 TEMPERATURE = float(os.getenv("TEMPERATURE", 0.3))
+# Modelos alternativos, em ordem de preferência, caso MODEL_NAME não esteja disponível
+FALLBACK_MODELS = ["gemini-1.0-pro", "gemini-1.5-flash", "gemini-pro"]
+# Tempo (segundos) em que o modelo resolvido via list_models() fica em cache
+MODEL_CACHE_TTL = int(os.getenv("MODEL_CACHE_TTL", 3600))
+
+# Backend de sumarização padrão: "gemini", "openai" ou "extrativo" (local, sem API)
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "gemini")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Limites de uso da API e concorrência do processamento de chunks
+RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", 60))  # requisições por minuto
+RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", 1000000))  # tokens por minuto
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", 4))  # chamadas simultâneas à API
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", 64))  # chamadas simultâneas por event loop (asyncio)
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", 4))  # novas tentativas em erros 429/5xx
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 1.0))  # segundos (backoff exponencial)
 
 # Configurações de processamento de PDF
-MAX_PDF_PAGES = 50
-CHUNK_SIZE = 4000  # Tamanho dos chunks de texto para processamento
-CHUNK_OVERLAP = 200  # Sobreposição entre chunks
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", 0))  # Limite de páginas extraídas; 0 = todas
+# Modo documento grande: a partir de LARGE_DOC_PAGES páginas, extração, chunking e resumo
+# rodam em streaming, sem manter o texto inteiro em memória
+LARGE_DOC_PAGES = int(os.getenv("LARGE_DOC_PAGES", 200))
+LARGE_DOC_MEMORY_MB = int(os.getenv("LARGE_DOC_MEMORY_MB", 512))  # teto de RSS; acima dele a extração desacelera
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 1000))  # Tamanho dos chunks em tokens (estimados)
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 50))  # Sobreposição entre chunks
+CHARS_PER_TOKEN = 4.0  # Média de caracteres por token do Gemini, usada na estimativa local
+MAX_INPUT_CHARS = 10000  # Máximo de caracteres de texto enviados em uma chamada
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1))  # processos de extração
+PARALLEL_MIN_PAGES = int(os.getenv("PARALLEL_MIN_PAGES", 40))  # abaixo disso extrai em um único processo
+
+# Limpeza das páginas extraídas: cabeçalhos/rodapés repetidos e páginas quase duplicadas
+PAGE_CLEANUP = os.getenv("PAGE_CLEANUP", "true").lower() in ("1", "true", "sim")
+# HEADER_MIN_PAGE_RATIO, DUPLICATE_PAGE_MAX_DISTANCE e DUPLICATE_PAGE_MIN_SIMILARITY são lidas do
+# ambiente (já com o .env carregado acima) por pdf_summarizer_common.page_cleaner
+
+# Pré-filtro extrativo: fração do texto (em caracteres) enviada ao LLM em documentos longos; 0 desativa
+PREFILTER_RATIO = float(os.getenv("PREFILTER_RATIO", 0))
+
+# Redução hierárquica (em árvore) dos resumos parciais
+CHUNK_SUMMARY_WORDS = int(os.getenv("CHUNK_SUMMARY_WORDS", 150))  # palavras por resumo parcial
+REDUCE_FAN_IN = int(os.getenv("REDUCE_FAN_IN", 8))  # máximo de resumos combinados por chamada
+REDUCE_TOKEN_BUDGET = int(os.getenv("REDUCE_TOKEN_BUDGET", MAX_INPUT_CHARS // 4 - 100))  # tokens por lote
+MAX_REDUCE_LEVELS = 10
+
+# Cache persistente de extrações e resumos
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "sim")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join("cache", "summaries.sqlite3"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+# Fila de trabalhos da interface
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # documentos processados ao mesmo tempo
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", 8))  # trabalhos aguardando antes de recusar novos
+JOB_TTL = int(os.getenv("JOB_TTL", 3600))  # segundos em que um trabalho concluído fica consultável
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))  # intervalo de atualização do progresso
+
+# Controle de admissão: orçamento de memória dos trabalhos simultâneos (0 desativa) e estimativa de custo
+ADMISSION_MEMORY_MB = int(os.getenv("ADMISSION_MEMORY_MB", 2048))
+ADMISSION_BASE_MB = 16  # custo fixo de um trabalho
+ADMISSION_PAGE_KB = int(os.getenv("ADMISSION_PAGE_KB", 64))  # texto, páginas limpas e chunks por página
+ADMISSION_FILE_FACTOR = float(os.getenv("ADMISSION_FILE_FACTOR", 2))  # objetos do PyPDF2 por MB de arquivo
+# Arquivos a partir desse tamanho (ou de LARGE_DOC_PAGES páginas) vão para a faixa de baixa prioridade
+ADMISSION_HEAVY_MB = int(os.getenv("ADMISSION_HEAVY_MB", 100))
+ADMISSION_HEAVY_SLOTS = max(1, int(os.getenv("ADMISSION_HEAVY_SLOTS", 1)))  # pesados executados ao mesmo tempo
+
+# Servidor de métricas (Prometheus em /metrics e JSON em /metrics.json); 0 desativa
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9464))
+# Endereço de escuta; o endpoint não tem autenticação, então o padrão aceita só conexões locais
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Fontes TrueType dos PDFs gerados (ex.: /usr/share/fonts/truetype/dejavu/DejaVuSans.ttf);
+# vazio usa Helvetica, que não exige embutir a fonte mas só cobre o Latin-1
+PDF_FONT_REGULAR = os.getenv("PDF_FONT_REGULAR", "")
+PDF_FONT_BOLD = os.getenv("PDF_FONT_BOLD", "")
+PDF_FONT_ITALIC = os.getenv("PDF_FONT_ITALIC", "")
+
+# PDFs gerados para download: idade máxima, tamanho total e intervalo da limpeza em segundo plano
+DOWNLOADS_DIR = os.getenv("DOWNLOADS_DIR", "downloads")
+DOWNLOADS_MAX_AGE_DAYS = float(os.getenv("DOWNLOADS_MAX_AGE_DAYS", 7))
+DOWNLOADS_MAX_BYTES = int(os.getenv("DOWNLOADS_MAX_BYTES", 1024 * 1024 * 1024))
+DOWNLOADS_EVICT_INTERVAL = int(os.getenv("DOWNLOADS_EVICT_INTERVAL", 600))
+
+# Processamento em lote (batch.py)
+BATCH_EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", os.cpu_count() or 1))  # processos de extração
+BATCH_SUMMARY_WORKERS = int(os.getenv("BATCH_SUMMARY_WORKERS", 4))  # documentos resumidos ao mesmo tempo
 
 # Configurações de sumarização
 SUMMARY_PROMPT = """
@@ -0,0 +1,235 @@
+"""
+Armazenamento dos PDFs gerados para download.
+
+Cada arquivo fica em um diretório próprio com nome aleatório
+(downloads/<2 hex>/<uuid>/<nome>_resumo.pdf): o usuário baixa o arquivo com
+o nome original, a criação é atômica (mkdir e O_EXCL, sem corrida entre
+requisições simultâneas) e nenhuma requisição precisa listar ou testar
+nomes existentes, por maior que seja o diretório.
+
+Tamanho e data de cada arquivo ficam em um índice SQLite; uma thread em
+segundo plano remove os arquivos mais velhos que max_age e, se o total
+passar de max_bytes, os mais antigos até voltar a 90% do limite.
+
+Um arquivo pode ser gravado com uma chave (ex.: hash do conteúdo que o
+gerou); find(chave) devolve o arquivo já existente em vez de gerar outro
+igual, e renova a data dele para a remoção por idade.
+"""
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+from pdf_summarizer_common import metrics
+from config import DOWNLOADS_DIR, DOWNLOADS_EVICT_INTERVAL, DOWNLOADS_MAX_AGE_DAYS, DOWNLOADS_MAX_BYTES
+
+INDEX_NAME = "index.sqlite3"
+
+class DownloadStore:
+    """
+    Diretório de downloads com nomes únicos, índice e remoção em segundo plano.
+
+    Args:
+        directory: Diretório raiz dos downloads
+        max_age: Idade máxima de um arquivo em segundos (0 = sem limite)
+        max_bytes: Tamanho máximo do conjunto de arquivos (0 = sem limite)
+    """
+
+    def __init__(self, directory: str = DOWNLOADS_DIR, max_age: float = DOWNLOADS_MAX_AGE_DAYS * 86400,
+                 max_bytes: int = DOWNLOADS_MAX_BYTES):
+        directory = os.path.normpath(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        index_path = os.path.join(directory, INDEX_NAME)
+        self._adopt_pending = not os.path.exists(index_path)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " key TEXT)"
+        )
+        if "key" not in {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}:
+            self._conn.execute("ALTER TABLE files ADD COLUMN key TEXT")  # índice criado sem chaves
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_created ON files (created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_key ON files (key)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+
+    @contextmanager
+    def create(self, filename: str, key: Optional[str] = None) -> Iterator[BinaryIO]:
+        """
+        Cria um arquivo novo e exclusivo para o nome pedido.
+
+        O arquivo só entra no índice (e passa a contar para a remoção) depois
+        que o bloco termina sem erro; se houver exceção, é apagado.
+
+        Args:
+            filename: Nome que o usuário verá ao baixar (ex.: relatorio_resumo.pdf)
+            key: Chave para reaproveitar o arquivo depois (ver find)
+
+        Yields:
+            Arquivo binário aberto para escrita; o caminho está em .name
+        """
+        name = uuid.uuid4().hex
+        folder = os.path.join(self.directory, name[:2], name)
+        os.makedirs(os.path.dirname(folder), exist_ok=True)
+        os.mkdir(folder)
+        path = os.path.join(folder, filename)
+        try:
+            with open(path, "xb") as f:
+                yield f
+                size = f.tell()
+        except BaseException:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+        self.add(path, size, key=key)
+
+    def add(self, path: str, size: int, created: Optional[float] = None, key: Optional[str] = None):
+        """Registra no índice um arquivo já gravado dentro do diretório"""
+        try:
+            with self._lock:
+                old = self._conn.execute("SELECT size FROM files WHERE path = ?", (path,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO files (path, size, created, key) VALUES (?, ?, ?, ?)",
+                                   (path, size, created or time.time(), key))
+                self._conn.commit()
+                self._total_bytes += size - (old[0] if old else 0)
+        except sqlite3.Error as e:
+            print(f"Erro ao registrar download {path}: {e}")
+            return
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            self._wakeup.set()  # a remoção roda na thread de fundo, fora da requisição
+
+    def find(self, key: str) -> Optional[str]:
+        """
+        Busca um arquivo gravado com a chave e renova sua data (conta como novo para a remoção).
+
+        Args:
+            key: Chave passada a create
+
+        Returns:
+            Caminho do arquivo ou None se não houver (ou se tiver sido apagado do disco)
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT path, size FROM files WHERE key = ? ORDER BY created DESC LIMIT 1",
+                                         (key,)).fetchone()
+                if row is None:
+                    return None
+                if not os.path.exists(row[0]):
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (row[0],))
+                    self._conn.commit()
+                    self._total_bytes -= row[1]
+                    return None
+                self._conn.execute("UPDATE files SET created = ? WHERE path = ?", (time.time(), row[0]))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao consultar downloads: {e}")
+            return None
+        return row[0]
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Remove os arquivos vencidos e, se preciso, os mais antigos até caber no limite.
+
+        Returns:
+            Quantidade de arquivos removidos
+        """
+        now = now or time.time()
+        cutoff = now - self.max_age if self.max_age else 0
+        with self._lock:
+            expired: List[tuple] = self._conn.execute("SELECT path, size FROM files WHERE created < ?",
+                                                      (cutoff,)).fetchall()
+            total = self._total_bytes - sum(size for _, size in expired)
+            if self.max_bytes and total > self.max_bytes:
+                target = self.max_bytes * 0.9
+                oldest = self._conn.execute("SELECT path, size FROM files WHERE created >= ? ORDER BY created",
+                                            (cutoff,))
+                for path, size in oldest:
+                    if total <= target:
+                        break
+                    expired.append((path, size))
+                    total -= size
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path, _ in expired])
+            self._conn.commit()
+            self._total_bytes -= sum(size for _, size in expired)
+
+        for path, _ in expired:
+            folder = os.path.dirname(path)
+            if folder == self.directory:  # arquivo de versões antigas, gravado direto na raiz
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            else:
+                shutil.rmtree(folder, ignore_errors=True)
+        if expired:
+            metrics.incr("downloads_evicted", len(expired))
+        return len(expired)
+
+    def adopt_existing(self):
+        """Indexa os PDFs gravados por versões antigas direto na raiz do diretório (uma vez)"""
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    self.add(entry.path, stat.st_size, stat.st_mtime)
+
+    def start(self, interval: float = DOWNLOADS_EVICT_INTERVAL):
+        """Inicia (uma vez) a thread que remove arquivos a cada interval segundos"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="download-eviction",
+                                            daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float):
+        if self._adopt_pending:
+            self._adopt_pending = False
+            self.adopt_existing()
+        while True:
+            try:
+                self.evict()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Erro ao limpar downloads: {e}")
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def count(self) -> int:
+        """Número de arquivos no índice"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+_default_store: Optional[DownloadStore] = None
+_default_lock = threading.Lock()
+
+def get_download_store() -> DownloadStore:
+    """
+    Retorna o armazenamento de downloads do processo, criando-o e iniciando a
+    remoção em segundo plano na primeira chamada.
+
+    Returns:
+        Instância de DownloadStore
+    """
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = DownloadStore()
+            _default_store.start()
+    return _default_store
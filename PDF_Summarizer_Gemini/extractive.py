@@ -0,0 +1,107 @@
+"""
+Resumo extrativo local (TextRank), sem chamadas a APIs, e pré-filtro que
+reduz o texto enviado ao LLM às sentenças mais relevantes.
+
+Usa o TextRank compartilhado com o resumidor Sem_LLM (pdf_summarizer_common):
+vetores TF-IDF das sentenças, grafo esparso com os k vizinhos mais parecidos
+de cada sentença e PageRank por iteração de potência. As sentenças são
+separadas por regras (pt/en), sem carregar modelos de NLP.
+"""
+import math
+from typing import List
+
+import numpy as np
+
+from pdf_summarizer_common.textrank import pagerank, similarity_graph, split_sentences
+
+def rank_sentences(sents: List[str]) -> np.ndarray:
+    """
+    Pontuação TextRank de cada sentença (maior = mais central).
+
+    Args:
+        sents: Sentenças
+
+    Returns:
+        Vetor de pontuações, na ordem das sentenças
+    """
+    if len(sents) < 2:
+        return np.ones(len(sents))
+    try:
+        return pagerank(similarity_graph(sents))
+    except ValueError:  # vocabulário vazio (só números/pontuação)
+        return np.linspace(1.0, 0.5, len(sents))  # mantém a ordem do documento
+
+def select_sentences(sents: List[str], scores: np.ndarray, max_words: int) -> List[int]:
+    """
+    Escolhe as sentenças de maior pontuação até somar max_words palavras.
+
+    Args:
+        sents: Sentenças
+        scores: Pontuação de cada sentença
+        max_words: Orçamento de palavras
+
+    Returns:
+        Índices escolhidos, na ordem do documento (sempre ao menos um)
+    """
+    chosen = []
+    words = 0
+    for i in np.argsort(-scores, kind="stable"):
+        length = len(sents[i].split())
+        if chosen and words + length > max_words:
+            continue
+        chosen.append(int(i))
+        words += length
+        if words >= max_words:
+            break
+    return sorted(chosen)
+
+def summarize_extractive(text: str, max_words: int = 300) -> str:
+    """
+    Resumo extrativo: as sentenças mais centrais, na ordem do documento, até max_words palavras.
+
+    Args:
+        text: Texto a ser resumido
+        max_words: Comprimento máximo aproximado do resumo em palavras
+
+    Returns:
+        Texto resumido
+    """
+    sents = split_sentences(" ".join(text.split()))
+    if not sents:
+        return "Nenhum texto válido para resumir."
+    return " ".join(sents[i] for i in select_sentences(sents, rank_sentences(sents), max_words))
+
+def prefilter(text: str, keep_ratio: float) -> str:
+    """
+    Mantém só as sentenças mais relevantes do texto, na ordem do documento.
+
+    Sentenças repetidas literalmente (avisos legais, rodapés) ficam só na
+    primeira ocorrência antes da classificação, já que cópias idênticas
+    seriam consideradas "centrais" pelo TextRank.
+
+    Args:
+        text: Texto completo
+        keep_ratio: Fração (0 a 1] dos caracteres do texto a manter
+
+    Returns:
+        Texto reduzido
+    """
+    sents = split_sentences(" ".join(text.split()))
+    budget = math.ceil(keep_ratio * sum(len(s) + 1 for s in sents))
+    seen = set()
+    unique = []
+    for sentence in sents:
+        if sentence.lower() not in seen:
+            seen.add(sentence.lower())
+            unique.append(sentence)
+    if keep_ratio >= 1 or len(unique) < 2:
+        return " ".join(unique)
+
+    chosen = []
+    used = 0
+    for i in np.argsort(-rank_sentences(unique), kind="stable"):
+        if used >= budget:
+            break
+        chosen.append(int(i))
+        used += len(unique[i]) + 1
+    return " ".join(unique[i] for i in sorted(chosen))
@@ -0,0 +1,140 @@
+"""
+Substituto local e determinístico do módulo google.generativeai.
+
+Usado nos testes e benchmarks para exercitar o pipeline de sumarização sem
+acessar a rede. Registra o início e o fim de cada chamada para que seja
+possível verificar concorrência, ordem e respeito aos limites de taxa.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import List, Optional, Sequence
+
+class FakeAPIError(Exception):
+    """Erro com código HTTP, no mesmo formato das exceções do google.api_core"""
+
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+@dataclass
+class CallRecord:
+    start: float
+    end: float
+    model_name: str
+    prompt_chars: int
+    error: Optional[int] = None
+
+class FakeGenerativeModel:
+    def __init__(self, backend: "FakeGenAI", model_name: str, generation_config: Optional[dict] = None):
+        self.backend = backend
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        text = self.backend._generate(self.model_name, prompt)
+        if not stream:
+            return SimpleNamespace(text=text)
+        # Em streaming, devolve o mesmo texto em pedaços de até 5 palavras
+        words = text.split(" ")
+        return [SimpleNamespace(text=(" " if i else "") + " ".join(words[i:i + 5]))
+                for i in range(0, len(words), 5)]
+
+    async def generate_content_async(self, prompt: str):
+        return SimpleNamespace(text=await self.backend._generate_async(self.model_name, prompt))
+
+class FakeGenAI:
+    """
+    Imita a interface usada pelo summarizer: configure(), list_models() e
+    GenerativeModel(model_name=..., generation_config=...).
+
+    Args:
+        latency: Tempo (segundos) de cada chamada de geração
+        models: Nomes retornados por list_models()
+        summary_words: Número de palavras do texto devolvidas como "resumo"
+        fail_first: Quantidade de chamadas iniciais que falham com fail_code
+        fail_code: Código do erro simulado (429, 503, 400...)
+        rpm_limit: Se definido, chamadas acima desse número por janela falham com 429
+        window: Duração da janela do rpm_limit em segundos
+    """
+
+    def __init__(self, latency: float = 0.0,
+                 models: Sequence[str] = ("models/gemini-1.0-pro",),
+                 summary_words: int = 40, fail_first: int = 0, fail_code: int = 429,
+                 rpm_limit: Optional[int] = None, window: float = 60.0):
+        self.latency = latency
+        self.models = list(models)
+        self.summary_words = summary_words
+        self.fail_first = fail_first
+        self.fail_code = fail_code
+        self.rpm_limit = rpm_limit
+        self.window = window
+        self.calls: List[CallRecord] = []
+        self.list_models_calls = 0
+        self.models_created = 0
+        self._lock = threading.Lock()
+
+    def configure(self, **kwargs):
+        pass
+
+    def list_models(self):
+        with self._lock:
+            self.list_models_calls += 1
+        return [SimpleNamespace(name=name) for name in self.models]
+
+    def GenerativeModel(self, model_name: str, generation_config: Optional[dict] = None):
+        with self._lock:
+            self.models_created += 1
+        return FakeGenerativeModel(self, model_name, generation_config)
+
+    def _check_error(self, start: float) -> Optional[int]:
+        """Código de erro simulado para uma chamada iniciada em start (ou None)"""
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return self.fail_code
+            if self.rpm_limit is not None:
+                recent = [c for c in self.calls if c.error is None and start - c.start < self.window]
+                if len(recent) >= self.rpm_limit:
+                    return 429
+        return None
+
+    def _finish(self, start: float, model_name: str, prompt: str, error: Optional[int]) -> str:
+        with self._lock:
+            self.calls.append(CallRecord(start, time.monotonic(), model_name, len(prompt), error))
+
+        if error is not None:
+            raise FakeAPIError(error, "erro simulado")
+
+        # "Resumo" determinístico: as primeiras palavras do texto do prompt
+        text = prompt.split("Texto para resumir:", 1)[-1]
+        return " ".join(text.split()[:self.summary_words])
+
+    def _generate(self, model_name: str, prompt: str) -> str:
+        start = time.monotonic()
+        error = self._check_error(start)
+        if error is None:
+            time.sleep(self.latency)
+        return self._finish(start, model_name, prompt, error)
+
+    async def _generate_async(self, model_name: str, prompt: str) -> str:
+        start = time.monotonic()
+        error = self._check_error(start)
+        if error is None:
+            await asyncio.sleep(self.latency)  # cancelada aqui, a chamada não é registrada
+        return self._finish(start, model_name, prompt, error)
+
+    @property
+    def successful_calls(self) -> List[CallRecord]:
+        return [c for c in self.calls if c.error is None]
+
+    def max_concurrency(self) -> int:
+        """Maior número de chamadas simultâneas observado"""
+        events = sorted([(c.start, 1) for c in self.calls] + [(c.end, -1) for c in self.calls])
+        current = peak = 0
+        for _, delta in events:
+            current += delta
+            peak = max(peak, current)
+        return peak
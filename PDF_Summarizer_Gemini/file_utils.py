@@ -1,3 +1,5 @@
+import hashlib
+import mmap
 import os
 from typing import Optional
 
@@ -32,4 +34,41 @@ def get_file_size(file_path: str) -> Optional[int]:
     try:
         return os.path.getsize(file_path)
     except OSError:
-        return None
\ No newline at end of file
+        return None
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, em blocos de um mmap
+    (sem copiar o arquivo para a memória do processo).
+    
+    Args:
+        file_path: Caminho para o arquivo
+        block_size: Tamanho de cada bloco em bytes
+        
+    Returns:
+        Hash hexadecimal do conteúdo
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # Arquivo vazio ou sem suporte a mmap
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+            return digest.hexdigest()
+        with mapped, memoryview(mapped) as view:
+            for start in range(0, len(view), block_size):
+                digest.update(view[start:start + block_size])
+    return digest.hexdigest()
+
+def hash_text(text: str) -> str:
+    """
+    Calcula o hash SHA-256 de um texto.
+    
+    Args:
+        text: Texto a ser identificado
+        
+    Returns:
+        Hash hexadecimal do texto
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,256 @@
+"""
+Fila de trabalhos em memória para o processamento de PDFs.
+
+A interface envia um trabalho e recebe um id imediatamente; um conjunto fixo
+de threads executa o pipeline e publica o progresso (etapa, itens concluídos,
+total, tempo estimado e resultado parcial), que a interface consulta
+periodicamente. Trabalhos de prioridade menor (número maior) só saem da
+fila quando não há trabalhos mais prioritários aguardando; trabalhos com uma
+vaga limitada (ex.: orçamento de memória) que ainda não cabem ficam
+estacionados sem ocupar um worker até outro trabalho liberar a sua. Um trabalho
+abandonado pode ser cancelado: se ainda estiver na fila, não é executado; se
+já estiver rodando, é interrompido na próxima atualização de progresso.
+"""
+import itertools
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from config import JOB_WORKERS, JOB_MAX_QUEUE, JOB_TTL
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "na fila", "processando", "concluído", "erro", "cancelado"
+
+class QueueFullError(Exception):
+    """A fila atingiu JOB_MAX_QUEUE trabalhos pendentes"""
+
+class JobCancelled(Exception):
+    """Levantada pelo progress() de um trabalho cancelado, para interrompê-lo"""
+
+@dataclass
+class Job:
+    id: str
+    seq: int = 0
+    priority: int = 0
+    status: str = QUEUED
+    stage: str = ""
+    done: int = 0
+    total: int = 0
+    partial: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stage_started_at: Optional[float] = None
+    cancelled: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def eta(self) -> Optional[float]:
+        """Segundos restantes estimados para a etapa atual, pela média dos itens concluídos"""
+        if not self.done or not self.total or self.stage_started_at is None:
+            return None
+        elapsed = time.time() - self.stage_started_at
+        return elapsed / self.done * (self.total - self.done)
+
+    def describe(self) -> str:
+        """Texto curto de progresso para a interface"""
+        if self.status == QUEUED:
+            return f"⏳ {self.stage or 'Na fila'}..."
+        if self.status == RUNNING:
+            text = f"⚙️ {self.stage or 'Processando'}"
+            if self.total:
+                text += f": {self.done}/{self.total}"
+            eta = self.eta()
+            if eta is not None:
+                text += f" (cerca de {eta:.0f}s restantes)"
+            return text
+        if self.status == FAILED:
+            return f"❌ {self.error}"
+        if self.status == CANCELLED:
+            return "🚫 Cancelado"
+        return f"✅ Concluído em {self.finished_at - self.started_at:.1f}s"
+
+class JobManager:
+    """
+    Executa trabalhos em `workers` threads, com no máximo `max_queue`
+    trabalhos aguardando. Quando a fila está cheia, submit() falha com
+    QueueFullError em vez de acumular pedidos (back-pressure). Trabalhos
+    concluídos ficam disponíveis para consulta por `ttl` segundos.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queue: int = JOB_MAX_QUEUE, ttl: float = JOB_TTL):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._parked = []
+        self._threads = []
+        self._counter = itertools.count(1)
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{len(self._threads) + 1}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn: Callable, *args, priority: int = 0, gate=None, **kwargs) -> str:
+        """
+        Coloca um trabalho na fila.
+
+        Args:
+            fn: Função a executar; recebe como argumento nomeado `progress(stage, done, total,
+                partial)`, que atualiza a etapa e/ou o resultado parcial exibido na interface
+            *args, **kwargs: Demais argumentos de fn
+            priority: 0 para a faixa normal; valores maiores saem da fila depois
+            gate: Vaga que o trabalho precisa para começar (ex.: admission.Reservation), com
+                try_acquire() -> bool, release() e stage (texto exibido enquanto espera).
+                Sem vaga, o trabalho fica estacionado e o worker segue para o próximo da fila
+
+        Returns:
+            Id do trabalho
+
+        Raises:
+            QueueFullError: se já houver max_queue trabalhos aguardando
+        """
+        with self._lock:
+            self._purge()
+            if self._pending >= self.max_queue:
+                raise QueueFullError(f"Fila cheia ({self.max_queue} trabalhos aguardando)")
+            seq = next(self._counter)
+            job = Job(id=f"{seq}-{uuid.uuid4().hex[:8]}", seq=seq, priority=priority)
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._start_workers()
+        self._queue.put((priority, seq, job, fn, args, kwargs, gate))
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retorna o trabalho (ou None se não existir ou já tiver expirado)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> int:
+        """Posição do trabalho entre os que aguardam (0 se já começou)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            return 1 + sum(1 for other in self._jobs.values()
+                           if other.status == QUEUED and (other.priority, other.seq) < (job.priority, job.seq))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela um trabalho na fila ou em execução (ex.: o usuário fechou a página).
+
+        Returns:
+            True se o trabalho ainda não tinha terminado
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancelled = True
+            if job.status == QUEUED:
+                self._pending -= 1
+                job.status, job.finished_at = CANCELLED, time.time()
+                self._parked = [item for item in self._parked if item[2] is not job]
+            return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.05) -> Optional[Job]:
+        """Espera o trabalho terminar (útil em scripts e testes)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.finished:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def stats(self) -> Dict[str, int]:
+        """Quantidade de trabalhos por estado"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _purge(self):
+        """Descarta trabalhos concluídos há mais de ttl segundos (chamado com o lock)"""
+        limit = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            _, _, job, fn, args, kwargs, gate = item
+            with self._lock:
+                if job.cancelled:  # cancelado enquanto aguardava
+                    self._queue.task_done()
+                    continue
+                if gate is not None and not gate.try_acquire():
+                    # Estaciona com o lock, o mesmo do release(): nenhuma vaga liberada passa despercebida
+                    job.stage = gate.stage
+                    self._parked.append(item)
+                    self._queue.task_done()
+                    continue
+                self._pending -= 1
+                job.status, job.stage = RUNNING, ""
+                job.started_at = job.stage_started_at = time.time()
+
+            def progress(stage: Optional[str] = None, done: int = 0, total: int = 0,
+                         partial: Optional[str] = None):
+                with self._lock:
+                    if job.cancelled:
+                        raise JobCancelled(job.id)
+                    if stage is not None:
+                        if stage != job.stage:
+                            job.stage_started_at = time.time()
+                        job.stage, job.done, job.total = stage, done, total
+                    if partial is not None:
+                        job.partial = partial
+
+            try:
+                result = fn(*args, progress=progress, **kwargs)
+            except JobCancelled:
+                with self._lock:
+                    job.status, job.finished_at = CANCELLED, time.time()
+            except Exception as e:
+                with self._lock:
+                    job.status, job.error = FAILED, str(e)
+                    job.finished_at = time.time()
+            else:
+                with self._lock:
+                    job.status, job.result = DONE, result
+                    job.finished_at = time.time()
+            finally:
+                if gate is not None:
+                    with self._lock:
+                        gate.release()
+                        parked, self._parked = self._parked, []
+                    for item in parked:  # a vaga liberada pode servir a um estacionado
+                        self._queue.put(item)
+                self._queue.task_done()
+
+_default_manager: Optional[JobManager] = None
+_default_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Retorna o gerenciador de trabalhos compartilhado do processo"""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+    return _default_manager
@@ -1,14 +1,27 @@
-import os
+import io
+import json
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
-from config import MODEL_NAME
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+from xml.sax.saxutils import escape
+from config import MODEL_NAME, PDF_FONT_BOLD, PDF_FONT_ITALIC, PDF_FONT_REGULAR
+from download_store import get_download_store
+from file_utils import hash_text
+from pdf_summarizer_common import metrics
 import re
 
+# Versão do layout dos PDFs: mude ao alterar os renderizadores para não reaproveitar arquivos antigos
+RENDER_VERSION = 1
+
 def sanitize_filename(filename):
     """
     Remove caracteres inválidos para nomes de arquivo.
@@ -37,211 +50,262 @@ def sanitize_filename(filename):
     
     return filename
 
-def get_unique_filename(directory, base_filename):
+@lru_cache(maxsize=None)
+def get_fonts() -> Dict[str, str]:
     """
-    Gera um nome de arquivo único para evitar sobrescrita.
+    Fontes usadas nos PDFs, registradas uma única vez por processo.
+    
+    Se PDF_FONT_REGULAR (e opcionalmente PDF_FONT_BOLD/PDF_FONT_ITALIC) apontar
+    para arquivos TTF, eles são registrados e embutidos (necessário para
+    caracteres fora do Latin-1); senão usa a família Helvetica padrão do PDF.
     
-    Args:
-        directory: Diretório onde o arquivo será salvo
-        base_filename: Nome base do arquivo
-        
     Returns:
-        Nome de arquivo único
+        Dicionário com os nomes das fontes "regular", "bold" e "italic"
+    """
+    if not PDF_FONT_REGULAR:
+        return {"regular": "Helvetica", "bold": "Helvetica-Bold", "italic": "Helvetica-Oblique"}
+    
+    fonts = {}
+    for variant, path in (("regular", PDF_FONT_REGULAR), ("bold", PDF_FONT_BOLD), ("italic", PDF_FONT_ITALIC)):
+        name = f"ResumoFont-{variant}"
+        pdfmetrics.registerFont(TTFont(name, path or PDF_FONT_REGULAR))
+        fonts[variant] = name
+    registerFontFamily(fonts["regular"], normal=fonts["regular"], bold=fonts["bold"],
+                       italic=fonts["italic"], boldItalic=fonts["bold"])
+    return fonts
+
+@lru_cache(maxsize=None)
+def get_styles() -> Dict[str, ParagraphStyle]:
     """
-    counter = 1
-    filename = base_filename
-    full_path = os.path.join(directory, filename)
+    Estilos de parágrafo dos PDFs, criados uma única vez por processo (cópias
+    próprias; os estilos de getSampleStyleSheet() nunca são alterados).
     
-    # Se o arquivo já existe, adiciona um número
-    while os.path.exists(full_path):
-        name, ext = os.path.splitext(base_filename)
-        filename = f"{name}_{counter}{ext}"
-        full_path = os.path.join(directory, filename)
-        counter += 1
+    Returns:
+        Dicionário com os estilos "titulo", "subtitulo", "normal" e "italico"
+    """
+    fonts = get_fonts()
+    sample = getSampleStyleSheet()
+    return {
+        "titulo": ParagraphStyle("ResumoTitulo", parent=sample["Heading1"], fontName=fonts["bold"]),
+        "subtitulo": ParagraphStyle("ResumoSubtitulo", parent=sample["Heading2"], fontName=fonts["bold"]),
+        "normal": ParagraphStyle("ResumoNormal", parent=sample["BodyText"], fontName=fonts["regular"]),
+        "italico": ParagraphStyle("ResumoItalico", parent=sample["BodyText"], fontName=fonts["italic"],
+                                  textColor=colors.grey),
+    }
+
+@lru_cache(maxsize=65536)
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    """Largura do texto em pontos (memorizada: as mesmas palavras se repetem muito)"""
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+def wrap_text(text: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """
+    Quebra uma linha de texto pela largura real dos glifos na fonte.
     
-    return filename
+    Args:
+        text: Texto (sem quebras de linha)
+        font_name: Nome da fonte registrada
+        font_size: Tamanho da fonte em pontos
+        max_width: Largura máxima da linha em pontos
+        
+    Returns:
+        Linhas que cabem em max_width (palavras maiores que a linha são partidas)
+    """
+    space = text_width(" ", font_name, font_size)
+    lines = []
+    current, width = [], 0.0
+    for word in text.split():
+        word_width = text_width(word, font_name, font_size)
+        if current and width + space + word_width > max_width:
+            lines.append(" ".join(current))
+            current, width = [], 0.0
+        while word_width > max_width:  # palavra sozinha não cabe: parte no último caractere que cabe
+            cut = len(word) - 1
+            while cut > 1 and text_width(word[:cut], font_name, font_size) > max_width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+            word_width = text_width(word, font_name, font_size)
+        width += (space if current else 0) + word_width
+        current.append(word)
+    if current:
+        lines.append(" ".join(current))
+    return lines
 
-def criar_pdf_resumo(texto_original: str, resumo: str, original_filename: str, titulo: str = None) -> str:
+def _download_name(original_filename: str) -> str:
+    """Nome do arquivo de resumo visto pelo usuário ao baixar"""
+    return f"{sanitize_filename(original_filename)}_resumo.pdf"
+
+@metrics.span("render")
+def render_pdf_resumo(output: Union[str, BinaryIO], resumo: str, original_filename: str, titulo: str = None,
+                      tamanho_original: int = 0) -> None:
     """
-    Cria um arquivo PDF com o resumo usando o nome original do arquivo.
+    Escreve o PDF completo do resumo (informações do processamento, resumo e rodapé).
     
     Args:
-        texto_original: Texto completo extraído do PDF
+        output: Caminho ou arquivo binário aberto (ex.: io.BytesIO ou a resposta HTTP)
         resumo: Texto do resumo gerado
         original_filename: Nome original do arquivo PDF
         titulo: Título personalizado (opcional)
-        
-    Returns:
-        Caminho completo para o PDF gerado
+        tamanho_original: Caracteres do texto original
     """
-    # Criar diretório de downloads se não existir
-    downloads_dir = "downloads"
-    if not os.path.exists(downloads_dir):
-        os.makedirs(downloads_dir)
-    
-    # Sanitizar o nome do arquivo original
-    safe_filename = sanitize_filename(original_filename)
-    
-    # Criar nome do arquivo final (SEM TIMESTAMP)
-    base_filename = f"{safe_filename}_resumo.pdf"
-    filename = get_unique_filename(downloads_dir, base_filename)
-    full_path = os.path.join(downloads_dir, filename)
-    
-    # Usar título personalizado ou padrão
+    styles = get_styles()
     if titulo is None:
-        titulo = f"Resumo: {safe_filename}"
-    
-    # Criar documento PDF
-    doc = SimpleDocTemplate(full_path, pagesize=A4, 
-                          rightMargin=72, leftMargin=72,
-                          topMargin=72, bottomMargin=72)
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    estilo_titulo = styles['Heading1']
-    estilo_subtitulo = styles['Heading2']
-    estilo_normal = styles['BodyText']
-    estilo_italico = ParagraphStyle(
-        'Italico',
-        parent=styles['BodyText'],
-        fontName='Helvetica-Oblique',
-        textColor=colors.grey
-    )
-    
-    # Conteúdo do PDF
-    conteudo = []
-    
-    # Título
-    conteudo.append(Paragraph(titulo, estilo_titulo))
-    conteudo.append(Spacer(1, 0.2 * inch))
-    
-    # Informações do processamento
-    conteudo.append(Paragraph("Informações do Processamento", estilo_subtitulo))
-    conteudo.append(Paragraph(f"<b>Arquivo original:</b> {original_filename}", estilo_normal))
-    conteudo.append(Paragraph(f"<b>Data de geração:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}", estilo_normal))
-    conteudo.append(Paragraph(f"<b>Modelo utilizado:</b> {MODEL_NAME}", estilo_normal))
-    conteudo.append(Paragraph(f"<b>Tamanho do texto original:</b> {len(texto_original):,} caracteres".replace(',', '.'), estilo_normal))
-    conteudo.append(Paragraph(f"<b>Tamanho do resumo:</b> {len(resumo):,} caracteres".replace(',', '.'), estilo_normal))
+        titulo = f"Resumo: {sanitize_filename(original_filename)}"
+    agora = datetime.now()
     
-    # Calcular taxa de compressão
-    if len(texto_original) > 0:
-        taxa_compressao = ((len(texto_original) - len(resumo)) / len(texto_original) * 100)
-        conteudo.append(Paragraph(f"<b>Taxa de compressão:</b> {taxa_compressao:.1f}%", estilo_normal))
+    conteudo = [
+        Paragraph(escape(titulo), styles["titulo"]),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Informações do Processamento", styles["subtitulo"]),
+        Paragraph(f"<b>Arquivo original:</b> {escape(original_filename)}", styles["normal"]),
+        Paragraph(f"<b>Data de geração:</b> {agora.strftime('%d/%m/%Y %H:%M')}", styles["normal"]),
+        Paragraph(f"<b>Modelo utilizado:</b> {MODEL_NAME}", styles["normal"]),
+        Paragraph(f"<b>Tamanho do texto original:</b> {tamanho_original:,} caracteres".replace(',', '.'), styles["normal"]),
+        Paragraph(f"<b>Tamanho do resumo:</b> {len(resumo):,} caracteres".replace(',', '.'), styles["normal"]),
+    ]
     
-    conteudo.append(Spacer(1, 0.3 * inch))
+    # Calcular taxa de compressão
+    if tamanho_original > 0:
+        taxa_compressao = ((tamanho_original - len(resumo)) / tamanho_original * 100)
+        conteudo.append(Paragraph(f"<b>Taxa de compressão:</b> {taxa_compressao:.1f}%", styles["normal"]))
     
-    # Resumo
-    conteudo.append(Paragraph("Resumo Gerado", estilo_subtitulo))
-    conteudo.append(Spacer(1, 0.1 * inch))
+    conteudo += [Spacer(1, 0.3 * inch), Paragraph("Resumo Gerado", styles["subtitulo"]), Spacer(1, 0.1 * inch)]
     
-    # Adicionar o resumo como parágrafos
+    # Adicionar o resumo como parágrafos (escapados: o texto do modelo pode conter <, > e &)
     for paragrafo in resumo.split('\n'):
         if paragrafo.strip():
-            conteudo.append(Paragraph(paragrafo.strip(), estilo_normal))
+            conteudo.append(Paragraph(escape(paragrafo.strip()), styles["normal"]))
             conteudo.append(Spacer(1, 0.05 * inch))
     
     conteudo.append(Spacer(1, 0.3 * inch))
     
     # Rodapé
-    rodape = Paragraph(
-        f"<i>Resumo gerado automaticamente por sistema de IA em {datetime.now().strftime('%d/%m/%Y')}. "
+    conteudo.append(Paragraph(
+        f"<i>Resumo gerado automaticamente por sistema de IA em {agora.strftime('%d/%m/%Y')}. "
         "Este é um resumo automatizado e deve ser revisado para precisão completa.</i>",
-        estilo_italico
-    )
-    conteudo.append(rodape)
+        styles["italico"]
+    ))
     
-    # Construir PDF
+    doc = SimpleDocTemplate(output, pagesize=A4,
+                            rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=72)
     doc.build(conteudo)
-    
-    return full_path
 
-def criar_pdf_simples(texto: str, original_filename: str, titulo: str = None) -> str:
+@metrics.span("render")
+def render_pdf_simples(output: Union[str, BinaryIO], texto: str, original_filename: str,
+                       titulo: str = None) -> None:
     """
-    Cria um PDF simples com o nome original do arquivo.
+    Escreve um PDF simples (título, texto e rodapé) desenhado direto no canvas.
     
     Args:
+        output: Caminho ou arquivo binário aberto
         texto: Texto do resumo
         original_filename: Nome original do arquivo PDF
         titulo: Título personalizado (opcional)
-        
-    Returns:
-        Caminho completo para o PDF gerado
     """
-    # Criar diretório de downloads se não existir
-    downloads_dir = "downloads"
-    if not os.path.exists(downloads_dir):
-        os.makedirs(downloads_dir)
-    
-    # Sanitizar o nome do arquivo
-    safe_filename = sanitize_filename(original_filename)
-    
-    # Criar nome do arquivo final (SEM TIMESTAMP)
-    base_filename = f"{safe_filename}_resumo.pdf"
-    filename = get_unique_filename(downloads_dir, base_filename)
-    full_path = os.path.join(downloads_dir, filename)
-    
-    # Usar título personalizado ou padrão
+    fonts = get_fonts()
     if titulo is None:
-        titulo = f"Resumo: {safe_filename}"
+        titulo = f"Resumo: {sanitize_filename(original_filename)}"
     
-    # Criar documento PDF simples
-    c = canvas.Canvas(full_path, pagesize=letter)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, 750, titulo)
-    c.setFont("Helvetica", 12)
+    width, height = letter
+    margin = 50
+    c = canvas.Canvas(output, pagesize=letter)
+    c.setFont(fonts["bold"], 16)
+    c.drawString(margin, 750, titulo)
+    c.setFont(fonts["regular"], 12)
     
     y = 730
-    lines = texto.split('\n')
-    
-    for line in lines:
-        if line.strip():
-            # Quebra de linha se o texto for muito longo
-            if len(line) > 80:
-                words = line.split()
-                current_line = ""
-                for word in words:
-                    if len(current_line + " " + word) > 80:
-                        c.drawString(50, y, current_line)
-                        y -= 20
-                        current_line = word
-                        if y < 50:
-                            c.showPage()
-                            y = 750
-                            c.setFont("Helvetica", 12)
-                    else:
-                        current_line += " " + word if current_line else word
-                if current_line:
-                    c.drawString(50, y, current_line)
-                    y -= 20
-            else:
-                c.drawString(50, y, line)
-                y -= 20
-            
+    for paragraph in texto.split('\n'):
+        for line in wrap_text(paragraph, fonts["regular"], 12, width - 2 * margin):
+            c.drawString(margin, y, line)
+            y -= 20
             if y < 50:
                 c.showPage()
                 y = 750
-                c.setFont("Helvetica", 12)
+                c.setFont(fonts["regular"], 12)
     
     # Rodapé
-    c.setFont("Helvetica-Oblique", 8)
-    c.drawString(50, 30, f"Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')} - Modelo: {MODEL_NAME} - Arquivo original: {original_filename}")
-    
+    c.setFont(fonts["italic"], 8)
+    c.drawString(margin, 30, f"Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')} - Modelo: {MODEL_NAME} - Arquivo original: {original_filename}")
     c.save()
-    return full_path
 
-# Função de limpeza mantida
-def limpar_downloads_antigos(dias=7):
-    """Remove arquivos PDF com mais de X dias"""
-    downloads_dir = "downloads"
-    if not os.path.exists(downloads_dir):
-        return
+def render_key(template: str, *params) -> str:
+    """
+    Chave de um PDF gerado: mesmo modelo de layout, fontes, textos e
+    metadados produzem o mesmo arquivo (a data de geração não entra).
     
-    agora = datetime.now()
-    for arquivo in os.listdir(downloads_dir):
-        if arquivo.endswith('.pdf'):
-            caminho_arquivo = os.path.join(downloads_dir, arquivo)
-            tempo_criacao = datetime.fromtimestamp(os.path.getctime(caminho_arquivo))
-            dias_diferenca = (agora - tempo_criacao).days
-            
-            if dias_diferenca > dias:
-                os.remove(caminho_arquivo)
\ No newline at end of file
+    Args:
+        template: "completo" ou "simples"
+        *params: Textos e metadados passados ao renderizador
+        
+    Returns:
+        Hash hexadecimal
+    """
+    fonts = (PDF_FONT_REGULAR, PDF_FONT_BOLD, PDF_FONT_ITALIC)
+    return hash_text(json.dumps([RENDER_VERSION, template, MODEL_NAME, fonts, *params], ensure_ascii=False))
+
+def _store_pdf(template: str, render: Callable[..., None], texto: str, original_filename: str, *args) -> str:
+    """
+    Grava o PDF no armazenamento de downloads, ou devolve o arquivo já gerado
+    com a mesma chave (ver render_key) sem renderizar de novo.
+    
+    Returns:
+        Caminho do PDF
+    """
+    store = get_download_store()
+    key = render_key(template, texto, original_filename, *args)
+    path = store.find(key)
+    if path is not None:
+        metrics.incr("render_reused")
+        return path
+    with store.create(_download_name(original_filename), key) as f:
+        render(f, texto, original_filename, *args)
+    return f.name
+
+def render_to_bytes(render: Callable[..., None], *args, **kwargs) -> bytes:
+    """
+    Gera um PDF em memória, sem arquivo temporário.
+    
+    Exemplo: render_to_bytes(render_pdf_simples, resumo, "relatorio.pdf")
+    
+    Returns:
+        Conteúdo do PDF
+    """
+    buffer = io.BytesIO()
+    render(buffer, *args, **kwargs)
+    return buffer.getvalue()
+
+def criar_pdf_resumo(texto_original: str, resumo: str, original_filename: str, titulo: str = None,
+                     tamanho_original: Optional[int] = None) -> str:
+    """
+    Cria um arquivo PDF com o resumo usando o nome original do arquivo.
+    
+    Args:
+        texto_original: Texto completo extraído do PDF
+        resumo: Texto do resumo gerado
+        original_filename: Nome original do arquivo PDF
+        titulo: Título personalizado (opcional)
+        tamanho_original: Caracteres do texto original, quando o texto não
+            está em memória (modo documento grande); tem precedência sobre texto_original
+        
+    Returns:
+        Caminho completo para o PDF gerado
+    """
+    if tamanho_original is None:
+        tamanho_original = len(texto_original)
+    return _store_pdf("completo", render_pdf_resumo, resumo, original_filename, titulo, tamanho_original)
+
+def criar_pdf_simples(texto: str, original_filename: str, titulo: str = None) -> str:
+    """
+    Cria um PDF simples com o nome original do arquivo.
+    
+    Args:
+        texto: Texto do resumo
+        original_filename: Nome original do arquivo PDF
+        titulo: Título personalizado (opcional)
+        
+    Returns:
+        Caminho completo para o PDF gerado
+    """
+    return _store_pdf("simples", render_pdf_simples, texto, original_filename, titulo)
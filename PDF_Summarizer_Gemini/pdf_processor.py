@@ -1,65 +1,491 @@
 import PyPDF2
+import gc
 import io
-from typing import List, Tuple
+import math
+import mmap
+import os
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from cache import get_cache
+from config import (CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, CHARS_PER_TOKEN, EXTRACTION_WORKERS,
+                    LARGE_DOC_MEMORY_MB, MAX_PDF_PAGES, PAGE_CLEANUP, PARALLEL_MIN_PAGES)
+from file_utils import hash_file
+from pdf_summarizer_common import metrics, pools
+from pdf_summarizer_common.page_cleaner import (HEADER_SAMPLE_PAGES, MIN_REPEATED_PAGES, PageCleaner, clean_pages,
+                                                find_repeated_lines)
 
-def extract_text_from_pdf(pdf_file) -> Tuple[str, int]:
+# Versão do extrator; entra na chave do cache para invalidar extrações antigas
+EXTRACTION_VERSION = f"pypdf2-v2-{'clean' if PAGE_CLEANUP else 'raw'}-max{MAX_PDF_PAGES}"
+# Páginas por faixa na extração em streaming
+STREAM_SHARD_PAGES = 16
+# Os processos de extração já nascem com o PyPDF2 e este módulo importados
+pools.preload("PyPDF2", "pdf_processor")
+
+@contextmanager
+def open_pdf_reader(pdf_file):
+    """
+    Abre um PdfReader sem copiar o arquivo inteiro para a memória.
+    
+    Caminhos são mapeados com mmap e arquivos abertos com seek são lidos
+    diretamente; apenas streams sem seek são copiados para um BytesIO.
+    
+    Args:
+        pdf_file: Arquivo PDF aberto em modo binário ou caminho para o arquivo
+        
+    Yields:
+        PdfReader pronto para leitura página a página
+    """
+    if hasattr(pdf_file, 'read'):  # Se é um arquivo carregado
+        if hasattr(pdf_file, 'seekable') and pdf_file.seekable():
+            yield PyPDF2.PdfReader(pdf_file)
+        else:
+            yield PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
+        return
+    
+    with open(pdf_file, "rb") as f:  # Se é um caminho de arquivo
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # Arquivo vazio ou sem suporte a mmap
+            yield PyPDF2.PdfReader(f)
+            return
+        with mapped:
+            yield PyPDF2.PdfReader(mapped)
+
+def iter_pdf_pages(pdf_file, max_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Extrai o texto de um PDF página a página, sem acumular o documento inteiro.
+    
+    Args:
+        pdf_file: PdfReader já aberto, arquivo PDF ou caminho para o arquivo
+        max_pages: Número máximo de páginas a extrair (None para todas)
+        
+    Yields:
+        Tuples (número da página a partir de 1, texto da página)
+    """
+    if not isinstance(pdf_file, PyPDF2.PdfReader):
+        with open_pdf_reader(pdf_file) as reader:
+            yield from iter_pdf_pages(reader, max_pages)
+        return
+    
+    num_pages = len(pdf_file.pages)
+    if max_pages is not None:
+        num_pages = min(num_pages, max_pages)
+    
+    for page_num in range(num_pages):
+        yield page_num + 1, pdf_file.pages[page_num].extract_text() or ""
+        
+        # O PdfReader guarda todos os objetos já lidos; descartá-los de tempos
+        # em tempos mantém a memória limitada em documentos muito longos
+        if page_num % 16 == 15:
+            pdf_file.resolved_objects.clear()
+
+def _extract_page_range(shard: Tuple[str, int, int]) -> List[str]:
+    """Extrai as páginas [start, stop) abrindo o PDF de forma independente (roda em outro processo)"""
+    pdf_path, start, stop = shard
+    with open_pdf_reader(pdf_path) as pdf_reader:
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def extract_pages_parallel(pdf_path: str, num_pages: int, workers: int = EXTRACTION_WORKERS) -> List[str]:
+    """
+    Extrai o texto das primeiras `num_pages` páginas dividindo-as em faixas
+    contíguas entre processos. Cada processo abre o documento por conta própria
+    e os resultados são juntados na ordem das páginas. Os processos são os do
+    pool compartilhado (ver pdf_summarizer_common.pools), reaproveitados entre
+    as chamadas.
+    
+    Documentos com menos de PARALLEL_MIN_PAGES páginas (ou workers <= 1) são
+    extraídos no próprio processo, onde dividir o trabalho não compensa.
+    
+    Args:
+        pdf_path: Caminho para o arquivo PDF
+        num_pages: Número de páginas a extrair
+        workers: Número de processos
+        
+    Returns:
+        Lista com o texto de cada página, em ordem
+    """
+    if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+        return [page_text for _, page_text in iter_pdf_pages(pdf_path, max_pages=num_pages)]
+    
+    # Mais faixas que processos para equilibrar páginas de custo desigual
+    shard_size = max(1, -(-num_pages // (min(workers, num_pages) * 4)))
+    shards = [(pdf_path, start, min(start + shard_size, num_pages))
+              for start in range(0, num_pages, shard_size)]
+    
+    return [page_text for shard_pages in pools.map(_extract_page_range, shards, workers)
+            for page_text in shard_pages]
+
+@metrics.span("extraction")
+def extract_text_from_pdf(pdf_file, workers: int = EXTRACTION_WORKERS,
+                          cleanup: bool = PAGE_CLEANUP, max_pages: int = MAX_PDF_PAGES) -> Tuple[str, int]:
     """
     Extrai texto de um arquivo PDF carregado via Gradio ou caminho de arquivo.
     
     Args:
         pdf_file: Arquivo PDF ou caminho para o arquivo
+        workers: Processos usados na extração quando pdf_file é um caminho
+        cleanup: Remove cabeçalhos, rodapés e páginas quase duplicadas (ver page_cleaner)
+        max_pages: Máximo de páginas extraídas (0 = todas)
         
     Returns:
-        Tuple contendo o texto extraído e o número de páginas
+        Tuple contendo o texto extraído e o número total de páginas do documento
     """
-    text = ""
-    num_pages = 0
-    
     try:
-        if hasattr(pdf_file, 'read'):  # Se é um arquivo carregado
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        else:  # Se é um caminho de arquivo
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-        num_pages = len(pdf_reader.pages)
-        
-        for page_num in range(min(num_pages, 50)):  # Limite de páginas
-            page = pdf_reader.pages[page_num]
-            text += page.extract_text() + "\n"
+        with open_pdf_reader(pdf_file) as pdf_reader:
+            num_pages = len(pdf_reader.pages)
+            pages_to_extract = min(num_pages, max_pages) if max_pages else num_pages
+            if isinstance(pdf_file, (str, os.PathLike)):
+                pages = extract_pages_parallel(os.fspath(pdf_file), pages_to_extract, workers)
+            else:
+                pages = [page_text for _, page_text in iter_pdf_pages(pdf_reader, pages_to_extract)]
             
     except Exception as e:
         raise Exception(f"Erro ao processar PDF: {str(e)}")
     
+    metrics.incr("pages_total", num_pages)
+    metrics.incr("pages_extracted", len(pages))
+    if cleanup:
+        pages = _clean_pages(pages)
+    
+    text = "".join(page_text + "\n" for page_text in pages)
+    metrics.incr("chars_extracted", len(text))
+    return text, num_pages
+
+def _estimate_chunks(chars: int) -> int:
+    """
+    Estima quantos chunks chunk_offsets geraria para um texto com `chars` caracteres
+    (um pouco abaixo do real, já que os chunks fecham em limites de sentença).
+    
+    Args:
+        chars: Tamanho do texto
+        
+    Returns:
+        Número aproximado de chunks
+    """
+    max_chars = max(1, int(CHUNK_TOKENS * CHARS_PER_TOKEN))
+    if chars <= max_chars:
+        return 1 if chars else 0
+    step = max_chars - min(int(CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN), max_chars // 2)
+    return 1 + math.ceil((chars - max_chars) / step)
+
+def _clean_pages(pages: List[str]) -> List[str]:
+    """
+    Aplica page_cleaner.clean_pages e registra o que foi economizado no documento.
+    
+    Args:
+        pages: Texto de cada página
+        
+    Returns:
+        Páginas limpas
+    """
+    with metrics.span("cleanup"):
+        cleaned, stats = clean_pages(pages)
+    if not stats["chars_removed"]:
+        return cleaned
+    
+    # Chunks economizados: estimados pelo tamanho do texto, sem refazer o chunking do documento
+    chunks_saved = (_estimate_chunks(sum(len(p) + 1 for p in pages))
+                    - _estimate_chunks(sum(len(p) + 1 for p in cleaned)))
+    metrics.incr("cleanup_chars_removed", stats["chars_removed"])
+    metrics.incr("cleanup_lines_removed", stats["lines_removed"])
+    metrics.incr("duplicate_pages", stats["duplicate_pages"])
+    metrics.incr("cleanup_chunks_saved", chunks_saved)
+    print(f"Limpeza: -{stats['chars_removed']:,} caracteres, -{chunks_saved} chunks "
+          f"({stats['lines_removed']} linhas repetidas, {stats['duplicate_pages']} páginas duplicadas)")
+    return cleaned
+
+def extract_text_cached(pdf_path: str, workers: int = EXTRACTION_WORKERS,
+                        file_hash: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Extrai texto de um PDF reaproveitando extrações anteriores do mesmo arquivo.
+    
+    Args:
+        pdf_path: Caminho para o arquivo PDF
+        workers: Processos usados na extração
+        file_hash: Hash do conteúdo já calculado (evita ler o arquivo de novo)
+        
+    Returns:
+        Tuple contendo o texto extraído e o número de páginas
+    """
+    cache = get_cache()
+    if cache is None:
+        return extract_text_from_pdf(pdf_path, workers)
+    
+    file_key = f"{file_hash or hash_file(pdf_path)}:{EXTRACTION_VERSION}"
+    cached = cache.get_extraction(file_key)
+    if cached is not None:
+        metrics.incr("extraction_cache_hits")
+        return cached
+    
+    metrics.incr("extraction_cache_misses")
+    text, num_pages = extract_text_from_pdf(pdf_path, workers)
+    cache.put_extraction(file_key, text, num_pages)
     return text, num_pages
 
-def chunk_text(text: str, chunk_size: int = 4000, overlap: int = 200) -> List[str]:
+def count_pdf_pages(pdf_path: str) -> int:
+    """Número de páginas do PDF (só lê a estrutura, sem extrair texto)"""
+    with open_pdf_reader(pdf_path) as pdf_reader:
+        return len(pdf_reader.pages)
+
+def iter_pages_parallel(pdf_path: str, num_pages: int, workers: int = EXTRACTION_WORKERS,
+                        memory_limit_mb: int = LARGE_DOC_MEMORY_MB) -> Iterator[Tuple[int, str]]:
+    """
+    Extrai as páginas em faixas de STREAM_SHARD_PAGES no pool de processos
+    compartilhado, entregando-as em ordem e mantendo no máximo 2 * workers faixas
+    em andamento. Enquanto o RSS do processo estiver acima de memory_limit_mb, só
+    uma faixa fica em andamento. Se a leitura for interrompida, as faixas ainda
+    não iniciadas são canceladas.
+    
+    Args:
+        pdf_path: Caminho para o arquivo PDF
+        num_pages: Número de páginas a extrair
+        workers: Número de processos
+        memory_limit_mb: Teto de memória (0 desativa o controle)
+        
+    Yields:
+        Tuples (número da página a partir de 1, texto da página)
+    """
+    if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+        yield from iter_pdf_pages(pdf_path, max_pages=num_pages)
+        return
+    
+    shards = ((pdf_path, start, min(start + STREAM_SHARD_PAGES, num_pages))
+              for start in range(0, num_pages, STREAM_SHARD_PAGES))
+    limit = memory_limit_mb * 2**20
+    pending = deque()
+    try:
+        for shard in chain(shards, [None]):
+            # Espera as faixas mais antigas enquanto houver faixas demais ou memória de menos
+            while pending and (shard is None or len(pending) >= 2 * workers
+                               or (limit and metrics.current_rss() > limit)):
+                if shard is not None and len(pending) < 2 * workers:
+                    metrics.incr("memory_throttled")
+                    gc.collect()
+                start, future = pending.popleft()
+                with metrics.span("extraction"):
+                    shard_pages = future.result()
+                for offset, page_text in enumerate(shard_pages):
+                    yield start + offset + 1, page_text
+            if shard is not None:
+                pending.append((shard[1], pools.submit(workers, _extract_page_range, shard)))
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+def iter_document_chunks(pdf_path: str, workers: int = EXTRACTION_WORKERS, cleanup: bool = PAGE_CLEANUP,
+                         max_pages: int = MAX_PDF_PAGES, memory_limit_mb: int = LARGE_DOC_MEMORY_MB,
+                         progress: Optional[Callable[[str, int, int], None]] = None) -> Iterator[str]:
+    """
+    Modo documento grande: extrai, limpa e divide em chunks em streaming, com
+    memória limitada independentemente do número de páginas. Os cabeçalhos e
+    rodapés são aprendidos nas primeiras HEADER_SAMPLE_PAGES páginas.
+    
+    Args:
+        pdf_path: Caminho para o arquivo PDF
+        workers: Processos de extração
+        cleanup: Remove cabeçalhos, rodapés e páginas quase duplicadas
+        max_pages: Máximo de páginas extraídas (0 = todas)
+        memory_limit_mb: Teto de memória da extração (ver iter_pages_parallel)
+        progress: Chamada com (etapa, páginas lidas, total de páginas)
+        
+    Yields:
+        Chunks de texto, na ordem do documento
+    """
+    num_pages = count_pdf_pages(pdf_path)
+    pages_to_extract = min(num_pages, max_pages) if max_pages else num_pages
+    metrics.incr("pages_total", num_pages)
+    pages = iter_pages_parallel(pdf_path, pages_to_extract, workers, memory_limit_mb)
+    
+    cleaner = None
+    if cleanup:
+        sample = list(islice(pages, HEADER_SAMPLE_PAGES))
+        texts = [page_text for _, page_text in sample]
+        cleaner = PageCleaner(find_repeated_lines(texts) if len(texts) >= MIN_REPEATED_PAGES else set())
+        pages = chain(sample, pages)
+    
+    def cleaned_pages() -> Iterator[Tuple[int, str]]:
+        for page_num, page_text in pages:
+            metrics.incr("pages_extracted")
+            if progress:
+                progress("Lendo e resumindo páginas", page_num, pages_to_extract)
+            if cleaner is not None:
+                page_text = cleaner.clean(page_text)
+                if page_text is None:
+                    continue
+            metrics.incr("chars_extracted", len(page_text) + 1)
+            yield page_num, page_text
+    
+    for chunk in iter_text_chunks(cleaned_pages()):
+        metrics.incr("chunks")
+        yield chunk
+    
+    if cleaner is not None:
+        metrics.incr("cleanup_chars_removed", cleaner.stats["chars_removed"])
+        metrics.incr("cleanup_lines_removed", cleaner.stats["lines_removed"])
+        metrics.incr("duplicate_pages", cleaner.stats["duplicate_pages"])
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa rápida do número de tokens de um texto (CHARS_PER_TOKEN caracteres por token).
+    
+    Args:
+        text: Texto a ser medido
+        
+    Returns:
+        Número aproximado de tokens
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+# Fronteiras de parágrafo (linha em branco) e de sentença (pontuação final + espaço)
+_PARAGRAPH_RE = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_RE = re.compile(r"[.!?…][\"'”’)\]]*\s+")
+
+def _boundary_index(text: str) -> Tuple[List[int], List[int]]:
+    """
+    Indexa uma única vez as posições onde um chunk pode terminar.
+    
+    Returns:
+        Tuple (fronteiras de parágrafo, fronteiras de sentença), em ordem crescente.
+        Cada posição é o início do parágrafo/sentença seguinte.
+    """
+    paragraphs = [m.end() for m in _PARAGRAPH_RE.finditer(text)]
+    sentences = [m.end() for m in _SENTENCE_RE.finditer(text)]
+    return paragraphs, sentences
+
+def _next_chunk(text: str, start: int, prev_end: int, max_chars: int, overlap_chars: int,
+                paragraphs: List[int], sentences: List[int]) -> Tuple[int, int]:
+    """
+    Escolhe o fim do chunk que começa em `start` e o início do próximo.
+    
+    O corte prefere, nesta ordem: o último fim de parágrafo na segunda metade
+    da janela, o último fim de sentença, o último espaço e, por fim, um corte
+    seco no limite, sempre depois do fim do chunk anterior (`prev_end`). O
+    próximo chunk começa no primeiro início de sentença dentro da sobreposição
+    e sempre depois de `start`, o que garante progresso.
+    
+    Returns:
+        Tuple (fim do chunk, início do próximo chunk)
+    """
+    limit = start + max_chars
+    if limit >= len(text):
+        return len(text), len(text)
+    
+    floor = max(start, prev_end)
+    i = bisect_right(paragraphs, limit) - 1
+    if i >= 0 and paragraphs[i] > max(floor, start + max_chars // 2):
+        end = paragraphs[i]
+    else:
+        i = bisect_right(sentences, limit) - 1
+        if i >= 0 and sentences[i] > floor:
+            end = sentences[i]
+        else:
+            space = max(text.rfind(" ", floor, limit), text.rfind("\n", floor, limit))
+            end = space + 1 if space != -1 else limit
+    
+    next_start = end
+    if overlap_chars > 0:
+        target = max(start + 1, end - overlap_chars)
+        i = bisect_left(sentences, target)
+        if i < len(sentences) and sentences[i] < end:
+            next_start = sentences[i]
+        else:
+            space = text.find(" ", target, end)
+            next_start = space + 1 if space != -1 else end
+    return end, next_start
+
+def chunk_offsets(text: str, max_tokens: int = CHUNK_TOKENS,
+                  overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[Tuple[int, int]]:
+    """
+    Calcula os limites dos chunks sem copiar o texto.
+    
+    Os chunks são formados juntando parágrafos e sentenças inteiros até o
+    orçamento de tokens (estimado localmente), com sobreposição começando em
+    um início de sentença. Cada chunk começa depois do anterior, então o laço
+    sempre termina, mesmo com sobreposição maior que o chunk.
+    
+    Args:
+        text: Texto completo a ser dividido
+        max_tokens: Tamanho máximo de cada chunk em tokens
+        overlap_tokens: Sobreposição entre chunks em tokens
+        
+    Returns:
+        Lista de (início, fim) de cada chunk
+    """
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    overlap_chars = min(int(overlap_tokens * CHARS_PER_TOKEN), max_chars // 2)
+    if len(text) <= max_chars:
+        return [(0, len(text))]
+    
+    paragraphs, sentences = _boundary_index(text)
+    offsets = []
+    start = end = 0
+    while start < len(text):
+        end, next_start = _next_chunk(text, start, end, max_chars, overlap_chars, paragraphs, sentences)
+        offsets.append((start, end))
+        start = next_start
+    return offsets
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS,
+               overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
     """
     Divide o texto em chunks menores para processamento.
     
     Args:
         text: Texto completo a ser dividido
-        chunk_size: Tamanho máximo de cada chunk
-        overlap: Sobreposição entre chunks para manter contexto
+        max_tokens: Tamanho máximo de cada chunk em tokens
+        overlap_tokens: Sobreposição entre chunks para manter contexto
         
     Returns:
         Lista de chunks de texto
     """
-    if len(text) <= chunk_size:
-        return [text]
+    with metrics.span("chunking"):
+        chunks = [text[start:end] for start, end in chunk_offsets(text, max_tokens, overlap_tokens)]
+    metrics.incr("chunks", len(chunks))
+    return chunks
+
+def iter_text_chunks(pages: Iterable[Tuple[int, str]], max_tokens: int = CHUNK_TOKENS,
+                     overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> Iterator[str]:
+    """
+    Divide em chunks o texto produzido por iter_pdf_pages à medida que as
+    páginas chegam, mantendo em memória apenas algumas páginas por vez.
     
-    chunks = []
-    start = 0
+    Args:
+        pages: Iterável de (número da página, texto)
+        max_tokens: Tamanho máximo de cada chunk em tokens
+        overlap_tokens: Sobreposição entre chunks em tokens
+        
+    Yields:
+        Chunks de texto, na ordem do documento (os mesmos de chunk_text no texto completo)
+    """
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    overlap_chars = min(int(overlap_tokens * CHARS_PER_TOKEN), max_chars // 2)
     
-    while start < len(text):
-        end = start + chunk_size
-        # Garantir que não quebramos no meio de uma palavra
-        if end < len(text):
-            while end > start and text[end] not in (' ', '\n', '.', ',', ';', ':'):
-                end -= 1
-            if end == start:  # Fallback se não encontrar caractere de quebra
-                end = start + chunk_size
-                
-        chunks.append(text[start:end])
-        start = end - overlap  # Adiciona sobreposição
-        
-    return chunks
\ No newline at end of file
+    buffer = ""
+    start = end = 0
+    for _, page_text in pages:
+        buffer += page_text + "\n"
+        if len(buffer) - start <= 2 * max_chars:
+            continue
+        
+        # Só emite chunks cuja janela inteira já chegou; o resto espera a próxima página
+        paragraphs, sentences = _boundary_index(buffer)
+        while start + max_chars < len(buffer) - 1:
+            end, next_start = _next_chunk(buffer, start, end, max_chars, overlap_chars, paragraphs, sentences)
+            yield buffer[start:end]
+            start = next_start
+        
+        # Mantém um pouco de texto antes do início para reconhecer a pontuação anterior
+        margin = max(0, start - 64)
+        buffer = buffer[margin:]
+        start -= margin
+        end -= margin
+    
+    paragraphs, sentences = _boundary_index(buffer)
+    while start < len(buffer):
+        end, next_start = _next_chunk(buffer, start, end, max_chars, overlap_chars, paragraphs, sentences)
+        yield buffer[start:end]
+        start = next_start
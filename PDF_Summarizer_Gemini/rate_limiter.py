@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional
+
+class TokenBucket:
+    """
+    Token bucket com reserva antecipada: cada chamada desconta a quantidade
+    pedida imediatamente (o saldo pode ficar negativo) e espera o tempo
+    necessário para o saldo voltar a zero. Isso mantém a ordem de chegada
+    sem laços de espera ativa.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate_per_minute: Quantidade reposta por minuto
+            capacity: Tamanho máximo da rajada (padrão: rate_per_minute)
+            clock: Relógio monotônico (substituível em testes)
+            sleep: Função de espera (substituível em testes)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Reserva `amount` unidades sem esperar.
+        
+        Returns:
+            Tempo em segundos que o chamador deve esperar antes de usá-las
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Reserva `amount` unidades, bloqueando até que estejam disponíveis.
+        
+        Returns:
+            Tempo de espera em segundos
+        """
+        wait = self.reserve(amount)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+class RateLimiter:
+    """
+    Combina limite de requisições/minuto, tokens/minuto e número máximo de
+    chamadas simultâneas à API.
+    
+    As chamadas assíncronas (slot_async) usam os mesmos limites por minuto,
+    mas têm seu próprio limite de simultaneidade por event loop
+    (max_async_in_flight), já que não ocupam uma thread cada.
+    """
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_in_flight: int,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 max_async_in_flight: Optional[int] = None):
+        self.requests = TokenBucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, sleep=sleep)
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+        self.max_async_in_flight = max(1, max_async_in_flight or max_in_flight)
+        # Os semáforos guardam o loop em que foram usados: as entradas de loops fechados são removidas
+        self._async_in_flight: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._async_lock = threading.Lock()
+    
+    @contextmanager
+    def slot(self, tokens: int = 0):
+        """
+        Ocupa uma vaga de chamada à API respeitando todos os limites.
+        
+        Args:
+            tokens: Estimativa de tokens consumidos pela chamada
+        """
+        with self._in_flight:
+            self.requests.acquire(1)
+            if tokens:
+                self.tokens.acquire(tokens)
+            yield
+    
+    @asynccontextmanager
+    async def slot_async(self, tokens: int = 0):
+        """
+        Versão assíncrona de slot(): espera com asyncio.sleep, sem bloquear o event loop.
+        
+        Args:
+            tokens: Estimativa de tokens consumidos pela chamada
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            for closed in [other for other in self._async_in_flight if other.is_closed()]:
+                del self._async_in_flight[closed]
+            semaphore = self._async_in_flight.get(loop)
+            if semaphore is None:
+                semaphore = self._async_in_flight[loop] = asyncio.Semaphore(self.max_async_in_flight)
+        async with semaphore:
+            wait = self.requests.reserve(1)
+            if tokens:
+                wait = max(wait, self.tokens.reserve(tokens))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
@@ -1,6 +1,19 @@
+import asyncio
 import google.generativeai as genai
-from typing import List, Optional
-from config import GEMINI_API_KEY, MODEL_NAME, MAX_TOKENS, TEMPERATURE, SUMMARY_PROMPT
+from typing import Awaitable, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from config import (GEMINI_API_KEY, MODEL_NAME, FALLBACK_MODELS, MODEL_CACHE_TTL,
+                    MAX_TOKENS, TEMPERATURE, SUMMARY_PROMPT,
+                    RATE_LIMIT_RPM, RATE_LIMIT_TPM, MAX_IN_FLIGHT, ASYNC_MAX_IN_FLIGHT, MAX_RETRIES, RETRY_BASE_DELAY,
+                    MAX_INPUT_CHARS, CHUNK_SUMMARY_WORDS, REDUCE_FAN_IN, REDUCE_TOKEN_BUDGET,
+                    MAX_REDUCE_LEVELS, PREFILTER_RATIO)
+from pdf_processor import chunk_text, estimate_tokens
+from rate_limiter import RateLimiter
+from cache import get_cache
+from file_utils import hash_text
+from pdf_summarizer_common import metrics
+import random
+import threading
 import time
 
 # Configurar a API
@@ -23,100 +36,869 @@ def check_model_availability(model_name: str) -> bool:
     available_models = get_available_models()
     return any(model_name in model for model in available_models)
 
-def generate_summary(text: str, max_length: int = 300) -> str:
+# Registro de modelos: resolve o modelo uma vez por processo (com TTL) e
+# reaproveita o GenerativeModel configurado para cada generation_config
+_registry_lock = threading.Lock()
+_resolved_model: Optional[str] = None
+_resolved_at = 0.0
+_model_clients: Dict[Tuple, "genai.GenerativeModel"] = {}
+# Modelos do caminho assíncrono, por event loop (ver get_async_model). Os clientes
+# guardam referências ao próprio loop, então as entradas de loops fechados são
+# removidas explicitamente
+_async_models: Dict[asyncio.AbstractEventLoop, Dict[Tuple, "genai.GenerativeModel"]] = {}
+
+def resolve_model_name(force_refresh: bool = False) -> Optional[str]:
     """
-    Gera um resumo para o texto fornecido usando a API do Gemini.
+    Resolve o modelo a ser usado (MODEL_NAME ou um dos FALLBACK_MODELS).
+    
+    A consulta a list_models() é feita no máximo uma vez a cada MODEL_CACHE_TTL
+    segundos; falhas não são guardadas em cache.
+    
+    Args:
+        force_refresh: Ignora o cache e consulta a API novamente
+        
+    Returns:
+        Nome do modelo disponível ou None se nenhum estiver disponível
+    """
+    global _resolved_model, _resolved_at
+    
+    with _registry_lock:
+        if (not force_refresh and _resolved_model is not None
+                and time.monotonic() - _resolved_at < MODEL_CACHE_TTL):
+            return _resolved_model
+        
+        available_models = get_available_models()
+        candidates = [MODEL_NAME] + [m for m in FALLBACK_MODELS if m != MODEL_NAME]
+        for candidate in candidates:
+            if any(candidate in model for model in available_models):
+                _resolved_model = candidate
+                _resolved_at = time.monotonic()
+                return candidate
+        
+        _resolved_model = None
+        return None
+
+def get_generation_config() -> dict:
+    """Configuração de geração padrão usada nos resumos"""
+    return {
+        "temperature": TEMPERATURE,
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": MAX_TOKENS,
+    }
+
+def get_model(generation_config: Optional[dict] = None) -> Optional["genai.GenerativeModel"]:
+    """
+    Retorna o GenerativeModel em cache para (modelo resolvido, generation_config).
+    
+    Args:
+        generation_config: Configuração de geração (padrão: get_generation_config())
+        
+    Returns:
+        Instância reutilizável de GenerativeModel ou None se nenhum modelo estiver disponível
+    """
+    model_name = resolve_model_name()
+    if model_name is None:
+        return None
+    
+    if generation_config is None:
+        generation_config = get_generation_config()
+    key = (model_name, tuple(sorted(generation_config.items())))
+    
+    with _registry_lock:
+        model = _model_clients.get(key)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=generation_config
+            )
+            _model_clients[key] = model
+    return model
+
+def clear_model_cache():
+    """Descarta o modelo resolvido e os clientes GenerativeModel em cache"""
+    global _resolved_model
+    with _registry_lock:
+        _resolved_model = None
+        _model_clients.clear()
+        _async_models.clear()
+
+def refresh_models() -> Optional[str]:
+    """
+    Descarta o modelo resolvido e os clientes em cache e resolve novamente.
+    Útil após trocar a API key ou quando um modelo deixa de estar disponível.
+    """
+    clear_model_cache()
+    return resolve_model_name(force_refresh=True)
+
+# Limitador compartilhado por todas as chamadas à API deste processo
+_rate_limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM, MAX_IN_FLIGHT, max_async_in_flight=ASYNC_MAX_IN_FLIGHT)
+
+def _is_retryable(error: Exception) -> bool:
+    """Erros 429 (rate limit) e 5xx são temporários e merecem nova tentativa"""
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(error, "status_code", None)  # exceções do cliente da OpenAI
+    return isinstance(code, int) and (code == 429 or 500 <= code < 600)
+
+def _generate_with_retry(model, prompt: str):
+    """
+    Chama model.generate_content respeitando o limitador de taxa e repetindo
+    com backoff exponencial (com jitter) em erros temporários.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    tokens = prompt_tokens + MAX_TOKENS
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with _rate_limiter.slot(tokens):
+                metrics.incr("api_calls")
+                metrics.incr("tokens_in", prompt_tokens)
+                with metrics.span("llm_call"):
+                    response = model.generate_content(prompt)
+                metrics.incr("tokens_out", estimate_tokens(response.text))
+                return response
+        except Exception as e:
+            metrics.incr("api_errors")
+            if attempt >= MAX_RETRIES or not _is_retryable(e):
+                raise
+            metrics.incr("api_retries")
+            delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Erro temporário da API ({e}). Nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+
+class SummaryStreamError(Exception):
+    """O streaming falhou depois de já ter entregue parte do resumo"""
+
+def _stream_with_retry(model, prompt: str) -> Iterator[str]:
+    """
+    Versão em streaming de _generate_with_retry: devolve os trechos do texto à
+    medida que a API os gera. Erros temporários só são repetidos enquanto
+    nenhum trecho foi entregue.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    tokens = prompt_tokens + MAX_TOKENS
+    for attempt in range(MAX_RETRIES + 1):
+        emitted = False
+        try:
+            with _rate_limiter.slot(tokens):
+                metrics.incr("api_calls")
+                metrics.incr("tokens_in", prompt_tokens)
+                with metrics.span("llm_call"):
+                    for chunk in model.generate_content(prompt, stream=True):
+                        if chunk.text:
+                            emitted = True
+                            metrics.incr("tokens_out", estimate_tokens(chunk.text))
+                            yield chunk.text
+            return
+        except Exception as e:
+            metrics.incr("api_errors")
+            if emitted or attempt >= MAX_RETRIES or not _is_retryable(e):
+                raise
+            metrics.incr("api_retries")
+            delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Erro temporário da API ({e}). Nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+
+async def _generate_with_retry_async(model, prompt: str):
+    """
+    Versão assíncrona de _generate_with_retry (model.generate_content_async).
+    Cancelar a tarefa interrompe a espera ou a chamada em andamento.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    tokens = prompt_tokens + MAX_TOKENS
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with _rate_limiter.slot_async(tokens):
+                metrics.incr("api_calls")
+                metrics.incr("tokens_in", prompt_tokens)
+                with metrics.span("llm_call"):
+                    response = await model.generate_content_async(prompt)
+                metrics.incr("tokens_out", estimate_tokens(response.text))
+                return response
+        except Exception as e:
+            metrics.incr("api_errors")
+            if attempt >= MAX_RETRIES or not _is_retryable(e):
+                raise
+            metrics.incr("api_retries")
+            delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Erro temporário da API ({e}). Nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def summary_cache_key(text: str, model_name: str, max_length: int) -> str:
+    """
+    Chave do cache de resumos: hash do texto, modelo, parâmetros de geração e prompt.
     
     Args:
         text: Texto a ser resumido
-        max_length: Comprimento máximo aproximado do resumo em palavras
+        model_name: Modelo que vai gerar o resumo
+        max_length: Comprimento máximo do resumo em palavras
         
     Returns:
-        Texto resumido
+        Hash hexadecimal que identifica o resumo
     """
+    config = get_generation_config()
+    params = (f"{hash_text(text)}|{model_name}|{config['temperature']}|{config['top_p']}|"
+              f"{config['top_k']}|{config['max_output_tokens']}|{max_length}|{hash_text(SUMMARY_PROMPT)}")
+    return hash_text(params)
+
+def _check_input(text: str, check_key: bool = True) -> Optional[str]:
+    """Mensagem de erro se o texto estiver vazio ou a API key do Gemini não estiver configurada"""
     if not text or not text.strip():
         return "Nenhum texto válido para resumir."
     
-    if not GEMINI_API_KEY or GEMINI_API_KEY == "sua_chave_api_aqui":
+    if check_key and (not GEMINI_API_KEY or GEMINI_API_KEY == "sua_chave_api_aqui"):
         return "Erro: API key não configurada. Por favor, defina GEMINI_API_KEY no arquivo .env"
     
+    return None
+
+def _build_prompt(text: str, max_length: int) -> str:
+    """Prompt de resumo; textos acima de MAX_INPUT_CHARS são cortados e o corte é contabilizado"""
+    if len(text) > MAX_INPUT_CHARS:
+        metrics.incr("input_chars_truncated", len(text) - MAX_INPUT_CHARS)
+        print(f"Aviso: texto de {len(text):,} caracteres cortado em {MAX_INPUT_CHARS:,} (use summarize_large_text)")
+    return SUMMARY_PROMPT.format(max_length=max_length, text=text[:MAX_INPUT_CHARS])
+
+def generate_summary(text: str, max_length: int = 300, model=None, model_name: Optional[str] = None) -> str:
+    """
+    Gera um resumo para o texto fornecido usando a API do Gemini.
+    
+    Args:
+        text: Texto a ser resumido
+        max_length: Comprimento máximo aproximado do resumo em palavras
+        model: Modelo alternativo com a interface de genai.GenerativeModel
+            (usado pelos backends de backends.py); padrão: Gemini
+        model_name: Nome do modelo alternativo (entra na chave do cache)
+        
+    Returns:
+        Texto resumido
+    """
+    error = _check_input(text, check_key=model is None)
+    if error:
+        return error
+    
     try:
-        # Verificar se o modelo está disponível
-        if not check_model_availability(MODEL_NAME):
-            # Tentar modelos alternativos se o principal não estiver disponível
-            alternative_models = ["gemini-1.0-pro", "gemini-1.5-flash", "gemini-pro"]
-            for alt_model in alternative_models:
-                if check_model_availability(alt_model):
-                    actual_model = alt_model
-                    break
-            else:
+        # Modelo resolvido e cliente reutilizados entre chamadas (ver get_model)
+        if model is None:
+            model = get_model()
+            if model is None:
                 return "Erro: Nenhum modelo Gemini disponível. Verifique sua API key e acesso."
-        else:
-            actual_model = MODEL_NAME
-        
-        # Configurar o modelo
-        generation_config = {
-            "temperature": TEMPERATURE,
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": MAX_TOKENS,
-        }
-        
-        # Inicializar o modelo
-        model = genai.GenerativeModel(
-            model_name=actual_model,
-            generation_config=generation_config
-        )
+            model_name = resolve_model_name()
+        
+        # Reaproveitar resumo já gerado para o mesmo texto e parâmetros
+        cache = get_cache()
+        if cache is not None:
+            cache_key = summary_cache_key(text, model_name, max_length)
+            cached = cache.get_summary(cache_key)
+            if cached is not None:
+                metrics.incr("summary_cache_hits")
+                return cached
+            metrics.incr("summary_cache_misses")
         
         # Preparar o prompt
-        prompt = SUMMARY_PROMPT.format(max_length=max_length, text=text[:10000])
+        prompt = _build_prompt(text, max_length)
         
         # Gerar o resumo
-        response = model.generate_content(prompt)
+        response = _generate_with_retry(model, prompt)
+        
+        if cache is not None:
+            cache.put_summary(cache_key, response.text)
         
         return response.text
         
     except Exception as e:
         return f"Erro ao gerar resumo: {str(e)}"
 
-def summarize_large_text(text: str, max_length: int = 300) -> str:
+def generate_summary_stream(text: str, max_length: int = 300, model=None,
+                            model_name: Optional[str] = None) -> Iterator[str]:
+    """
+    Como generate_summary, mas entrega o resumo em trechos à medida que o
+    Gemini os gera (generate_content com stream=True).
+    
+    Args:
+        text: Texto a ser resumido
+        max_length: Comprimento máximo aproximado do resumo em palavras
+        model: Modelo alternativo (ver generate_summary)
+        model_name: Nome do modelo alternativo
+        
+    Yields:
+        Trechos consecutivos do resumo (ou uma mensagem de erro, se a falha
+        acontecer antes do primeiro trecho)
+        
+    Raises:
+        SummaryStreamError: se a API falhar depois de algum trecho ter sido
+            entregue; a mensagem de erro não é misturada ao resumo parcial
+    """
+    error = _check_input(text, check_key=model is None)
+    if error:
+        yield error
+        return
+    
+    parts = []
+    try:
+        if model is None:
+            model = get_model()
+            if model is None:
+                yield "Erro: Nenhum modelo Gemini disponível. Verifique sua API key e acesso."
+                return
+            model_name = resolve_model_name()
+        
+        cache = get_cache()
+        if cache is not None:
+            cache_key = summary_cache_key(text, model_name, max_length)
+            cached = cache.get_summary(cache_key)
+            if cached is not None:
+                metrics.incr("summary_cache_hits")
+                yield cached
+                return
+            metrics.incr("summary_cache_misses")
+        
+        prompt = _build_prompt(text, max_length)
+        
+        for piece in _stream_with_retry(model, prompt):
+            parts.append(piece)
+            yield piece
+        
+        if cache is not None:
+            cache.put_summary(cache_key, "".join(parts))
+        
+    except Exception as e:
+        if parts:
+            raise SummaryStreamError(f"resumo interrompido após {len(parts)} trechos: {e}") from e
+        yield f"Erro ao gerar resumo: {str(e)}"
+
+def _backend_functions(backend) -> Tuple[Callable[[str, int], str], Callable[[str, int], Iterator[str]]]:
+    """Funções (resumo, resumo em streaming) do backend; None usa o Gemini deste módulo"""
+    if backend is None:
+        return generate_summary, generate_summary_stream
+    return backend.summarize, backend.stream
+
+def iter_chunk_summaries(chunks: Iterable[str], max_length: int, backend=None,
+                         max_pending: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Resume vários chunks em paralelo (limitado por MAX_IN_FLIGHT e pelo
+    limitador de taxa) e entrega cada resumo assim que fica pronto.
+    
+    Args:
+        chunks: Textos a resumir (lista ou iterável produzido sob demanda)
+        max_length: Comprimento máximo de cada resumo em palavras
+        backend: SummaryBackend a usar (padrão: Gemini, ver backends.py)
+        max_pending: Máximo de chunks lidos e ainda não resumidos; o iterável
+            só é consumido quando há vaga (None = consome tudo de uma vez)
+        
+    Yields:
+        Tuple (índice do chunk, resumo), na ordem de conclusão
+    """
+    workers = min(MAX_IN_FLIGHT, len(chunks)) if isinstance(chunks, list) else MAX_IN_FLIGHT
+    if not workers:
+        return
+    
+    summarize, _ = _backend_functions(backend)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        try:
+            for i, chunk in enumerate(chunks):
+                if max_pending and len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield futures.pop(future), future.result()
+                futures[metrics.submit_with_context(executor, summarize, chunk, max_length)] = i
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Consumidor desistiu (ex.: trabalho cancelado): não inicia as chamadas que ainda não começaram
+            for future in futures:
+                future.cancel()
+
+def summarize_chunks(chunks: List[str], max_length: int,
+                     progress: Optional[Callable[[int, int], None]] = None, backend=None) -> List[str]:
+    """
+    Resume vários chunks em paralelo, limitado por MAX_IN_FLIGHT e pelo
+    limitador de taxa compartilhado.
+    
+    Args:
+        chunks: Lista de textos a resumir
+        max_length: Comprimento máximo de cada resumo em palavras
+        progress: Chamada com (concluídos, total) a cada chunk resumido
+        backend: SummaryBackend a usar (padrão: Gemini)
+        
+    Returns:
+        Lista de resumos na mesma ordem dos chunks
+    """
+    total = len(chunks)
+    summaries = [""] * total
+    
+    for done, (i, summary) in enumerate(iter_chunk_summaries(chunks, max_length, backend), 1):
+        summaries[i] = summary
+        print(f"Chunk {i+1}/{total} concluído")
+        if progress:
+            progress(done, total)
+    
+    return summaries
+
+def batch_summaries(summaries: List[str], token_budget: int = REDUCE_TOKEN_BUDGET,
+                    fan_in: int = REDUCE_FAN_IN) -> List[List[str]]:
+    """
+    Agrupa resumos consecutivos em lotes de até `fan_in` itens e `token_budget` tokens.
+    
+    Args:
+        summaries: Resumos parciais em ordem
+        token_budget: Máximo de tokens estimados por lote
+        fan_in: Máximo de resumos por lote
+        
+    Returns:
+        Lista de lotes, preservando a ordem
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if current and (len(current) >= fan_in or current_tokens + tokens > token_budget):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(summary)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+def _plan_reduction(summaries: List[str], max_length: int) -> Generator[Tuple[int, List[str]], List[str],
+                                                                        Tuple[str, bool]]:
+    """
+    Planejamento da redução em árvore, sem fazer chamadas: compartilhado pelo
+    caminho com threads (iter_reduced_summary) e pelo assíncrono. Resumos com
+    erro são descartados; se nenhum sobrar, o resultado é o primeiro erro, e
+    não um resumo vazio.
+    
+    Yields:
+        (nível, textos dos lotes) de cada rodada; quem conduz envia de volta
+        (send) os resumos desses textos, na mesma ordem
+        
+    Returns:
+        (resumos combinados, se ainda precisam de um resumo final)
+    """
+    errors = [s for s in summaries if s.startswith("Erro")]
+    summaries = [s for s in summaries if not s.startswith("Erro")]
+    level = 0
+    while summaries:
+        batches = batch_summaries(summaries)
+        if len(batches) == 1 or level >= MAX_REDUCE_LEVELS:
+            break
+        
+        level += 1
+        print(f"Redução nível {level}: {len(summaries)} resumos em {len(batches)} lotes")
+        reduced = yield level, ["\n\n".join(batch) for batch in batches]
+        errors += [s for s in reduced if s.startswith("Erro")]
+        summaries = [s for s in reduced if not s.startswith("Erro")]
+    
+    if not summaries and errors:
+        return errors[0], False
+    
+    combined_summary = " ".join(summaries)
+    return combined_summary, len(combined_summary.split()) > max_length * 1.2
+
+def iter_reduced_summary(summaries: List[str], max_length: int = 300,
+                         progress: Optional[Callable[[str, int, int], None]] = None,
+                         backend=None) -> Iterator[str]:
+    """
+    Combina resumos parciais em um único resumo por redução em árvore: os
+    resumos são agrupados em lotes que cabem no orçamento de tokens, cada lote
+    é resumido em paralelo e o processo se repete até restar um único lote.
+    Assim nenhum resumo parcial é cortado pelo limite de entrada e o número de
+    rodadas sequenciais cresce com log(n). A última chamada é feita em
+    streaming.
+    
+    Args:
+        summaries: Resumos parciais em ordem
+        max_length: Comprimento máximo do resumo final em palavras
+        progress: Chamada com (etapa, concluídos, total) durante o processamento
+        backend: SummaryBackend a usar (padrão: Gemini)
+        
+    Yields:
+        Trechos consecutivos do resumo final
+    """
+    plan = _plan_reduction(summaries, max_length)
+    reduced = None
+    while True:
+        try:
+            level, texts = plan.send(reduced)
+        except StopIteration as done:
+            combined_summary, needs_final = done.value
+            break
+        stage = f"Combinando resumos (nível {level})"
+        reduced = summarize_chunks(texts, CHUNK_SUMMARY_WORDS,
+                                   progress and (lambda done, total: progress(stage, done, total)), backend)
+    
+    # Se ainda for muito longo, faz um resumo do resumo
+    if needs_final:
+        if progress:
+            progress("Resumo final", 0, 1)
+        _, stream = _backend_functions(backend)
+        yield from stream(combined_summary, max_length)
+    else:
+        yield combined_summary
+
+def reduce_summaries(summaries: List[str], max_length: int = 300,
+                     progress: Optional[Callable[[str, int, int], None]] = None, backend=None) -> str:
+    """
+    Combina resumos parciais em um único resumo (ver iter_reduced_summary).
+    
+    Returns:
+        Resumo final
+    """
+    return "".join(iter_reduced_summary(summaries, max_length, progress, backend))
+
+def prefilter_text(text: str, keep_ratio: float) -> str:
+    """
+    Pré-filtro extrativo: ranqueia as sentenças localmente (TextRank) e mantém
+    só as mais relevantes, na ordem do documento, para reduzir os tokens
+    enviados ao LLM.
+    
+    Args:
+        text: Texto completo
+        keep_ratio: Fração do texto (em caracteres) a manter
+        
+    Returns:
+        Texto reduzido
+    """
+    from extractive import prefilter  # numpy/scipy/sklearn só quando usado
+    
+    with metrics.span("prefilter"):
+        filtered = prefilter(text, keep_ratio)
+    metrics.incr("prefilter_chars_removed", max(0, len(text) - len(filtered)))
+    print(f"Pré-filtro: {len(text):,} -> {len(filtered):,} caracteres")
+    return filtered
+
+def stream_summary(text: str, max_length: int = 300,
+                   progress: Optional[Callable[[str, int, int], None]] = None,
+                   backend=None, prefilter_ratio: Optional[float] = None) -> Iterator[Tuple[str, int, str]]:
+    """
+    Resume um texto longo entregando os resultados à medida que ficam prontos:
+    primeiro o resumo de cada chunk, na ordem em que terminam, depois o resumo
+    final em trechos.
+    
+    Args:
+        text: Texto a ser resumido
+        max_length: Comprimento máximo do resumo final em palavras
+        progress: Chamada com (etapa, concluídos, total) durante o processamento
+        backend: SummaryBackend a usar (padrão: Gemini)
+        prefilter_ratio: Fração do texto enviada ao LLM após o pré-filtro
+            extrativo (padrão: PREFILTER_RATIO; 0 ou 1 desativa)
+        
+    Yields:
+        ("parcial", índice do chunk, resumo do chunk) e depois
+        ("final", -1, trecho do resumo final)
+    """
+    map_reduce = backend is None or backend.map_reduce
+    if prefilter_ratio is None:
+        prefilter_ratio = PREFILTER_RATIO
+    if map_reduce and len(text) >= 5000 and 0 < prefilter_ratio < 1:
+        if progress:
+            progress("Selecionando frases relevantes", 0, 0)
+        text = prefilter_text(text, prefilter_ratio)
+    
+    # Se o texto for curto (ou o backend resume o documento inteiro de uma vez), resume diretamente
+    if len(text) < 5000 or not map_reduce:
+        _, stream = _backend_functions(backend)
+        for piece in stream(text, max_length):
+            yield "final", -1, piece
+        return
+    
+    yield from stream_chunked_summary(chunk_text(text), max_length, progress, backend)
+
+def stream_chunked_summary(chunks: Iterable[str], max_length: int = 300,
+                           progress: Optional[Callable[[str, int, int], None]] = None,
+                           backend=None, max_pending: Optional[int] = None) -> Iterator[Tuple[str, int, str]]:
+    """
+    Map-reduce sobre chunks já divididos: resume cada chunk em paralelo e
+    combina os resumos parciais (ver iter_reduced_summary).
+    
+    Com um iterável preguiçoso (modo documento grande, ver
+    pdf_processor.iter_document_chunks) e max_pending, só alguns chunks ficam
+    em memória por vez; o que se acumula são os resumos parciais, de tamanho
+    fixo (CHUNK_SUMMARY_WORDS).
+    
+    Args:
+        chunks: Lista de chunks ou iterável produzido sob demanda
+        max_length: Comprimento máximo do resumo final em palavras
+        progress: Chamada com (etapa, concluídos, total); o total só é
+            informado quando chunks é uma lista
+        backend: SummaryBackend a usar (padrão: Gemini)
+        max_pending: Máximo de chunks lidos e ainda não resumidos
+        
+    Yields:
+        ("parcial", índice do chunk, resumo do chunk) e depois
+        ("final", -1, trecho do resumo final)
+    """
+    total = len(chunks) if isinstance(chunks, list) else None
+    
+    # Gera resumo para cada chunk (em paralelo). O tamanho dos resumos
+    # parciais é fixo para não depender do número de chunks.
+    chunk_summaries: Dict[int, str] = {}
+    for done, (i, summary) in enumerate(iter_chunk_summaries(chunks, CHUNK_SUMMARY_WORDS, backend,
+                                                             max_pending), 1):
+        chunk_summaries[i] = summary
+        print(f"Chunk {i+1}/{total or '?'} concluído")
+        if progress and total:
+            progress("Resumindo partes", done, total)
+        yield "parcial", i, summary
+    
+    summaries = [chunk_summaries[i] for i in sorted(chunk_summaries)]
+    for piece in iter_reduced_summary(summaries, max_length, progress, backend):
+        yield "final", -1, piece
+
+def summarize_large_text(text: str, max_length: int = 300,
+                         progress: Optional[Callable[[str, int, int], None]] = None, backend=None,
+                         prefilter_ratio: Optional[float] = None) -> str:
     """
     Resume textos longos dividindo-os em partes e resumindo cada parte.
     
     Args:
         text: Texto longo a ser resumido
         max_length: Comprimento máximo do resumo final em palavras
+        progress: Chamada com (etapa, concluídos, total) durante o processamento
+        backend: SummaryBackend a usar (padrão: Gemini)
+        prefilter_ratio: Fração do texto enviada ao LLM (ver stream_summary)
         
     Returns:
         Texto resumido
     """
-    from pdf_processor import chunk_text
+    return "".join(piece for kind, _, piece in stream_summary(text, max_length, progress, backend, prefilter_ratio)
+                   if kind == "final")
+
+# Caminho assíncrono: muitas chamadas simultâneas em um único event loop, sem
+# uma thread bloqueada por chamada. O cliente gRPC assíncrono fica preso ao
+# event loop em que foi criado, e o padrão do google.generativeai é global
+# (o do primeiro loop que o usou); por isso cada event loop tem seus próprios
+# GenerativeModel e cliente, reaproveitados entre as chamadas daquele loop.
+
+def _new_async_client():
+    """
+    Cliente assíncrono novo com a configuração de genai.configure.
+    
+    O google.generativeai não expõe isso publicamente: é usado o gerenciador
+    de clientes interno da versão fixada em requirements.txt.
+    """
+    from google.generativeai import client
+    manager = getattr(client, "_client_manager", None)
+    if not callable(getattr(manager, "make_client", None)):
+        raise RuntimeError(f"google-generativeai {getattr(genai, '__version__', '?')} não é compatível com o "
+                           "caminho assíncrono; instale a versão fixada em requirements.txt")
+    return manager.make_client("generative_async")
+
+def get_async_model(model_name: str, generation_config: Optional[dict] = None) -> "genai.GenerativeModel":
+    """
+    Retorna o GenerativeModel do event loop atual para (modelo, generation_config).
+    Deve ser chamada dentro do event loop: o cliente é criado nele.
     
-    # Se o texto for curto, resume diretamente
-    if len(text) < 5000:
-        return generate_summary(text, max_length)
+    Args:
+        model_name: Modelo resolvido (ver resolve_model_name)
+        generation_config: Configuração de geração (padrão: get_generation_config())
+        
+    Returns:
+        Instância de GenerativeModel reutilizável só neste event loop
+    """
+    loop = asyncio.get_running_loop()
+    if generation_config is None:
+        generation_config = get_generation_config()
+    key = (model_name, tuple(sorted(generation_config.items())))
     
-    # Divide o texto em chunks
-    chunks = chunk_text(text)
-    summaries = []
+    with _registry_lock:
+        for closed in [other for other in _async_models if other.is_closed()]:
+            del _async_models[closed]
+        models = _async_models.setdefault(loop, {})
+        model = models.get(key)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=generation_config
+            )
+            if getattr(model, "_async_client", False) is None:  # google.generativeai: criado sob demanda, global
+                model._async_client = _new_async_client()
+            models[key] = model
+    return model
+
+async def _resolve_async_model() -> Tuple[Optional["genai.GenerativeModel"], Optional[str]]:
+    model_name = _resolved_model if time.monotonic() - _resolved_at < MODEL_CACHE_TTL else None
+    if model_name is None:
+        # Resolver o modelo pode consultar a API (list_models): fora do event loop
+        model_name = await asyncio.to_thread(resolve_model_name)
+    if model_name is None:
+        return None, None
+    return get_async_model(model_name), model_name
+
+def _timeout_message(timeout: float) -> str:
+    return f"Erro ao gerar resumo: prazo de {timeout:g}s esgotado"
+
+async def generate_summary_async(text: str, max_length: int = 300, model=None, model_name: Optional[str] = None,
+                                 timeout: Optional[float] = None) -> str:
+    """
+    Versão assíncrona de generate_summary.
     
-    # Gera resumo para cada chunk
-    for i, chunk in enumerate(chunks):
-        print(f"Processando chunk {i+1}/{len(chunks)}")
-        chunk_summary = generate_summary(chunk, max_length // len(chunks))
-        if not chunk_summary.startswith("Erro"):
-            summaries.append(chunk_summary)
-        time.sleep(0.5)  # Pequena pausa para evitar rate limiting
+    Args:
+        text: Texto a ser resumido
+        max_length: Comprimento máximo aproximado do resumo em palavras
+        model: Modelo alternativo com generate_content_async (padrão: Gemini)
+        model_name: Nome do modelo alternativo (entra na chave do cache)
+        timeout: Prazo da requisição em segundos (None = sem prazo)
+        
+    Returns:
+        Texto resumido (ou mensagem de erro, inclusive se o prazo esgotar)
+    """
+    error = _check_input(text, check_key=model is None)
+    if error:
+        return error
     
-    # Combina os resumos parciais
-    combined_summary = " ".join(summaries)
+    try:
+        if model is None:
+            model, model_name = await _resolve_async_model()
+            if model is None:
+                return "Erro: Nenhum modelo Gemini disponível. Verifique sua API key e acesso."
+        
+        cache = get_cache()
+        if cache is not None:
+            cache_key = summary_cache_key(text, model_name, max_length)
+            cached = cache.get_summary(cache_key)
+            if cached is not None:
+                metrics.incr("summary_cache_hits")
+                return cached
+            metrics.incr("summary_cache_misses")
+        
+        prompt = _build_prompt(text, max_length)
+        response = await asyncio.wait_for(_generate_with_retry_async(model, prompt), timeout)
+        
+        if cache is not None:
+            cache.put_summary(cache_key, response.text)
+        
+        return response.text
+        
+    except asyncio.TimeoutError:
+        metrics.incr("deadline_exceeded")
+        return _timeout_message(timeout)
+    except Exception as e:
+        return f"Erro ao gerar resumo: {str(e)}"
+
+def _backend_async(backend) -> Callable[[str, int], Awaitable[str]]:
+    """Função de resumo assíncrona do backend; None usa o Gemini deste módulo"""
+    if backend is None:
+        return generate_summary_async
+    return backend.summarize_async
+
+async def summarize_chunks_async(chunks: List[str], max_length: int,
+                                 progress: Optional[Callable[[int, int], None]] = None,
+                                 backend=None) -> List[str]:
+    """
+    Resume vários chunks ao mesmo tempo no event loop atual (com o Gemini,
+    limitado por ASYNC_MAX_IN_FLIGHT e pelo limitador de taxa compartilhado).
     
-    # Se ainda for muito longo, faz um resumo do resumo
-    if len(combined_summary.split()) > max_length * 1.2:
-        return generate_summary(combined_summary, max_length)
+    Se a tarefa for cancelada (usuário desistiu ou prazo esgotado), todas as
+    chamadas ainda pendentes são canceladas junto.
+    
+    Args:
+        chunks: Textos a resumir
+        max_length: Comprimento máximo de cada resumo em palavras
+        progress: Chamada com (concluídos, total) a cada chunk resumido
+        backend: SummaryBackend a usar (padrão: Gemini)
+        
+    Returns:
+        Lista de resumos na mesma ordem dos chunks
+    """
+    summarize_async = _backend_async(backend)
+    
+    async def summarize(i: int, chunk: str) -> Tuple[int, str]:
+        return i, await summarize_async(chunk, max_length)
+    
+    tasks = [asyncio.ensure_future(summarize(i, chunk)) for i, chunk in enumerate(chunks)]
+    summaries = [""] * len(chunks)
+    try:
+        for done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+            i, summary = await next_done
+            summaries[i] = summary
+            if progress:
+                progress(done, len(chunks))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return summaries
+
+async def _summarize_large_text_async(text: str, max_length: int,
+                                      progress: Optional[Callable[[str, int, int], None]],
+                                      backend, prefilter_ratio: Optional[float]) -> str:
+    error = _check_input(text, check_key=backend is None)
+    if error:
+        return error
+    if backend is None:
+        model, _ = await _resolve_async_model()
+        if model is None:
+            return "Erro: Nenhum modelo Gemini disponível. Verifique sua API key e acesso."
+    summarize = _backend_async(backend)
+    map_reduce = backend is None or backend.map_reduce
+    
+    if prefilter_ratio is None:
+        prefilter_ratio = PREFILTER_RATIO
+    if map_reduce and len(text) >= 5000 and 0 < prefilter_ratio < 1:
+        if progress:
+            progress("Selecionando frases relevantes", 0, 0)
+        text = await asyncio.to_thread(prefilter_text, text, prefilter_ratio)
+    if len(text) < 5000 or not map_reduce:
+        return await summarize(text, max_length)
     
+    # Map: resumo de cada chunk; reduce: o mesmo plano do caminho com threads (ver _plan_reduction)
+    stage = "Resumindo partes"
+    chunks = await asyncio.to_thread(chunk_text, text)
+    summaries = await summarize_chunks_async(chunks, CHUNK_SUMMARY_WORDS,
+                                             progress and (lambda done, total: progress(stage, done, total)),
+                                             backend)
+    plan = _plan_reduction(summaries, max_length)
+    reduced = None
+    while True:
+        try:
+            level, texts = plan.send(reduced)
+        except StopIteration as done:
+            combined_summary, needs_final = done.value
+            break
+        stage = f"Combinando resumos (nível {level})"
+        reduced = await summarize_chunks_async(texts, CHUNK_SUMMARY_WORDS,
+                                               progress and (lambda done, total: progress(stage, done, total)),
+                                               backend)
+    
+    if needs_final:
+        if progress:
+            progress("Resumo final", 0, 1)
+        return await summarize(combined_summary, max_length)
     return combined_summary
 
+async def summarize_large_text_async(text: str, max_length: int = 300,
+                                     progress: Optional[Callable[[str, int, int], None]] = None, backend=None,
+                                     prefilter_ratio: Optional[float] = None,
+                                     timeout: Optional[float] = None) -> str:
+    """
+    Versão assíncrona de summarize_large_text: os chunks de todas as
+    requisições em andamento dividem o mesmo event loop.
+    
+    Args:
+        text: Texto longo a ser resumido
+        max_length: Comprimento máximo do resumo final em palavras
+        progress: Chamada com (etapa, concluídos, total) durante o processamento
+        backend: SummaryBackend a usar (padrão: Gemini); ver SummaryBackend.summarize_async
+        prefilter_ratio: Fração do texto enviada ao LLM (ver stream_summary)
+        timeout: Prazo da requisição inteira em segundos (None = sem prazo);
+            ao esgotar, as chamadas pendentes são canceladas
+        
+    Returns:
+        Texto resumido (ou mensagem de erro)
+    """
+    try:
+        return await asyncio.wait_for(_summarize_large_text_async(text, max_length, progress, backend,
+                                                                  prefilter_ratio), timeout)
+    except asyncio.TimeoutError:
+        metrics.incr("deadline_exceeded")
+        return _timeout_message(timeout)
+
 # Função para debug: listar modelos disponíveis
 def debug_models():
     """Função para debug - lista modelos disponíveis"""
@@ -130,6 +912,7 @@ def debug_models():
     print(f"\nVerificando modelo configurado: {MODEL_NAME}")
     is_available = check_model_availability(MODEL_NAME)
     print(f"Modelo {MODEL_NAME} disponível: {is_available}")
+    print(f"Modelo resolvido para uso: {resolve_model_name(force_refresh=True)}")
 
 if __name__ == "__main__":
     debug_models()
\ No newline at end of file
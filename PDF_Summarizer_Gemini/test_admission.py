@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, AdmissionError, Cost, estimate_cost
+from benchmark import make_text_pdf
+
+def test_estimate_cost_grows_with_pages_and_flags_long_documents(tmp_path):
+    small = make_text_pdf(str(tmp_path / "pequeno.pdf"), 5)
+
+    cost = estimate_cost(small, 5)
+    long_cost = estimate_cost(small, 5000)
+
+    assert cost.bytes > 0 and not cost.heavy
+    assert long_cost.heavy and long_cost.memory_mb > cost.memory_mb
+    assert estimate_cost(small, 5000, large_document=True).memory_mb <= long_cost.memory_mb
+
+def test_controller_rejects_oversized_and_queues_over_budget():
+    controller = AdmissionController(budget_mb=100, heavy_slots=1)
+    with pytest.raises(AdmissionError):
+        controller.check(Cost(bytes=0, pages=0, memory_mb=150, heavy=False))
+
+    waited = threading.Event()
+    admitted = threading.Event()
+
+    def second():
+        with controller.admit(Cost(bytes=0, pages=0, memory_mb=60, heavy=False), on_wait=waited.set):
+            admitted.set()
+
+    with controller.admit(Cost(bytes=0, pages=0, memory_mb=60, heavy=False)):
+        thread = threading.Thread(target=second)
+        thread.start()
+        assert waited.wait(5)
+        time.sleep(0.05)
+        assert not admitted.is_set()
+    thread.join(5)
+    assert admitted.is_set() and controller.reserved_mb == 0
+
+def test_heavy_jobs_run_one_at_a_time():
+    controller = AdmissionController(budget_mb=0, heavy_slots=1)
+    heavy = Cost(bytes=0, pages=0, memory_mb=10, heavy=True)
+    waited = threading.Event()
+    running = []
+
+    def second():
+        with controller.admit(heavy, on_wait=waited.set):
+            running.append(controller.running_heavy)
+
+    with controller.admit(heavy):
+        thread = threading.Thread(target=second)
+        thread.start()
+        assert waited.wait(5)
+        with controller.admit(Cost(bytes=0, pages=0, memory_mb=10, heavy=False)):
+            pass  # a faixa normal não espera pelos pesados
+        assert not running
+    thread.join(5)
+    assert running == [1] and controller.running_heavy == 0
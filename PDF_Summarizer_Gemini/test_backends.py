@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import backends
+import cache
+import summarizer
+from fake_genai import FakeAPIError
+from rate_limiter import RateLimiter
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(summarizer, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(summarizer, "_rate_limiter", RateLimiter(6000, 10**9, summarizer.MAX_IN_FLIGHT))
+    monkeypatch.setattr(cache, "_default_cache", cache.SummaryCache(str(tmp_path / "cache.sqlite3")))
+
+class FakeOpenAIClient:
+    """Imita client.chat.completions.create; falha com 429 nas primeiras `fail_first` chamadas"""
+
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, max_tokens, stream=False):
+        self.calls += 1
+        if self.fail_first:
+            self.fail_first -= 1
+            raise FakeAPIError(429)
+        text = messages[0]["content"].split("Texto para resumir:", 1)[-1].split()
+        if stream:
+            return [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=" ".join(text[:3])))])]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" ".join(text[:3])))])
+
+def make_openai(client):
+    backend = backends.OpenAIBackend(model="modelo-teste", api_key="sk-teste")
+    backend._model = backends._OpenAIModel(client, backend.model)
+    return backend
+
+def test_openai_backend_shares_retry_and_cache():
+    client = FakeOpenAIClient(fail_first=1)
+    backend = make_openai(client)
+
+    first = backend.summarize("um texto para o backend openai", 50)
+    second = backend.summarize("um texto para o backend openai", 50)
+
+    assert first == second == "um texto para"
+    assert client.calls == 2  # uma falha 429 + uma chamada; a segunda veio do cache
+    assert "".join(backend.stream("outro texto qualquer aqui", 50)) == "outro texto qualquer"
+
+def test_openai_backend_ignores_placeholder_gemini_key(monkeypatch):
+    monkeypatch.setattr(summarizer, "GEMINI_API_KEY", "sua_chave_api_aqui")
+    backend = make_openai(FakeOpenAIClient())
+
+    assert backend.summarize("um texto para o backend openai", 50) == "um texto para"
+
+def test_openai_backend_without_key_reports_error():
+    backend = backends.OpenAIBackend(api_key=None)
+
+    assert backend.summarize("texto", 50).startswith("Erro: API key não configurada")
+
+def test_openai_backend_hidden_without_the_package(monkeypatch):
+    find_spec = backends.importlib.util.find_spec
+    monkeypatch.setattr(backends.importlib.util, "find_spec",
+                        lambda name, *args: None if name == "openai" else find_spec(name, *args))
+
+    assert backends.available_backends() == ["gemini", "extrativo"]
+
+def test_extractive_backend_summarizes_whole_document_locally():
+    text = " ".join(f"A proposta {i} trata do orçamento anual da empresa e das metas de vendas." for i in range(400))
+    text += " O orçamento anual da empresa define as metas de vendas da proposta."
+
+    summary = backends.get_backend("extrativo").summarize_document(text, 60)
+
+    assert 0 < len(summary.split()) <= 60
+    assert summary.endswith(".")
+
+def test_map_reduce_pipeline_accepts_any_backend():
+    backend = make_openai(FakeOpenAIClient())
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    events = list(summarizer.stream_summary(text, 300, backend=backend))
+
+    partials = [piece for kind, _, piece in events if kind == "parcial"]
+    assert len(partials) == len(summarizer.chunk_text(text))
+    assert all(len(p.split()) == 3 for p in partials)
+
+def test_async_pipeline_goes_through_the_backend():
+    client = FakeOpenAIClient()
+    backend = make_openai(client)
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    summary = asyncio.run(backend.summarize_document_async(text, 300, prefilter_ratio=0))
+
+    assert summary == backend.summarize_document(text, 300, prefilter_ratio=0)
+    assert client.calls > len(summarizer.chunk_text(text))  # mapa e redução passaram pelo cliente da OpenAI
+    extractive = backends.get_backend("extrativo")
+    assert asyncio.run(extractive.summarize_document_async(text, 60)) == extractive.summarize_document(text, 60)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        backends.get_backend("inexistente")
@@ -0,0 +1,69 @@
+import json
+import shutil
+
+import pytest
+
+import batch
+import cache
+import download_store
+import summarizer
+from benchmark import make_text_pdf
+from fake_genai import FakeGenAI
+from rate_limiter import RateLimiter
+
+@pytest.fixture
+def workdir(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(summarizer, "genai", FakeGenAI())
+    monkeypatch.setattr(summarizer, "GEMINI_API_KEY", "chave-de-teste")
+    monkeypatch.setattr(summarizer, "_rate_limiter", RateLimiter(6000, 10**9, summarizer.MAX_IN_FLIGHT))
+    monkeypatch.setattr(cache, "_default_cache", cache.SummaryCache(str(tmp_path / "cache.sqlite3")))
+    monkeypatch.setattr(download_store, "_default_store", download_store.DownloadStore("downloads"))
+    summarizer.clear_model_cache()
+    yield tmp_path
+    summarizer.clear_model_cache()
+
+def read_report(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_batch_summarizes_directory_and_resumes_from_checkpoint(workdir):
+    docs = workdir / "docs"
+    (docs / "sub").mkdir(parents=True)
+    make_text_pdf(docs / "a.pdf", 3)
+    make_text_pdf(docs / "sub" / "b.pdf", 5)
+    shutil.copy(docs / "a.pdf", docs / "sub" / "copia.pdf")
+
+    runner = batch.BatchRunner("report.jsonl", "checkpoint.jsonl", extract_workers=2, summary_workers=2)
+    totals = runner.run(list(batch.iter_inputs(str(docs))))
+
+    assert totals["files"] == {"ok": 2, "erro": 0, "ignorado": 1}
+    files = [r for r in read_report("report.jsonl") if r["type"] == "file" and r["status"] == "ok"]
+    assert sorted(r["pages"] for r in files) == [3, 5]
+    assert all((workdir / r["output"]).exists() for r in files)
+    assert all(r["extract_s"] >= 0 and r["summary_s"] >= 0 and r["render_s"] >= 0 for r in files)
+
+    rerun = batch.BatchRunner("report2.jsonl", "checkpoint.jsonl", extract_workers=1, summary_workers=1)
+    totals = rerun.run(list(batch.iter_inputs(str(docs))))
+
+    assert totals["files"] == {"ok": 0, "erro": 0, "ignorado": 3}
+
+def test_manifest_paths_are_relative_to_manifest(workdir):
+    (workdir / "lista").mkdir()
+    make_text_pdf(workdir / "lista" / "a.pdf", 1)
+    (workdir / "lista" / "manifesto.txt").write_text("# comentário\na.pdf\n\n", encoding="utf-8")
+
+    assert list(batch.iter_inputs(str(workdir / "lista" / "manifesto.txt"))) == [
+        str(workdir / "lista" / "a.pdf")]
+
+def test_empty_summary_is_an_error_and_not_checkpointed(workdir, monkeypatch):
+    (workdir / "docs").mkdir()
+    make_text_pdf(workdir / "docs" / "a.pdf", 2)
+
+    runner = batch.BatchRunner("report.jsonl", "checkpoint.jsonl", extract_workers=1, summary_workers=1)
+    monkeypatch.setattr(runner.backend, "summarize_document", lambda text, max_length, **kwargs: "")
+    totals = runner.run(list(batch.iter_inputs(str(workdir / "docs"))))
+
+    assert totals["files"] == {"ok": 0, "erro": 1, "ignorado": 0}
+    assert "resumo vazio" in read_report("report.jsonl")[0]["error"]
+    assert batch.load_checkpoint("checkpoint.jsonl") == set()
@@ -0,0 +1,31 @@
+from cache import SummaryCache
+
+def test_extraction_and_summary_levels(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"))
+
+    cache.put_extraction("arquivo", "texto extraído", 12)
+    cache.put_summary("chunk", "resumo")
+
+    assert cache.get_extraction("arquivo") == ("texto extraído", 12)
+    assert cache.get_summary("chunk") == "resumo"
+    assert cache.get_summary("arquivo") is None
+
+def test_persists_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SummaryCache(path).put_summary("chunk", "resumo")
+
+    assert SummaryCache(path).get_summary("chunk") == "resumo"
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"), max_bytes=5000)
+    payload = "".join(chr(0x4e00 + (i * 7919) % 20000) for i in range(600))
+
+    cache.put_summary("antigo", payload + "a")
+    cache.put_summary("usado", payload + "b")
+    cache.get_summary("usado")
+    for i in range(3):
+        cache.put_summary(f"novo{i}", payload + str(i))
+
+    assert cache.get_summary("antigo") is None
+    assert cache.get_summary("novo2") is not None
+    assert cache.total_bytes <= 5000
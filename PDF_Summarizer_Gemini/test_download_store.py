@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from download_store import DownloadStore
+
+def write(store, name="relatorio_resumo.pdf", data=b"%PDF" + b"0" * 96, key=None):
+    with store.create(name, key) as f:
+        f.write(data)
+    return f.name
+
+def test_concurrent_creates_get_distinct_paths_with_same_name(tmp_path):
+    store = DownloadStore(str(tmp_path))
+
+    with ThreadPoolExecutor(8) as pool:
+        paths = list(pool.map(lambda _: write(store), range(64)))
+
+    assert len(set(paths)) == 64
+    assert all(os.path.basename(path) == "relatorio_resumo.pdf" for path in paths)
+    assert store.count() == 64 and store.total_bytes == 64 * 100
+
+def test_failed_render_leaves_nothing_behind(tmp_path):
+    store = DownloadStore(str(tmp_path))
+
+    with pytest.raises(RuntimeError):
+        with store.create("relatorio_resumo.pdf") as f:
+            f.write(b"%PDF")
+            raise RuntimeError("falha")
+
+    assert store.count() == 0
+    assert not os.path.exists(f.name)
+
+def test_evict_by_age_then_by_size(tmp_path):
+    store = DownloadStore(str(tmp_path), max_age=3600, max_bytes=0)
+    legacy = tmp_path / "antigo_resumo.pdf"
+    legacy.write_bytes(b"%PDF" + b"0" * 96)
+    os.utime(legacy, (1, 1))
+    store.adopt_existing()
+    paths = [write(store) for _ in range(10)]
+
+    assert store.evict() == 1
+    assert not legacy.exists()
+
+    store.max_bytes = 500
+    assert store.evict() == 6  # até 90% do limite, começando pelos mais antigos
+    assert [os.path.exists(p) for p in paths] == [False] * 6 + [True] * 4
+    assert store.total_bytes == 400
+    assert DownloadStore(str(tmp_path)).total_bytes == 400
+
+def test_find_returns_keyed_file_and_refreshes_its_age(tmp_path):
+    store = DownloadStore(str(tmp_path), max_age=3600, max_bytes=0)
+    path = write(store, key="abc")
+    store.evict(now=time.time() + 1800)
+
+    assert store.find("abc") == path
+    assert store.find("outra") is None
+    assert store.evict(now=time.time() + 3000) == 0  # a consulta renovou a data
+    assert store.evict(now=time.time() + 7200) == 1
+    assert store.find("abc") is None
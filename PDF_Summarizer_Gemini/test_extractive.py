@@ -0,0 +1,19 @@
+from extractive import prefilter, split_sentences
+
+def test_prefilter_keeps_document_order_within_budget():
+    text = " ".join(f"A meta {i} de vendas depende do orçamento anual da empresa." if i % 3 else
+                    f"O clima no dia {i} estava ensolarado." for i in range(300))
+
+    filtered = prefilter(text, 0.3)
+
+    kept = split_sentences(filtered)
+    original = split_sentences(text)
+    assert len(filtered) <= 0.3 * len(text) + max(len(s) for s in original) + 1
+    assert [original.index(s) for s in kept] == sorted(original.index(s) for s in kept)
+
+def test_prefilter_drops_repeated_boilerplate_before_ranking():
+    legal = "Este documento é confidencial e de uso interno."
+    text = " ".join(f"O projeto {i} reduziu custos de energia na fábrica {i % 5}. {legal}" for i in range(100))
+
+    assert prefilter(text, 1).count(legal) == 1
+    assert prefilter(text, 0.5).count(legal) <= 1
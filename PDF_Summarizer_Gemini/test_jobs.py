@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, Cost
+from jobs import CANCELLED, DONE, FAILED, QUEUED, JobManager, QueueFullError
+
+def test_job_reports_progress_and_result():
+    manager = JobManager(workers=1, max_queue=2)
+    release = threading.Event()
+
+    def work(n, progress):
+        for i in range(n):
+            progress("Resumindo partes", i + 1, n)
+        release.wait(5)
+        return n * 2
+
+    job_id = manager.submit(work, 4)
+    while manager.get(job_id).done < 4:
+        time.sleep(0.01)
+    job = manager.get(job_id)
+    assert (job.stage, job.done, job.total) == ("Resumindo partes", 4, 4)
+    assert "4/4" in job.describe()
+
+    release.set()
+    job = manager.wait(job_id, timeout=5)
+    assert job.status == DONE
+    assert job.result == 8
+
+def test_full_queue_rejects_new_jobs():
+    manager = JobManager(workers=1, max_queue=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def work(progress):
+        started.set()
+        release.wait(5)
+
+    running = manager.submit(work)
+    started.wait(5)
+    waiting = [manager.submit(work), manager.submit(work)]
+    with pytest.raises(QueueFullError):
+        manager.submit(work)
+
+    assert manager.get(waiting[1]).status == QUEUED
+    assert manager.queue_position(waiting[1]) == 2
+    release.set()
+    for job_id in [running] + waiting:
+        assert manager.wait(job_id, timeout=5).status == DONE
+
+def test_failed_job_keeps_error():
+    manager = JobManager(workers=1, max_queue=1)
+
+    def work(progress):
+        raise ValueError("PDF corrompido")
+
+    job = manager.wait(manager.submit(work), timeout=5)
+
+    assert job.status == FAILED
+    assert job.error == "PDF corrompido"
+
+def test_low_priority_jobs_leave_the_queue_last():
+    manager = JobManager(workers=1, max_queue=4)
+    release = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker(progress):
+        started.set()
+        release.wait(5)
+
+    def work(name, progress):
+        order.append(name)
+
+    manager.submit(blocker)
+    started.wait(5)
+    heavy = manager.submit(work, "pesado", priority=1)
+    normal = manager.submit(work, "normal")
+    assert manager.queue_position(normal) == 1 and manager.queue_position(heavy) == 2
+
+    release.set()
+    manager.wait(heavy, timeout=5)
+    assert order == ["normal", "pesado"]
+
+def test_cancelled_jobs_stop_or_never_start():
+    manager = JobManager(workers=1, max_queue=4)
+    started = threading.Event()
+    ran = []
+
+    def work(progress):
+        started.set()
+        while True:
+            progress("Resumindo partes")
+            time.sleep(0.01)
+
+    running = manager.submit(work)
+    started.wait(5)
+    queued = manager.submit(lambda progress: ran.append(1))
+
+    assert manager.cancel(queued) and manager.cancel(running)
+    assert manager.wait(running, timeout=5).status == CANCELLED
+    assert manager.get(queued).status == CANCELLED
+    manager._queue.join()
+    assert ran == [] and manager._pending == 0
+
+def test_waiting_heavy_jobs_do_not_hold_workers():
+    manager = JobManager(workers=2, max_queue=4)
+    controller = AdmissionController(budget_mb=0, heavy_slots=1)
+    heavy = Cost(bytes=0, pages=0, memory_mb=10, heavy=True)
+    release = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker(progress):
+        started.set()
+        release.wait(5)
+
+    def work(name, progress):
+        order.append(name)
+
+    first = manager.submit(blocker, priority=1, gate=controller.reservation(heavy))
+    started.wait(5)
+    second = manager.submit(work, "pesado", priority=1, gate=controller.reservation(heavy))
+    while "memória" not in manager.get(second).describe():
+        time.sleep(0.01)
+    normal = manager.submit(work, "normal", gate=controller.reservation(Cost(0, 0, 10, False)))
+
+    assert manager.wait(normal, timeout=5).status == DONE
+    assert manager.get(second).status == QUEUED and manager._pending == 1
+    release.set()
+    assert manager.wait(second, timeout=5).status == DONE
+    assert manager.wait(first, timeout=5).status == DONE
+    assert order == ["normal", "pesado"] and controller.running_heavy == 0 and manager._pending == 0
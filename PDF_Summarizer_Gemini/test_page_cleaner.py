@@ -0,0 +1,34 @@
+import random
+
+from reportlab.pdfgen import canvas
+
+from pdf_summarizer_common import metrics
+from pdf_processor import extract_text_from_pdf
+
+def body(seed, words=60):
+    rng = random.Random(seed)
+    return " ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(words))
+
+def test_extraction_reports_savings(tmp_path):
+    path = str(tmp_path / "relatorio.pdf")
+    c = canvas.Canvas(path)
+    for page in range(12):
+        c.drawString(50, 810, "Empresa Exemplo S.A. - Relatório de Sustentabilidade")
+        text = c.beginText(50, 780)
+        words = body("anexo" if page >= 8 else page, 400).split()
+        for line in range(40):
+            text.textLine(" ".join(words[line * 10:line * 10 + 10]))
+        c.drawText(text)
+        c.drawString(50, 30, f"Página {page + 1}")
+        c.showPage()
+    c.save()
+
+    with metrics.collect() as job:
+        text, num_pages = extract_text_from_pdf(path, workers=1)
+
+    counters = job.snapshot()["counters"]
+    assert num_pages == 12
+    assert "Relatório de Sustentabilidade" not in text
+    assert counters["duplicate_pages"] == 3
+    assert counters["cleanup_chars_removed"] > 0
+    assert counters["cleanup_chunks_saved"] >= 0
@@ -0,0 +1,56 @@
+import io
+
+import os
+
+import PyPDF2
+from reportlab.pdfbase import pdfmetrics
+
+import download_store
+from pdf_generator import (criar_pdf_resumo, criar_pdf_simples, get_styles, render_pdf_resumo, render_pdf_simples,
+                           render_to_bytes, wrap_text)
+
+def test_wrap_text_uses_font_metrics():
+    text = "mmmm iiii " * 40
+
+    lines = wrap_text(text, "Helvetica", 12, 200)
+
+    assert " ".join(lines) == text.strip()
+    assert all(pdfmetrics.stringWidth(line, "Helvetica", 12) <= 200 for line in lines)
+    # Larguras reais: 21 "i" cabem em 200pt, 40 "W" não cabem em 50pt
+    assert len(wrap_text("i" * 10 + " " + "i" * 10, "Helvetica", 12, 200)) == 1
+    assert all(pdfmetrics.stringWidth(part, "Helvetica", 12) <= 50 for part in wrap_text("W" * 40, "Helvetica", 12, 50))
+
+def test_render_to_memory_escapes_markup():
+    resumo = "Receita < custo & margem > 0 no <b>trimestre\nSegundo parágrafo."
+
+    data = render_to_bytes(render_pdf_resumo, resumo, "relatorio.pdf", tamanho_original=1000)
+
+    text = "".join(page.extract_text() for page in PyPDF2.PdfReader(io.BytesIO(data)).pages)
+    assert data.startswith(b"%PDF")
+    assert "Receita < custo & margem > 0 no <b>trimestre" in text
+    assert get_styles() is get_styles()
+
+def test_render_simples_streams_to_open_file():
+    output = io.BytesIO()
+
+    render_pdf_simples(output, "palavra " * 2000, "relatorio.pdf")
+
+    assert len(PyPDF2.PdfReader(io.BytesIO(output.getvalue())).pages) > 1
+
+def test_identical_requests_reuse_the_stored_pdf(monkeypatch, tmp_path):
+    store = download_store.DownloadStore(str(tmp_path))
+    monkeypatch.setattr(download_store, "_default_store", store)
+
+    first = criar_pdf_resumo("", "Resumo do relatório.", "relatorio.pdf", "Título", tamanho_original=500)
+    again = criar_pdf_resumo("", "Resumo do relatório.", "relatorio.pdf", "Título", tamanho_original=500)
+    other_title = criar_pdf_resumo("", "Resumo do relatório.", "relatorio.pdf", "Outro", tamanho_original=500)
+    simple = criar_pdf_simples("Resumo do relatório.", "relatorio.pdf", "Título")
+
+    assert again == first
+    assert len({first, other_title, simple}) == 3
+    assert store.count() == 3
+
+    os.remove(first)  # arquivo apagado fora do índice: gera de novo
+    regenerated = criar_pdf_resumo("", "Resumo do relatório.", "relatorio.pdf", "Título", tamanho_original=500)
+    assert regenerated != first and os.path.exists(regenerated)
+    assert store.count() == 3
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from benchmark import make_text_pdf
+from pdf_summarizer_common import metrics
+from pdf_processor import (CHARS_PER_TOKEN, _estimate_chunks, chunk_offsets, chunk_text, extract_pages_parallel,
+                           extract_text_from_pdf, iter_document_chunks, iter_pdf_pages, iter_text_chunks)
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    return make_text_pdf(tmp_path / "exemplo.pdf", 5)
+
+def test_iter_pdf_pages_yields_numbered_pages(sample_pdf):
+    pages = list(iter_pdf_pages(sample_pdf))
+
+    assert [number for number, _ in pages] == [1, 2, 3, 4, 5]
+    assert "Pagina 3 linha 0." in pages[2][1]
+
+def test_iter_pdf_pages_accepts_open_file(sample_pdf):
+    with open(sample_pdf, "rb") as f:
+        pages = list(iter_pdf_pages(f, max_pages=2))
+
+    assert len(pages) == 2
+
+def test_extract_text_from_pdf_matches_pages(sample_pdf):
+    text, num_pages = extract_text_from_pdf(sample_pdf, cleanup=False)
+
+    assert num_pages == 5
+    assert text == "".join(page_text + "\n" for _, page_text in iter_pdf_pages(sample_pdf))
+
+def random_text(rng, size):
+    """Texto aleatório com palavras, sentenças, parágrafos e trechos sem espaço."""
+    parts = []
+    while sum(map(len, parts)) < size:
+        kind = rng.random()
+        if kind < 0.7:
+            parts.append(" ".join("palavra"[:rng.randint(1, 7)] for _ in range(rng.randint(1, 30))) + ". ")
+        elif kind < 0.85:
+            parts.append("\n\n")
+        elif kind < 0.95:
+            parts.append("x" * rng.randint(1, 600))
+        else:
+            parts.append("Pergunta? Sim! ")
+    return "".join(parts)
+
+@pytest.mark.parametrize("seed", range(40))
+def test_chunk_offsets_properties(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 20000))
+    max_tokens = rng.randint(1, 400)
+    overlap_tokens = rng.randint(0, 2 * max_tokens)
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+
+    offsets = chunk_offsets(text, max_tokens, overlap_tokens)
+
+    assert offsets[0][0] == 0
+    assert offsets[-1][1] == len(text)
+    for (start, end), (next_start, next_end) in zip(offsets, offsets[1:]):
+        assert start < next_start <= end  # progride e não deixa lacunas
+        assert end - next_start <= max_chars // 2  # sobreposição limitada
+        assert next_end > end
+    assert all(end - start <= max_chars for start, end in offsets)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_estimate_chunks_tracks_chunk_offsets(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 200000))
+
+    estimate = _estimate_chunks(len(text))
+
+    # Os chunks reais fecham antes, em limites de sentença; a estimativa fica pouco abaixo
+    assert 0 <= len(chunk_offsets(text)) - estimate <= max(1, estimate // 4)
+
+def test_chunks_end_at_sentence_boundaries():
+    text = " ".join(f"Sentença número {i} do documento." for i in range(500))
+
+    chunks = chunk_text(text, 100, 10)
+
+    assert all(chunk.rstrip().endswith(".") for chunk in chunks)
+    assert all(chunk.startswith("Sentença") for chunk in chunks)
+
+def test_chunk_text_does_not_stall_without_break_characters():
+    chunks = chunk_text("a" * 10000, 100, 100)
+
+    assert "".join(chunks) == "a" * 10000
+
+@pytest.mark.parametrize("seed", range(5))
+def test_iter_text_chunks_matches_chunk_text(seed):
+    rng = random.Random(seed)
+    pages = [(i, random_text(rng, rng.randint(0, 5000))) for i in range(1, 40)]
+    text = "".join(page_text + "\n" for _, page_text in pages)
+
+    assert list(iter_text_chunks(pages, 300, 30)) == chunk_text(text, 300, 30)
+
+def test_parallel_extraction_keeps_page_order(tmp_path, monkeypatch):
+    monkeypatch.setattr("pdf_processor.PARALLEL_MIN_PAGES", 1)
+    pdf_path = make_text_pdf(tmp_path / "longo.pdf", 23, lines_per_page=3)
+
+    pages = extract_pages_parallel(pdf_path, 23, workers=3)
+
+    assert pages == [page_text for _, page_text in iter_pdf_pages(pdf_path)]
+
+def test_extracts_every_page_unless_limited(tmp_path):
+    pdf_path = make_text_pdf(tmp_path / "longo.pdf", 60, lines_per_page=3)
+
+    text, num_pages = extract_text_from_pdf(pdf_path, workers=1, cleanup=False)
+    limited, _ = extract_text_from_pdf(pdf_path, workers=1, cleanup=False, max_pages=10)
+
+    assert num_pages == 60
+    assert "Pagina 60 linha 0." in text
+    assert "Pagina 11 linha 0." not in limited and "Pagina 10 linha 0." in limited
+
+def test_large_document_mode_streams_same_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("pdf_processor.PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr("pdf_processor.STREAM_SHARD_PAGES", 4)
+    pdf_path = make_text_pdf(tmp_path / "longo.pdf", 70, lines_per_page=20)
+    text, _ = extract_text_from_pdf(pdf_path, workers=1, cleanup=False)
+
+    with metrics.collect() as run:
+        chunks = list(iter_document_chunks(pdf_path, workers=2, cleanup=False, max_pages=0))
+
+    assert chunks == chunk_text(text)
+    assert run.snapshot()["counters"]["pages_extracted"] == run.snapshot()["counters"]["pages_total"] == 70
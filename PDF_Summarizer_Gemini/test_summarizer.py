@@ -0,0 +1,292 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+import summarizer
+from fake_genai import FakeAPIError, FakeGenAI
+from rate_limiter import RateLimiter, TokenBucket
+
+@pytest.fixture
+def fake(monkeypatch, tmp_path):
+    backend = FakeGenAI(latency=0.05)
+    monkeypatch.setattr(summarizer, "genai", backend)
+    monkeypatch.setattr(summarizer, "GEMINI_API_KEY", "chave-de-teste")
+    monkeypatch.setattr(summarizer, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(summarizer, "_rate_limiter", RateLimiter(6000, 10**9, summarizer.MAX_IN_FLIGHT))
+    monkeypatch.setattr(cache, "_default_cache", cache.SummaryCache(str(tmp_path / "cache.sqlite3")))
+    summarizer.clear_model_cache()
+    yield backend
+    summarizer.clear_model_cache()
+
+def test_model_resolved_once_and_client_reused(fake):
+    for i in range(5):
+        summarizer.generate_summary(f"um texto qualquer {i}", 50)
+
+    assert fake.list_models_calls == 1
+    assert fake.models_created == 1
+
+def test_refresh_models_queries_api_again(fake):
+    summarizer.generate_summary("um texto qualquer", 50)
+    summarizer.refresh_models()
+    summarizer.generate_summary("outro texto", 50)
+
+    assert fake.list_models_calls == 2
+    assert fake.models_created == 2
+
+def test_summarize_chunks_is_concurrent_and_keeps_order(fake):
+    chunks = [f"chunk{i} " + "palavra " * 20 for i in range(12)]
+
+    summaries = summarizer.summarize_chunks(chunks, 50)
+
+    assert [s.split()[0] for s in summaries] == [f"chunk{i}" for i in range(12)]
+    assert 1 < fake.max_concurrency() <= summarizer.MAX_IN_FLIGHT
+
+def test_retries_rate_limit_errors(fake):
+    fake.fail_first = 2
+
+    summary = summarizer.generate_summary("texto com retry", 50)
+
+    assert summary == "texto com retry"
+    assert len(fake.calls) == 3
+
+def test_does_not_retry_client_errors(fake):
+    fake.fail_first = 1
+    fake.fail_code = 400
+
+    summary = summarizer.generate_summary("texto inválido", 50)
+
+    assert summary.startswith("Erro ao gerar resumo")
+    assert len(fake.calls) == 1
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    waits = []
+    bucket = TokenBucket(60, clock=lambda: now[0], sleep=waits.append)
+
+    for _ in range(60):
+        bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert waits == [pytest.approx(1.0), pytest.approx(2.0)]
+
+def test_large_text_reduces_in_logarithmic_rounds_without_truncation(fake):
+    fake.latency = 0
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(8000))
+
+    summarizer.summarize_large_text(text, 300)
+
+    chunk_calls = len(summarizer.chunk_text(text))
+    reduce_calls = len(fake.calls) - chunk_calls
+    assert chunk_calls > summarizer.REDUCE_FAN_IN ** 2
+    assert reduce_calls < chunk_calls / (summarizer.REDUCE_FAN_IN - 1) + 3
+    assert all(c.prompt_chars <= summarizer.MAX_INPUT_CHARS + len(summarizer.SUMMARY_PROMPT)
+               for c in fake.calls)
+
+def test_repeated_summary_is_served_from_cache(fake):
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    first = summarizer.summarize_large_text(text, 300)
+    calls_after_first = len(fake.calls)
+    second = summarizer.summarize_large_text(text, 300)
+
+    assert second == first
+    assert len(fake.calls) == calls_after_first
+
+def test_changed_max_length_only_redoes_final_reduce(fake):
+    fake.summary_words = 200
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    summarizer.summarize_large_text(text, 150)
+    calls_after_first = len(fake.calls)
+    summarizer.summarize_large_text(text, 300)
+
+    assert len(fake.calls) == calls_after_first + 1
+
+def test_stream_summary_yields_chunk_summaries_before_final(fake):
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    events = list(summarizer.stream_summary(text, 300))
+
+    kinds = [kind for kind, _, _ in events]
+    num_chunks = len(summarizer.chunk_text(text))
+    assert kinds[:num_chunks] == ["parcial"] * num_chunks
+    assert set(kinds[num_chunks:]) == {"final"}
+    assert sorted(i for kind, i, _ in events if kind == "parcial") == list(range(num_chunks))
+    final = "".join(piece for kind, _, piece in events if kind == "final")
+    assert final == summarizer.summarize_large_text(text, 300)
+
+def test_streamed_final_pass_retries_before_first_piece(fake):
+    fake.fail_first = 1
+
+    pieces = list(summarizer.generate_summary_stream("texto curto " * 30, 50))
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == " ".join(("texto curto " * 30).split()[:fake.summary_words])
+    assert len(fake.calls) == 2
+
+def test_stream_failing_midway_raises_instead_of_appending_error(fake):
+    class BrokenStreamModel:
+        def generate_content(self, prompt, stream=False):
+            yield SimpleNamespace(text="começo do resumo")
+            raise FakeAPIError(500)
+
+    pieces = []
+    with pytest.raises(summarizer.SummaryStreamError):
+        for piece in summarizer.generate_summary_stream("texto curto " * 30, 50, BrokenStreamModel(), "quebrado"):
+            pieces.append(piece)
+
+    assert pieces == ["começo do resumo"]
+    assert cache.get_cache().get_summary(summarizer.summary_cache_key("texto curto " * 30, "quebrado", 50)) is None
+
+def test_all_chunks_failing_returns_error_instead_of_empty_summary(fake):
+    fake.fail_first = 10**6
+    fake.fail_code = 400
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    final = "".join(piece for kind, _, piece in summarizer.stream_summary(text, 300) if kind == "final")
+    final_async = asyncio.run(summarizer.summarize_large_text_async(text, 300))
+
+    assert final.startswith("Erro ao gerar resumo")
+    assert final_async.startswith("Erro ao gerar resumo")
+
+def test_job_metrics_count_calls_tokens_and_cache_hits(fake):
+    fake.fail_first = 1
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(2000))
+
+    with summarizer.metrics.collect() as job:
+        summarizer.summarize_large_text(text, 300)
+        summarizer.summarize_large_text(text, 300)
+
+    counters = job.snapshot()["counters"]
+    assert counters["api_calls"] == len(fake.calls)
+    assert counters["api_errors"] == counters["api_retries"] == 1
+    assert counters["tokens_in"] > counters["tokens_out"] > 0
+    assert counters["summary_cache_hits"] == counters["summary_cache_misses"]
+    assert job.snapshot()["spans"]["chunking"]["count"] == 2
+
+def test_prefilter_shrinks_map_phase_input(fake):
+    text = " ".join(f"Frase {i} com algum conteúdo relevante sobre o tema {i % 13}." for i in range(2000))
+
+    with summarizer.metrics.collect() as full:
+        summarizer.summarize_large_text(text, 300, prefilter_ratio=0)
+    with summarizer.metrics.collect() as filtered:
+        summarizer.summarize_large_text(text, 300, prefilter_ratio=0.3)
+
+    assert filtered.snapshot()["counters"]["tokens_in"] < 0.5 * full.snapshot()["counters"]["tokens_in"]
+    assert filtered.snapshot()["counters"]["prefilter_chars_removed"] > 0.6 * len(text)
+    assert "prefilter" not in full.snapshot()["spans"]
+
+def test_prefilter_reports_progress_with_stage_done_total(fake):
+    stages = []
+    text = " ".join(f"Frase {i} com algum conteúdo relevante sobre o tema {i % 13}." for i in range(2000))
+
+    summarizer.summarize_large_text(text, 300, lambda stage, done, total: stages.append(stage), prefilter_ratio=0.3)
+
+    assert stages[0] == "Selecionando frases relevantes" and "Resumindo partes" in stages
+
+def test_streamed_chunks_are_read_only_as_summaries_complete(fake):
+    read = []
+
+    def chunks():
+        for i in range(30):
+            read.append(i)
+            yield f"Parte {i} do documento longo com algum conteúdo."
+
+    done = 0
+    for kind, _, _ in summarizer.stream_chunked_summary(chunks(), 300, max_pending=4):
+        if kind == "parcial":
+            done += 1
+            assert len(read) - done <= 4
+    assert done == 30
+
+def test_truncated_input_is_counted(fake):
+    with summarizer.metrics.collect() as job:
+        summarizer.generate_summary("palavra " * 2000, 100)
+
+    assert job.snapshot()["counters"]["input_chars_truncated"] == 16000 - summarizer.MAX_INPUT_CHARS
+
+def test_async_large_text_matches_sync_with_more_calls_in_flight(fake, monkeypatch):
+    monkeypatch.setattr(summarizer, "_rate_limiter",
+                        RateLimiter(10**6, 10**9, summarizer.MAX_IN_FLIGHT, max_async_in_flight=64))
+    text = " ".join(f"frase{i} com algum conteúdo relevante." for i in range(4000))
+
+    result = asyncio.run(summarizer.summarize_large_text_async(text, 300))
+
+    assert fake.max_concurrency() > summarizer.MAX_IN_FLIGHT
+    summarizer.clear_model_cache()
+    monkeypatch.setattr(cache, "_default_cache", cache.SummaryCache(":memory:"))
+    assert summarizer.summarize_large_text(text, 300) == result
+
+def test_async_summary_deadline_returns_error(fake):
+    fake.latency = 1
+
+    summary = asyncio.run(summarizer.generate_summary_async("texto demorado", 50, timeout=0.05))
+
+    assert summary.startswith("Erro ao gerar resumo") and "prazo" in summary
+
+def test_cancelled_async_summary_stops_pending_calls(fake):
+    fake.latency = 0.2
+    chunks = [f"chunk{i} " + "palavra " * 20 for i in range(200)]
+
+    async def cancel_soon():
+        task = asyncio.create_task(summarizer.summarize_chunks_async(chunks, 50))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_soon())
+    assert len(fake.calls) <= summarizer.MAX_IN_FLIGHT
+
+def test_async_model_is_created_once_per_event_loop(fake):
+    async def summarize_twice():
+        await summarizer.generate_summary_async("um texto qualquer", 50)
+        await summarizer.generate_summary_async("outro texto qualquer", 50)
+        return summarizer.get_async_model(summarizer.resolve_model_name())
+
+    first = asyncio.run(summarize_twice())
+    second = asyncio.run(summarize_twice())
+
+    assert first is not second
+    assert fake.models_created == 2 and fake.list_models_calls == 1
+
+def test_closed_event_loops_are_released(fake):
+    limiter = RateLimiter(6000, 10**9, 2)
+
+    async def summarize():
+        async with limiter.slot_async():
+            return await summarizer.generate_summary_async("um texto qualquer", 50)
+
+    for _ in range(3):
+        asyncio.run(summarize())
+
+    assert len(summarizer._async_models) == 1 and len(limiter._async_in_flight) == 1
+    assert all(loop.is_closed() for loop in summarizer._async_models)
+
+def test_async_gemini_client_is_not_the_global_default(monkeypatch):
+    from google.generativeai import client
+
+    async def model():
+        return summarizer.get_async_model("gemini-teste")
+
+    # Configuração só deste teste: o gerenciador global volta ao estado anterior no fim
+    monkeypatch.setattr(client, "_client_manager", client._ClientManager())
+    client.configure(api_key="chave-de-teste")
+    try:
+        first, second = asyncio.run(model()), asyncio.run(model())
+    finally:
+        summarizer.clear_model_cache()
+
+    assert first._async_client is not second._async_client
+    assert client._client_manager.clients.get("generative_async") not in (first._async_client, second._async_client)
+
+def test_incompatible_sdk_fails_with_clear_error(monkeypatch):
+    from google.generativeai import client
+
+    monkeypatch.delattr(client, "_client_manager")
+
+    with pytest.raises(RuntimeError, match="requirements.txt"):
+        summarizer._new_async_client()
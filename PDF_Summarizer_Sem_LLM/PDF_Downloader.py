@@ -1,10 +1,30 @@
+import io
+from functools import lru_cache
+from typing import BinaryIO, Union
+from xml.sax.saxutils import escape
+
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
-def salvar_pdf(texto: str, nome_arquivo: str = "resumo.pdf") -> str:
-    """Gera um PDF com quebras automáticas e margens decentes."""
+
+@lru_cache(maxsize=None)
+def estilo_corpo() -> ParagraphStyle:
+    """Estilo do corpo do texto, criado uma vez por processo (sem alterar o BodyText global)."""
+    return ParagraphStyle(
+        "ResumoCorpo",
+        parent=getSampleStyleSheet()["BodyText"],
+        fontName="Helvetica",
+        fontSize=11,
+        leading=15,
+    )
+
+
+def salvar_pdf(texto: str, nome_arquivo: Union[str, BinaryIO] = "resumo.pdf") -> Union[str, BinaryIO]:
+    """Gera um PDF com quebras automáticas e margens decentes.
+    - nome_arquivo: caminho ou arquivo binário aberto (ex.: io.BytesIO), sem arquivo temporário
+    """
     doc = SimpleDocTemplate(
         nome_arquivo,
         pagesize=A4,
@@ -13,17 +33,14 @@ def salvar_pdf(texto: str, nome_arquivo: str = "resumo.pdf") -> str:
         topMargin=2*cm,
         bottomMargin=2*cm,
     )
-    styles = getSampleStyleSheet()
-    normal = styles["BodyText"]
-    normal.fontName = "Helvetica"
-    normal.fontSize = 11
-    normal.leading = 15
+    normal = estilo_corpo()
 
-    # Preserva parágrafos (duas quebras = novo parágrafo)
+    # Preserva parágrafos (duas quebras = novo parágrafo); o texto é escapado
+    # porque <, > e & seriam lidos como marcação pelo Paragraph
     story = []
     texto = (texto or "").strip()
     for para in texto.split("\n\n"):
-        para = para.strip().replace("\n", "<br/>")
+        para = escape(para.strip()).replace("\n", "<br/>")
         if not para:
             continue
         story.append(Paragraph(para, normal))
@@ -31,3 +48,10 @@ def salvar_pdf(texto: str, nome_arquivo: str = "resumo.pdf") -> str:
 
     doc.build(story)
     return nome_arquivo
+
+
+def pdf_bytes(texto: str) -> bytes:
+    """Gera o PDF do resumo em memória."""
+    buffer = io.BytesIO()
+    salvar_pdf(texto, buffer)
+    return buffer.getvalue()
@@ -1,7 +1,7 @@
 import os
-import gradio as gr
 from summarizer import summarize_pdf          # resumidor local
 from PDF_Downloader import salvar_pdf         # gera o PDF do resumo
+from pdf_summarizer_common import metrics
 
 
 def process_pdf(pdf_path: str):
@@ -28,28 +28,45 @@ def process_pdf(pdf_path: str):
     return resumo, pdf_file
 
 
-with gr.Blocks(theme=gr.themes.Soft(), title="PDF Summarizer (Local)") as demo:
-    gr.Markdown("# 📄 Resumidor de PDF (Local)")
+def create_interface():
+    """
+    Monta a interface. O gradio só é importado aqui: os processos de extração
+    e OCR reimportam este script (como __mp_main__) e não precisam dele.
+    """
+    import gradio as gr
 
-    with gr.Row():
-        with gr.Column(scale=1):
-            pdf_input = gr.File(
-                file_types=[".pdf"],
-                label="📂 Escolha seu arquivo PDF",
-                type="filepath"  # retorna o caminho do arquivo como string
-            )
-            btn = gr.Button("✨ Resumir", variant="primary")
+    with gr.Blocks(theme=gr.themes.Soft(), title="PDF Summarizer (Local)") as demo:
+        gr.Markdown("# 📄 Resumidor de PDF (Local)")
 
-        with gr.Column(scale=2):
-            resumo_output = gr.Markdown(label="📝 Resumo")
-            pdf_download = gr.File(label="📥 Baixar Resumo em PDF")
+        with gr.Row():
+            with gr.Column(scale=1):
+                pdf_input = gr.File(
+                    file_types=[".pdf"],
+                    label="📂 Escolha seu arquivo PDF",
+                    type="filepath"  # retorna o caminho do arquivo como string
+                )
+                btn = gr.Button("✨ Resumir", variant="primary")
+
+            with gr.Column(scale=2):
+                resumo_output = gr.Markdown(label="📝 Resumo")
+                pdf_download = gr.File(label="📥 Baixar Resumo em PDF")
+
+        btn.click(
+            fn=process_pdf,
+            inputs=pdf_input,
+            outputs=[resumo_output, pdf_download],
+        )
+    return demo
 
-    btn.click(
-        fn=process_pdf,
-        inputs=pdf_input,
-        outputs=[resumo_output, pdf_download],
-    )
 
 if __name__ == "__main__":
+    # Métricas em http://localhost:METRICS_PORT/metrics (Prometheus) e /metrics.json
+    # (só conexões locais, a menos que METRICS_HOST diga outro endereço)
+    metrics.start_http_server(int(os.getenv("METRICS_PORT", 9465)), os.getenv("METRICS_HOST", "127.0.0.1"),
+                              prefix="pdf_summarizer_local")
+    # Fila do Gradio: resumos simultâneos e pedidos aguardando antes de recusar novos
+    demo = create_interface()
+    demo.queue(default_concurrency_limit=int(os.getenv("JOB_WORKERS", 2)),
+               max_size=int(os.getenv("JOB_MAX_QUEUE", 8)))
     demo.launch(share=True)
 
@@ -0,0 +1,217 @@
+# benchmark.py
+"""
+Benchmarks do pipeline local.
+
+Uso:
+    python benchmark.py [--pdf arquivo.pdf] [--pages 500] [--workers 1,2,4,8]
+    python benchmark.py --stage segmentation [--pages 500] [--n-process 1,2]
+    python benchmark.py --stage ocr [--pages 20] [--workers 1,2] [--output resultado.json]
+
+- extraction: páginas/segundo da extração com diferentes números de processos.
+- segmentation: tempo de import do preprocess e sentenças/segundo de cada modo
+  de tokenize_sentences ("full" é o comportamento anterior, pipeline completo).
+- ocr: extract_text_pdf em PDFs sintéticos digitalizados (só imagem) e mistos,
+  com páginas/segundo e pico de memória (RSS). Requer o tesseract instalado.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from PIL import Image, ImageDraw
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from extractor import extract_pages_text, extract_text_pdf
+
+
+def make_text_pdf(path, num_pages, lines_per_page=45):
+    """Gera um PDF sintético só com texto."""
+    c = canvas.Canvas(str(path))
+    for page in range(num_pages):
+        c.setFont("Helvetica", 10)
+        for line in range(lines_per_page):
+            c.drawString(50, 800 - line * 17,
+                         f"Pagina {page + 1} linha {line}. Texto de exemplo para medir a extração de PDFs.")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def bench_extraction(pdf_path, worker_counts):
+    """Executa extract_pages_text para cada número de processos e mede o tempo."""
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        pages = extract_pages_text(pdf_path, workers=workers)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "stage": "extraction",
+            "workers": workers,
+            "pages": len(pages),
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(len(pages) / elapsed, 1),
+        })
+    return results
+
+
+def _scanned_page_image(page, lines_per_page=45):
+    """Imagem de uma página "digitalizada": texto desenhado em pixels, sem camada de texto."""
+    img = Image.new("L", (1240, 1754), "white")
+    draw = ImageDraw.Draw(img)
+    for line in range(lines_per_page):
+        draw.text((100, 100 + line * 34),
+                  f"Pagina {page + 1} linha {line}. Texto de exemplo digitalizado para medir o OCR.", fill=0)
+    return img
+
+
+def make_scanned_pdf(path, num_pages, scanned_every=1):
+    """
+    Gera um PDF sintético com páginas digitalizadas.
+    - scanned_every=1: todas as páginas são imagem; 2: alterna texto e imagem (PDF misto).
+    """
+    c = canvas.Canvas(str(path))
+    for page in range(num_pages):
+        if page % scanned_every == scanned_every - 1:
+            c.drawImage(ImageReader(_scanned_page_image(page)), 0, 0, width=595, height=842)
+        else:
+            c.setFont("Helvetica", 10)
+            for line in range(45):
+                c.drawString(50, 800 - line * 17,
+                             f"Pagina {page + 1} linha {line}. Texto de exemplo para medir a extração de PDFs.")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def current_rss():
+    """RSS atual do processo em bytes (pico desde o início se /proc não existir)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def timed(fn, interval=0.005):
+    """Executa fn() medindo o tempo e o pico de RSS. Retorna (resultado, segundos, pico em MB)."""
+    peak = [current_rss()]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            peak[0] = max(peak[0], current_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+    return result, elapsed, round(max(peak[0], current_rss()) / 2**20, 1)
+
+
+def bench_ocr(num_pages, worker_counts, tmp):
+    """Mede extract_text_pdf (com OCR, sem cache) em PDFs digitalizados e mistos."""
+    import pytesseract
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        return [{"stage": "ocr", "skipped": f"tesseract indisponível: {e}"}]
+
+    results = []
+    for kind, scanned_every in (("scanned", 1), ("mixed", 2)):
+        pdf_path = make_scanned_pdf(os.path.join(tmp, f"{kind}.pdf"), num_pages, scanned_every)
+        for workers in worker_counts:
+            text, elapsed, peak_mb = timed(lambda: extract_text_pdf(pdf_path, ocr_workers=workers,
+                                                                    ocr_cache_path=None))
+            results.append({
+                "stage": "ocr",
+                "document": kind,
+                "workers": workers,
+                "pages": num_pages,
+                "ocr_pages": num_pages // scanned_every,
+                "chars": len(text),
+                "seconds": round(elapsed, 3),
+                "pages_per_sec": round(num_pages / elapsed, 2),
+                "peak_rss_mb": peak_mb,
+                "children_max_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+            })
+    return results
+
+
+def make_text(num_pages, sentences_per_page=30):
+    """Texto sintético com marcações de página, como o de extract_text_pdf."""
+    page = " ".join(f"O Sr. Silva analisou o item {i} do relatório e aprovou a proposta. "
+                    f"Veja a fig. {i} para mais detalhes!" for i in range(sentences_per_page // 2))
+    return "\n===PAGE===\n".join(page for _ in range(num_pages))
+
+
+def bench_segmentation(text, n_process_counts):
+    """Mede o import do preprocess e a vazão de cada modo de segmentação."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import preprocess"], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    results = [{"stage": "import_preprocess", "seconds": round(time.perf_counter() - start, 3)}]
+
+    import preprocess
+
+    for mode in ("rules", "senter", "full"):
+        if mode != "rules":
+            try:
+                preprocess.get_nlp(mode)
+            except (ImportError, OSError) as e:
+                results.append({"stage": "segmentation", "mode": mode, "skipped": str(e)})
+                continue
+        for n_process in (n_process_counts if mode != "rules" else [1]):
+            start = time.perf_counter()
+            sentences = preprocess.tokenize_sentences(text, mode=mode, n_process=n_process)
+            elapsed = time.perf_counter() - start
+            results.append({
+                "stage": "segmentation",
+                "mode": mode,
+                "n_process": n_process,
+                "sentences": len(sentences),
+                "seconds": round(elapsed, 3),
+                "sentences_per_sec": round(len(sentences) / elapsed, 1),
+                "chars_per_sec": round(len(text) / elapsed, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline local")
+    parser.add_argument("--stage", choices=["extraction", "segmentation", "ocr"], default="extraction")
+    parser.add_argument("--pdf", help="PDF a ser usado (padrão: documento sintético)")
+    parser.add_argument("--pages", type=int, default=500, help="Páginas do documento sintético")
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count() or 1}",
+                        help="Lista de números de processos separados por vírgula")
+    parser.add_argument("--n-process", default="1,2", help="Valores de n_process do nlp.pipe")
+    parser.add_argument("--output", help="Arquivo JSON onde gravar os resultados")
+    args = parser.parse_args()
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+    if args.stage == "segmentation":
+        n_process_counts = sorted({int(n) for n in args.n_process.split(",")})
+        results = bench_segmentation(make_text(args.pages), n_process_counts)
+    elif args.stage == "ocr":
+        with tempfile.TemporaryDirectory() as tmp:
+            results = bench_ocr(args.pages, worker_counts, tmp)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = args.pdf or make_text_pdf(os.path.join(tmp, "sintetico.pdf"), args.pages)
+            results = bench_extraction(pdf_path, worker_counts)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
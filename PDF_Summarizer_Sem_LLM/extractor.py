@@ -1,31 +1,235 @@
 # extractor.py
+import os
+
 import fitz  # PyMuPDF
-from pdf2image import convert_from_path
 import pytesseract
+from PIL import Image
+
+from ocr_cache import OCR_CACHE_PATH, OCRCache, file_hash, page_fingerprint, pixel_hash
+from pdf_summarizer_common import metrics, pools
+from pdf_summarizer_common.page_cleaner import clean_pages
+
+# Abaixo desse número de páginas a extração roda em um único processo
+PARALLEL_MIN_PAGES = 40
+# Resolução usada para renderizar as páginas enviadas ao OCR
+OCR_DPI = 200
+# Fração da página coberta por imagens a partir da qual ela é tratada como digitalizada
+IMAGE_COVERAGE_THRESHOLD = 0.5
+# Os processos de extração e OCR já nascem com estes módulos importados
+pools.preload("fitz", "pytesseract", "PIL.Image", "extractor")
+
+
+def _image_coverage(page):
+    """Fração da área da página ocupada por imagens (0 a 1)."""
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page.rect
+        covered += abs(bbox)
+    return min(1.0, covered / page_area)
+
+
+def _extract_page_range(shard):
+    """Extrai texto e cobertura de imagens das páginas [start, stop) no próprio processo."""
+    path, start, stop = shard
+    with fitz.open(path) as doc:
+        return [(doc[i].get_text("text"), _image_coverage(doc[i])) for i in range(start, stop)]
 
-def extract_text_pdf(path, ocr_threshold=200, poppler_path=None, tesseract_cmd=None, ocr_lang=None):
+
+def analyze_pages(path, workers=None):
+    """
+    Extrai o texto e a cobertura de imagens de cada página, dividindo faixas
+    de páginas entre os processos do pool compartilhado (reaproveitados entre
+    chamadas). Cada processo abre o documento de forma independente e o
+    resultado volta na ordem das páginas.
+    - workers: número de processos (padrão: número de CPUs). Documentos com
+      menos de PARALLEL_MIN_PAGES páginas são extraídos no processo atual.
     """
-    Extrai texto de PDF. Faz OCR se a extração direta for muito curta.
-    - poppler_path: caminho para binários do poppler (Windows), se necessário.
+    workers = workers or os.cpu_count() or 1
+    with metrics.span("extraction"):
+        with fitz.open(path) as doc:
+            num_pages = doc.page_count
+            if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+                pages = [(page.get_text("text"), _image_coverage(page)) for page in doc]
+
+        if workers > 1 and num_pages >= PARALLEL_MIN_PAGES:
+            # Mais faixas que processos para equilibrar páginas de custo desigual
+            shard_size = max(1, -(-num_pages // (min(workers, num_pages) * 4)))
+            shards = [(path, start, min(start + shard_size, num_pages))
+                      for start in range(0, num_pages, shard_size)]
+
+            pages = [page for shard_pages in pools.map(_extract_page_range, shards, workers)
+                     for page in shard_pages]
+
+    metrics.incr("pages_extracted", len(pages))
+    metrics.incr("chars_extracted", sum(len(text) for text, _ in pages))
+    return pages
+
+
+def clean_and_report(pages):
+    """clean_pages com span de tempo, contadores de métricas e um resumo no console."""
+    with metrics.span("cleanup"):
+        cleaned, stats = clean_pages(pages)
+    if stats["chars_removed"]:
+        metrics.incr("cleanup_chars_removed", stats["chars_removed"])
+        metrics.incr("cleanup_lines_removed", stats["lines_removed"])
+        metrics.incr("duplicate_pages", stats["duplicate_pages"])
+        print(f"🧹 Limpeza: -{stats['chars_removed']:,} caracteres "
+              f"({stats['lines_removed']} linhas repetidas, {stats['duplicate_pages']} páginas duplicadas)")
+    return cleaned
+
+
+def extract_pages_text(path, workers=None, cleanup=True):
+    """
+    Extrai o texto de cada página (em paralelo, ver analyze_pages).
+    - cleanup: remove cabeçalhos, rodapés e páginas quase duplicadas (ver pdf_summarizer_common.page_cleaner)
+    """
+    pages = [text for text, _ in analyze_pages(path, workers)]
+    return clean_and_report(pages) if cleanup else pages
+
+
+def page_needs_ocr(text, image_coverage, ocr_threshold=200,
+                   coverage_threshold=IMAGE_COVERAGE_THRESHOLD):
+    """
+    Decide se uma página precisa de OCR: pouco texto extraído e a página é
+    vazia ou ocupada principalmente por imagens (página digitalizada).
+    """
+    chars = len(text.strip())
+    return chars < ocr_threshold and (chars == 0 or image_coverage >= coverage_threshold)
+
+
+def _tesseract_version():
+    """Versão do tesseract instalado (faz parte da chave do cache de OCR)."""
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "desconhecida"
+
+
+# Conexões ao cache de OCR abertas pelos processos do pool (uma por processo)
+_worker_caches = {}
+
+
+def _ocr_page(job, cache=None):
+    """
+    Renderiza uma única página direto do PyMuPDF e aplica o Tesseract, a
+    menos que uma página idêntica (mesmo hash perceptual e mesmos pixels) já
+    esteja no cache. No próprio processo, recebe o cache de quem chamou em vez
+    de abrir outra conexão.
+    Retorna (texto, chave do hash perceptual, hash dos pixels, veio do cache).
+    """
+    path, page_index, dpi, ocr_lang, tesseract_cmd, version, cache_path = job
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    with fitz.open(path) as doc:
+        pix = doc[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    del pix
+
+    fingerprint_key = OCRCache.fingerprint_key(page_fingerprint(img), dpi, ocr_lang, version)
+    pixels = pixel_hash(img)
+    if cache is None and cache_path:
+        if cache_path not in _worker_caches:
+            _worker_caches[cache_path] = OCRCache(cache_path)
+        cache = _worker_caches[cache_path]
+    if cache:
+        cached = cache.get_by_fingerprint(fingerprint_key, pixels)
+        if cached is not None:
+            return cached, fingerprint_key, pixels, True
+
+    if ocr_lang:
+        return pytesseract.image_to_string(img, lang=ocr_lang), fingerprint_key, pixels, False
+    return pytesseract.image_to_string(img), fingerprint_key, pixels, False
+
+
+@metrics.span("ocr")
+def ocr_pages(path, page_indexes, dpi=OCR_DPI, ocr_lang=None, tesseract_cmd=None, workers=None,
+              cache=None):
+    """
+    Faz OCR das páginas indicadas, uma página renderizada por processo de cada
+    vez, de modo que a memória fica limitada a poucas páginas.
+    - cache: OCRCache opcional; páginas já reconhecidas (pela chave exata ou
+      por uma página idêntica de outro documento) não passam pelo Tesseract.
+    Retorna um dicionário {índice da página: texto}.
+    """
+    results = {}
+    version = _tesseract_version() if cache else None
+    doc_hash = file_hash(path) if cache else None
+
+    pending = []
+    for i in page_indexes:
+        if cache:
+            text = cache.get(OCRCache.page_key(doc_hash, i, dpi, ocr_lang, version))
+            if text is not None:
+                results[i] = text
+                continue
+        pending.append(i)
+
+    cache_path = cache.path if cache else None
+    jobs = [(path, i, dpi, ocr_lang, tesseract_cmd, version, cache_path) for i in pending]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        outputs = [_ocr_page(job, cache) for job in jobs]
+    else:
+        outputs = pools.map(_ocr_page, jobs, workers)
+
+    for i, (text, fingerprint_key, pixels, from_cache) in zip(pending, outputs):
+        results[i] = text
+        if cache:
+            if from_cache:
+                cache.fingerprint_hits += 1
+            else:
+                cache.misses += 1
+            cache.put(OCRCache.page_key(doc_hash, i, dpi, ocr_lang, version), fingerprint_key, text, pixels)
+
+    recognized = sum(1 for *_, from_cache in outputs if not from_cache)
+    metrics.incr("ocr_pages", recognized)
+    metrics.incr("ocr_cache_hits", len(results) - recognized)
+    return results
+
+
+def extract_text_pdf(path, ocr_threshold=200, poppler_path=None, tesseract_cmd=None, ocr_lang=None,
+                     workers=None, ocr_dpi=OCR_DPI, ocr_workers=None, ocr_cache_path=OCR_CACHE_PATH,
+                     cleanup=True):
+    """
+    Extrai texto de PDF. Faz OCR apenas das páginas com pouco texto que são
+    digitalizadas (vazias ou cobertas por imagens).
+    - ocr_threshold: mínimo de caracteres por página para dispensar o OCR.
+    - poppler_path: mantido por compatibilidade; as páginas agora são
+      renderizadas pelo PyMuPDF e o poppler não é mais necessário.
     - tesseract_cmd: caminho absoluto para tesseract.exe (Windows), se necessário.
     - ocr_lang: 'por' ou 'eng' (se tiver instalados)
+    - workers: processos usados na extração (padrão: número de CPUs)
+    - ocr_dpi: resolução da renderização para o OCR
+    - ocr_workers: processos usados no OCR (padrão: número de CPUs)
+    - ocr_cache_path: arquivo do cache de OCR (None desativa o cache)
+    - cleanup: remove cabeçalhos, rodapés e páginas quase duplicadas depois
+      do OCR (as marcações ===PAGE=== passam a separar só as páginas mantidas)
     """
     if tesseract_cmd:
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
-    doc = fitz.open(path)
-    pages_text = [page.get_text("text") for page in doc]
-    full_text = "\n===PAGE===\n".join(pages_text).strip()
-
-    # Se texto extraído for pequeno, tenta OCR
-    if len(full_text) < ocr_threshold:
-        images = convert_from_path(path, dpi=200, poppler_path=poppler_path)
-        ocr_pages = []
-        for img in images:
-            if ocr_lang:
-                ocr_pages.append(pytesseract.image_to_string(img, lang=ocr_lang))
-            else:
-                ocr_pages.append(pytesseract.image_to_string(img))
-        full_text = "\n===PAGE===\n".join(ocr_pages).strip()
+    pages = analyze_pages(path, workers)
+    pages_text = [text for text, _ in pages]
+
+    to_ocr = [i for i, (text, coverage) in enumerate(pages)
+              if page_needs_ocr(text, coverage, ocr_threshold)]
+    if to_ocr:
+        cache = OCRCache(ocr_cache_path) if ocr_cache_path else None
+        try:
+            ocr_text = ocr_pages(path, to_ocr, dpi=ocr_dpi, ocr_lang=ocr_lang,
+                                 tesseract_cmd=tesseract_cmd, workers=ocr_workers, cache=cache)
+        finally:
+            if cache:
+                cache.close()
+        for i, text in ocr_text.items():
+            pages_text[i] = text
+        if cache:
+            print(cache.report())
 
-    return full_text
+    if cleanup:
+        pages_text = clean_and_report(pages_text)
+    return "\n===PAGE===\n".join(pages_text).strip()
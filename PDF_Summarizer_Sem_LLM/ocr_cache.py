@@ -0,0 +1,168 @@
+# ocr_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Local e tamanho máximo padrão do cache de OCR
+OCR_CACHE_PATH = os.path.join("cache", "ocr.sqlite3")
+OCR_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_fingerprint(img):
+    """
+    Hash perceptual (dHash de 64 bits) da página renderizada. Páginas
+    digitalizadas idênticas em documentos diferentes (capas, anexos padrão)
+    produzem o mesmo valor mesmo com pequenas diferenças de compressão.
+    """
+    small = img.convert("L").resize((9, 8))
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:016x}"
+
+
+def pixel_hash(img):
+    """
+    SHA-256 dos pixels da página renderizada. O dHash tem só 64 bits e páginas
+    de texto diferentes podem colidir; o texto de outra página só é
+    reaproveitado se os pixels também forem idênticos.
+    """
+    digest = hashlib.sha256(f"{img.mode}:{img.width}x{img.height}:".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Cache persistente (SQLite) de resultados do Tesseract.
+
+    Cada entrada é encontrada pela chave exata (hash do documento, página,
+    DPI, idioma, versão do tesseract) ou pelo hash perceptual da página
+    renderizada com os mesmos parâmetros, confirmado pelo hash dos pixels. Quando o tamanho total passa de
+    max_bytes, as entradas usadas há mais tempo são removidas.
+    """
+
+    def __init__(self, path=OCR_CACHE_PATH, max_bytes=OCR_CACHE_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.exact_hits = 0
+        self.fingerprint_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr ("
+            " key TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " text BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " pixels TEXT)"
+        )
+        if "pixels" not in {row[1] for row in self._conn.execute("PRAGMA table_info(ocr)")}:
+            # Entradas antigas ficam sem hash dos pixels e só servem pela chave exata
+            self._conn.execute("ALTER TABLE ocr ADD COLUMN pixels TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_fingerprint ON ocr (fingerprint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_last_access ON ocr (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+
+    @staticmethod
+    def page_key(doc_hash, page_index, dpi, lang, version):
+        return f"{doc_hash}:{page_index}:{dpi}:{lang or ''}:{version}"
+
+    @staticmethod
+    def fingerprint_key(fingerprint, dpi, lang, version):
+        return f"{fingerprint}:{dpi}:{lang or ''}:{version}"
+
+    def _touch(self, key):
+        self._conn.execute("UPDATE ocr SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+
+    def get(self, key):
+        """Busca pela chave exata da página. Retorna o texto ou None."""
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM ocr WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.exact_hits += 1
+            self._touch(key)
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def get_by_fingerprint(self, fingerprint_key, pixels):
+        """
+        Busca uma página idêntica (mesmo hash perceptual e parâmetros, e os
+        mesmos pixels). Retorna o texto ou None. Roda nos processos de OCR, então
+        o acerto é contado por quem junta os resultados (extractor.ocr_pages).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT key, text FROM ocr WHERE fingerprint = ? AND pixels = ? LIMIT 1",
+                                     (fingerprint_key, pixels)).fetchone()
+            if row is None:
+                return None
+            self._touch(row[0])
+        return zlib.decompress(row[1]).decode("utf-8")
+
+    def put(self, key, fingerprint_key, text, pixels=None):
+        """Guarda o texto reconhecido de uma página e aplica o limite de tamanho."""
+        blob = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM ocr WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr (key, fingerprint, text, size, last_access, pixels)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, fingerprint_key, blob, len(blob), time.time(), pixels)
+            )
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Remove as entradas usadas há mais tempo até o cache ocupar no máximo 90% do limite."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        removed = []
+        for key, size in self._conn.execute("SELECT key, size FROM ocr ORDER BY last_access").fetchall():
+            if self._total_bytes <= target:
+                break
+            removed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM ocr WHERE key = ?", removed)
+
+    def total_bytes(self):
+        return self._total_bytes
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def hit_rate(self):
+        """Fração das páginas atendidas pelo cache (chave exata ou hash perceptual)."""
+        hits = self.exact_hits + self.fingerprint_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+    def report(self):
+        return (f"Cache de OCR: {self.exact_hits} acertos exatos, {self.fingerprint_hits} por página idêntica, "
+                f"{self.misses} páginas processadas (taxa de acerto {self.hit_rate():.0%})")
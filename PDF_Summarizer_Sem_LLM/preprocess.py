@@ -1,10 +1,79 @@
 # preprocess.py
-import spacy
+from pdf_summarizer_common.textrank import split_sentences as split_sentences_rules
 
 # Ajuste o modelo de acordo com seu idioma (pt_core_news_sm / en_core_web_sm)
-nlp = spacy.load("pt_core_news_sm")
+SPACY_MODEL = "pt_core_news_sm"
+# Marcador de página inserido por extractor.extract_text_pdf
+PAGE_MARKER = "===PAGE==="
+# Tamanho máximo de cada trecho enviado ao spaCy (o limite padrão dele é 1.000.000)
+MAX_SECTION_CHARS = 100_000
 
-def tokenize_sentences(text):
-    doc = nlp(text)
-    sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+# Componentes do pipeline que não são necessários para separar sentenças
+_UNUSED_PIPES = ["tok2vec", "tagger", "morphologizer", "parser", "lemmatizer",
+                 "attribute_ruler", "ner"]
+
+_nlp_cache = {}
+
+
+def get_nlp(mode="senter", model=SPACY_MODEL):
+    """
+    Carrega o modelo spaCy sob demanda (uma vez por processo e modo).
+    - mode="senter": só o segmentador de sentenças (bem mais rápido)
+    - mode="full": pipeline completo (tagger, parser, NER...)
+    """
+    key = (model, mode)
+    if key not in _nlp_cache:
+        import spacy  # importado aqui para não pesar no import deste módulo
+
+        if mode == "full":
+            nlp = spacy.load(model)
+        else:
+            nlp = spacy.load(model, exclude=_UNUSED_PIPES)
+            if "senter" in nlp.component_names:
+                nlp.enable_pipe("senter")
+            else:  # modelo sem senter treinado: usa o parser só para as sentenças
+                nlp = spacy.load(model, exclude=["ner", "lemmatizer", "attribute_ruler"])
+        _nlp_cache[key] = nlp
+    return _nlp_cache[key]
+
+
+def _sections(text, max_chars=MAX_SECTION_CHARS):
+    """Divide o texto nas marcações de página e em trechos de no máximo max_chars."""
+    for section in text.split(PAGE_MARKER):
+        while len(section) > max_chars:
+            cut = section.rfind("\n", 0, max_chars)
+            if cut <= 0:
+                cut = section.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            yield section[:cut]
+            section = section[cut:]
+        if section.strip():
+            yield section
+
+
+def tokenize_sentences(text, mode="senter", n_process=1, batch_size=32):
+    """
+    Separa o texto em sentenças.
+    - mode: "senter" (spaCy só com o segmentador), "full" (pipeline completo)
+      ou "rules" (separador por regras, sem carregar modelo). Se o modelo
+      spaCy não estiver instalado, usa as regras.
+    - n_process: processos usados pelo nlp.pipe nos trechos entre páginas.
+    """
+    if mode != "rules":
+        key = (SPACY_MODEL, mode)
+        try:
+            nlp = get_nlp(mode)
+        except (ImportError, OSError) as e:
+            print(f"⚠️ Modelo spaCy indisponível ({e}); usando separador por regras.")
+            _nlp_cache[key] = nlp = None  # não tenta carregar de novo a cada chamada
+        if nlp is None:
+            mode = "rules"
+
+    if mode == "rules":
+        return [s for section in _sections(text) for s in split_sentences_rules(section)]
+
+    sentences = []
+    for doc in nlp.pipe(_sections(text), batch_size=batch_size, n_process=n_process):
+        sentences.extend(sent.text.strip() for sent in doc.sents if sent.text.strip())
     return sentences
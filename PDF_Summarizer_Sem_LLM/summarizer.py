@@ -1,21 +1,42 @@
-from pypdf import PdfReader
+import numpy as np
+
+from pdf_summarizer_common import metrics
+from extractor import extract_pages_text
+from preprocess import tokenize_sentences
+from pdf_summarizer_common.textrank import pagerank, similarity_graph
 
 def extrair_texto_pdf(pdf_path):
-    """Extrai texto de um PDF e já normaliza a formatação."""
-    texto = ""
-    leitor = PdfReader(pdf_path)
-    for pagina in leitor.pages:
-        texto += pagina.extract_text() + "\n"
+    """Extrai texto de um PDF (páginas em paralelo) e já normaliza a formatação."""
+    texto = "\n".join(extract_pages_text(pdf_path))
 
     # Normaliza: remove múltiplos espaços e quebras de linha desnecessárias
     texto = " ".join(texto.split())
     return texto
 
+def textrank(sents, top_n=5):
+    """
+    Resumo extrativo TextRank: escolhe as top_n sentenças mais centrais e as
+    devolve na ordem em que aparecem no documento.
+    """
+    sents = [s for s in sents if s.strip()]
+    if len(sents) <= top_n:
+        return " ".join(sents)
+
+    try:
+        scores = pagerank(similarity_graph(sents))
+    except ValueError:  # vocabulário vazio (só números/pontuação)
+        return " ".join(sents[:top_n])
+
+    best = np.sort(np.argpartition(-scores, top_n - 1)[:top_n])
+    return " ".join(sents[i] for i in best)
+
 def resumir_texto(texto, max_sentencas=5):
-    """Resumo simples: pega as primeiras frases do texto normalizado."""
-    frases = texto.split(". ")
-    resumo = ". ".join(frases[:max_sentencas])
-    return resumo + "."
+    """Resumo extrativo com TextRank sobre as sentenças do texto normalizado."""
+    with metrics.span("segmentation"):
+        sents = tokenize_sentences(texto)
+    metrics.incr("sentences", len(sents))
+    with metrics.span("textrank"):
+        return textrank(sents, top_n=max_sentencas)
 
 def summarize_pdf(pdf_path):
     """Pipeline completo: extrai e resume o PDF."""
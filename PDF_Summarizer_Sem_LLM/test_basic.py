@@ -1,13 +1,16 @@
 # tests/test_basic.py
 import os
+from benchmark import make_text_pdf
 from extractor import extract_text_pdf
 from preprocess import tokenize_sentences
 from summarizer import textrank
 
-def test_extract_and_summarize():
+def test_extract_and_summarize(tmp_path):
+    # Usa o exemplo.pdf da raiz do projeto, se existir; senão, um PDF sintético
     pdf_path = "exemplo.pdf"
-    assert os.path.exists(pdf_path), "Coloque um exemplo.pdf na raiz do projeto para o teste."
-    text = extract_text_pdf(pdf_path)
+    if not os.path.exists(pdf_path):
+        pdf_path = make_text_pdf(tmp_path / "exemplo.pdf", 3)
+    text = extract_text_pdf(pdf_path, ocr_cache_path=None)
     assert len(text) > 100
     sents = tokenize_sentences(text)
     summary = textrank(sents, top_n=5)
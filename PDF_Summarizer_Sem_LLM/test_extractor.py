@@ -0,0 +1,128 @@
+# test_extractor.py
+import os
+
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+import extractor
+from ocr_cache import OCRCache
+from pdf_summarizer_common import metrics
+from benchmark import make_text_pdf
+
+
+def make_mixed_pdf(path):
+    """Duas páginas de texto seguidas de uma página "digitalizada" (só imagem)."""
+    c = canvas.Canvas(str(path))
+    for page in range(2):
+        for line in range(20):
+            c.drawString(50, 800 - line * 18, f"Pagina {page + 1} linha {line} com texto de exemplo.")
+        c.showPage()
+    scan = Image.new("RGB", (600, 800), "white")
+    c.drawImage(ImageReader(scan), 0, 0, width=595, height=842)
+    c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_only_scanned_pages_are_ocred(tmp_path, monkeypatch):
+    ocred = []
+
+    def fake_ocr(img, **kwargs):
+        ocred.append(img.size)
+        return "texto reconhecido"
+
+    monkeypatch.setattr(extractor.pytesseract, "image_to_string", fake_ocr)
+    pdf_path = make_mixed_pdf(tmp_path / "misto.pdf")
+
+    with metrics.collect() as job:
+        text = extractor.extract_text_pdf(pdf_path, ocr_workers=1, ocr_dpi=100, ocr_cache_path=None)
+    pages = text.split("\n===PAGE===\n")
+
+    assert len(ocred) == 1
+    snapshot = job.snapshot()
+    assert snapshot["counters"]["pages_extracted"] == 3
+    assert snapshot["counters"]["ocr_pages"] == 1
+    assert set(snapshot["spans"]) == {"extraction", "ocr", "cleanup"}
+    assert ocred[0][0] < 900  # renderizada a 100 dpi
+    assert "Pagina 1 linha 0" in pages[0]
+    assert pages[2] == "texto reconhecido"
+
+
+def test_text_pdf_skips_ocr(tmp_path, monkeypatch):
+    def fail_ocr(img, **kwargs):
+        raise AssertionError("OCR inesperado")
+
+    monkeypatch.setattr(extractor.pytesseract, "image_to_string", fail_ocr)
+    pdf_path = make_text_pdf(tmp_path / "texto.pdf", 3)
+
+    text = extractor.extract_text_pdf(pdf_path, ocr_cache_path=None)
+
+    assert text.count("===PAGE===") == 2
+
+
+def test_ocr_cache_skips_repeated_and_identical_pages(tmp_path, monkeypatch):
+    ocred = []
+
+    def fake_ocr(img, **kwargs):
+        ocred.append(img.size)
+        return "texto reconhecido"
+
+    monkeypatch.setattr(extractor.pytesseract, "image_to_string", fake_ocr)
+    cache_path = str(tmp_path / "ocr.sqlite3")
+    first = make_mixed_pdf(tmp_path / "primeiro.pdf")
+    second = make_mixed_pdf(tmp_path / "segundo.pdf")
+    with open(second, "ab") as f:
+        f.write(b"\n% outro documento\n")  # conteúdo (e hash) diferente, mesma página digitalizada
+
+    extractor.extract_text_pdf(first, ocr_workers=1, ocr_cache_path=cache_path)
+    extractor.extract_text_pdf(first, ocr_workers=1, ocr_cache_path=cache_path)
+    text = extractor.extract_text_pdf(second, ocr_workers=1, ocr_cache_path=cache_path)
+
+    assert len(ocred) == 1
+    assert text.split("\n===PAGE===\n")[2] == "texto reconhecido"
+    assert extractor._worker_caches == {}  # no próprio processo, usa a conexão de quem chamou
+
+
+def test_ocr_cache_keeps_running_total_within_limit(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=2000)
+    for i in range(50):
+        cache.put(f"chave{i}", f"pagina{i}", os.urandom(100).hex())
+    cache.put("chave49", "pagina49", "texto menor")
+
+    stored = cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+    assert cache.total_bytes() == stored <= 2000
+    assert cache.get("chave0") is None and cache.get("chave49") == "texto menor"
+    cache.close()
+
+
+def make_scanned_pdf(path, scan):
+    """PDF de uma página só com a imagem dada."""
+    c = canvas.Canvas(str(path))
+    c.drawImage(ImageReader(scan), 0, 0, width=595, height=842)
+    c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_ocr_cache_does_not_reuse_text_of_colliding_page(tmp_path, monkeypatch):
+    ocred = []
+
+    def fake_ocr(img, **kwargs):
+        ocred.append(img.size)
+        return f"pagina {len(ocred)}"
+
+    monkeypatch.setattr(extractor.pytesseract, "image_to_string", fake_ocr)
+    cache_path = str(tmp_path / "ocr.sqlite3")
+    blank = Image.new("RGB", (600, 800), "white")
+    marked = blank.copy()
+    marked.paste((0, 0, 0), (0, 0, 20, 800))  # faixa escura na borda esquerda: mesmo dHash da página em branco
+    first = make_scanned_pdf(tmp_path / "branca.pdf", blank)
+    second = make_scanned_pdf(tmp_path / "marcada.pdf", marked)
+    assert extractor.page_fingerprint(blank) == extractor.page_fingerprint(marked)
+
+    extractor.extract_text_pdf(first, ocr_workers=1, ocr_cache_path=cache_path)
+    text = extractor.extract_text_pdf(second, ocr_workers=1, ocr_cache_path=cache_path)
+
+    assert len(ocred) == 2
+    assert text == "pagina 2"
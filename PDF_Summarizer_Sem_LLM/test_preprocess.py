@@ -0,0 +1,22 @@
+# test_preprocess.py
+from preprocess import split_sentences_rules, tokenize_sentences
+
+
+def test_rules_keep_abbreviations_together():
+    text = "O Sr. Silva chegou às 10h. Veja a fig. 3 e o art. 5º da lei! Mr. Smith agreed."
+
+    assert split_sentences_rules(text) == [
+        "O Sr. Silva chegou às 10h.",
+        "Veja a fig. 3 e o art. 5º da lei!",
+        "Mr. Smith agreed.",
+    ]
+
+
+def test_page_markers_split_sections():
+    text = "Fim da primeira página\n===PAGE===\nInício da segunda. Outra frase."
+
+    assert tokenize_sentences(text, mode="rules") == [
+        "Fim da primeira página",
+        "Início da segunda.",
+        "Outra frase.",
+    ]
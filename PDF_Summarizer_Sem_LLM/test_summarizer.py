@@ -0,0 +1,57 @@
+# test_summarizer.py
+import time
+
+import numpy as np
+
+from summarizer import pagerank, similarity_graph, textrank
+
+
+def test_textrank_keeps_document_order():
+    sents = [
+        "O gato subiu no telhado da casa.",
+        "Chove muito hoje na cidade.",
+        "O gato desceu do telhado rapidamente.",
+        "O telhado da casa do gato é vermelho.",
+        "Amanhã teremos sol.",
+    ]
+
+    summary = textrank(sents, top_n=2)
+
+    assert summary == "O gato subiu no telhado da casa. O telhado da casa do gato é vermelho."
+
+
+def test_textrank_short_input_returned_whole():
+    assert textrank(["Uma frase.", "Outra frase."], top_n=5) == "Uma frase. Outra frase."
+
+
+def test_similarity_graph_is_sparse_top_k():
+    sents = [f"tema{i % 50} assunto{i % 7} detalhe{i}" for i in range(500)]
+
+    graph = similarity_graph(sents, k=5)
+
+    assert graph.shape == (500, 500)
+    assert graph.diagonal().sum() == 0
+    assert (graph != graph.T).nnz == 0
+    assert graph.nnz <= 2 * 5 * 500
+
+
+def test_pagerank_scores_sum_to_one():
+    sents = [f"tema{i % 10} assunto{i % 3}" for i in range(100)]
+
+    scores = pagerank(similarity_graph(sents))
+
+    assert np.isclose(scores.sum(), 1.0)
+
+
+def test_textrank_scales_to_large_documents():
+    rng = np.random.default_rng(0)
+    words = np.array([f"palavra{i}" for i in range(20000)])
+    weights = 1 / np.arange(1, 20001) ** 1.1
+    weights /= weights.sum()
+    sents = [" ".join(words[rng.choice(20000, size=20, p=weights)]) for _ in range(20000)]
+
+    start = time.perf_counter()
+    summary = textrank(sents, top_n=10)
+
+    assert time.perf_counter() - start < 30
+    assert len(summary) > 20